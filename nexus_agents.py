@@ -14,7 +14,6 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from abc import ABC, abstractmethod
-import openai
 from nexus_core import BaseAgent, Task, AgentType, MemoryStore
 
 logger = logging.getLogger(__name__)
@@ -22,6 +21,22 @@ logger = logging.getLogger(__name__)
 class NexusDevAgent(BaseAgent):
     """Agente especializado en desarrollo de código y implementación de features."""
     
+    # El análisis de una misma descripción no cambia: se cachea un día
+    ANALYSIS_CACHE_TTL = 24 * 3600.0
+    
+    # Claves obligatorias del artefacto en modo fusionado, por tipo de artefacto
+    FUSED_REQUIRED_KEYS = {
+        "endpoint": ["endpoint_code", "test_code"],
+        "tests": ["test_code"],
+        "code": ["code"],
+    }
+    
+    def __init__(self, agent_type: AgentType, memory_store: MemoryStore, llm=None, mode: str = None):
+        super().__init__(agent_type, memory_store, llm)
+        # "fused": análisis y código en una sola llamada; "two_step": dos llamadas
+        self.mode = mode or os.getenv('NEXUS_DEV_MODE', 'fused')
+        self.stats = {"fused": 0, "fused_fallbacks": 0, "two_step": 0}
+    
     def _define_capabilities(self) -> List[str]:
         return [
             "desarrollo de código", "implementación", "tests unitarios",
@@ -32,16 +47,106 @@ class NexusDevAgent(BaseAgent):
         """Ejecuta tareas de desarrollo."""
         logger.info(f"NexusDev ejecutando: {task.description}")
         
+        kind = self._artifact_kind(task)
+        if self.mode == "fused":
+            result = await self._generate_fused(task, kind)
+            if result is not None:
+                self.stats["fused"] += 1
+                return result
+            self.stats["fused_fallbacks"] += 1
+            logger.warning(f"Respuesta fusionada no válida, usando dos pasos: {task.id}")
+        
+        self.stats["two_step"] += 1
+        return await self._execute_two_step(task, kind)
+    
+    def _artifact_kind(self, task: Task) -> str:
+        """Tipo de artefacto a generar: endpoint, tests o code."""
+        description = task.description.lower()
+        if "endpoint" in description or "api" in description:
+            return "endpoint"
+        elif "test" in description:
+            return "tests"
+        return "code"
+    
+    async def _execute_two_step(self, task: Task, kind: str) -> Dict[str, Any]:
+        """Analiza la tarea y genera el artefacto en dos llamadas sucesivas."""
         # Analizar la tarea para determinar qué tipo de código generar
-        code_analysis = await self._analyze_development_task(task.description)
+        code_analysis = await self._analyze_development_task(self.describe_task(task))
         
-        if "endpoint" in task.description.lower() or "api" in task.description.lower():
+        if kind == "endpoint":
             return await self._generate_api_endpoint(task, code_analysis)
-        elif "test" in task.description.lower():
+        elif kind == "tests":
             return await self._generate_tests(task, code_analysis)
         else:
             return await self._generate_general_code(task, code_analysis)
     
+    async def _generate_fused(self, task: Task, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Pide el análisis y el artefacto en una sola respuesta estructurada.
+        
+        Devuelve el artefacto con la misma forma que el camino en dos pasos,
+        o None si la respuesta no es JSON o no supera la validación. Los
+        errores de la llamada al LLM se propagan: repetirla en dos pasos
+        fallaría igual.
+        """
+        artifact_schema = {
+            "endpoint": """{
+                "endpoint_code": "código del endpoint",
+                "test_code": "código de tests",
+                "documentation": "documentación",
+                "dependencies": ["lista de dependencias"],
+                "setup_instructions": "instrucciones de configuración"
+            }""",
+            "tests": """{
+                "test_code": "tests unitarios, de integración y de casos edge con sus mocks y fixtures"
+            }""",
+            "code": """{
+                "code": "código limpio, bien documentado y siguiendo mejores prácticas"
+            }""",
+        }[kind]
+        
+        prompt = f"""
+        Analiza la siguiente tarea de desarrollo, extrae sus requisitos técnicos y genera
+        el código correspondiente, incluyendo manejo de errores y validación de datos.
+        
+        Tarea: {self.describe_task(task)}
+        
+        Responde únicamente en formato JSON:
+        {{
+            "analysis": {{
+                "language": "python|javascript|java|etc",
+                "framework": "flask|django|express|spring|etc",
+                "type": "endpoint|class|function|test|etc",
+                "requirements": ["req1", "req2"],
+                "dependencies": ["dep1", "dep2"]
+            }},
+            "artifact": {artifact_schema}
+        }}
+        """
+        
+        content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+        try:
+            return self._validate_fused(json.loads(content), kind)
+        except json.JSONDecodeError as e:
+            logger.error(f"Respuesta fusionada no es JSON: {e}")
+            return None
+    
+    def _validate_fused(self, response: Any, kind: str) -> Optional[Dict[str, Any]]:
+        """Comprueba la estructura de la respuesta fusionada y extrae el artefacto."""
+        if not isinstance(response, dict):
+            return None
+        analysis = response.get("analysis")
+        artifact = response.get("artifact")
+        if not isinstance(analysis, dict) or not isinstance(artifact, dict):
+            return None
+        if not analysis.get("language"):
+            return None
+        for key in self.FUSED_REQUIRED_KEYS[kind]:
+            value = artifact.get(key)
+            if not isinstance(value, str) or not value.strip():
+                return None
+        return artifact
+    
     async def _analyze_development_task(self, description: str) -> Dict[str, Any]:
         """Analiza la tarea de desarrollo para extraer requisitos técnicos."""
         prompt = f"""
@@ -60,12 +165,9 @@ class NexusDevAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
-            )
-            return json.loads(response.choices[0].message.content)
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0,
+                                             cache=True, cache_ttl=self.ANALYSIS_CACHE_TTL)
+            return json.loads(content)
         except Exception as e:
             logger.error(f"Error analizando tarea: {e}")
             return {"language": "python", "type": "general"}
@@ -75,7 +177,7 @@ class NexusDevAgent(BaseAgent):
         prompt = f"""
         Genera un endpoint de API completo basado en estos requisitos:
         
-        Descripción: {task.description}
+        Descripción: {self.describe_task(task)}
         Análisis: {json.dumps(analysis, indent=2)}
         
         Incluye:
@@ -96,12 +198,8 @@ class NexusDevAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return json.loads(response.choices[0].message.content)
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return json.loads(content)
         except Exception as e:
             logger.error(f"Error generando endpoint: {e}")
             return {"error": str(e)}
@@ -111,7 +209,7 @@ class NexusDevAgent(BaseAgent):
         prompt = f"""
         Genera tests completos basados en:
         
-        Descripción: {task.description}
+        Descripción: {self.describe_task(task)}
         Análisis: {json.dumps(analysis, indent=2)}
         
         Incluye:
@@ -124,12 +222,8 @@ class NexusDevAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return json.loads(response.choices[0].message.content)
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return json.loads(content)
         except Exception as e:
             logger.error(f"Error generando tests: {e}")
             return {"error": str(e)}
@@ -139,19 +233,15 @@ class NexusDevAgent(BaseAgent):
         prompt = f"""
         Genera código basado en:
         
-        Descripción: {task.description}
+        Descripción: {self.describe_task(task)}
         Análisis: {json.dumps(analysis, indent=2)}
         
         Proporciona código limpio, bien documentado y siguiendo mejores prácticas.
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return {"code": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return {"code": content}
         except Exception as e:
             logger.error(f"Error generando código: {e}")
             return {"error": str(e)}
@@ -181,7 +271,7 @@ class NexusQAAgent(BaseAgent):
         prompt = f"""
         Como ingeniero de QA, revisa el siguiente pull request y genera:
         
-        Tarea: {task.description}
+        Tarea: {self.describe_task(task)}
         
         1. Casos de prueba de extremo a extremo
         2. Análisis de riesgos
@@ -192,12 +282,8 @@ class NexusQAAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return json.loads(response.choices[0].message.content)
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return json.loads(content)
         except Exception as e:
             logger.error(f"Error revisando PR: {e}")
             return {"error": str(e)}
@@ -207,7 +293,7 @@ class NexusQAAgent(BaseAgent):
         prompt = f"""
         Genera casos de prueba completos para:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         - Casos positivos
@@ -218,12 +304,8 @@ class NexusQAAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return {"test_cases": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return {"test_cases": content}
         except Exception as e:
             logger.error(f"Error generando casos de prueba: {e}")
             return {"error": str(e)}
@@ -253,7 +335,7 @@ class NexusDesignerAgent(BaseAgent):
         prompt = f"""
         Genera un mockup detallado para:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Estructura HTML
@@ -264,12 +346,8 @@ class NexusDesignerAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            return {"mockup": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.3)
+            return {"mockup": content}
         except Exception as e:
             logger.error(f"Error generando mockup: {e}")
             return {"error": str(e)}
@@ -299,7 +377,7 @@ class NexusHRAgent(BaseAgent):
         prompt = f"""
         Crea un plan de onboarding completo para:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Mensaje de bienvenida
@@ -310,12 +388,8 @@ class NexusHRAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            return {"onboarding_plan": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.3)
+            return {"onboarding_plan": content}
         except Exception as e:
             logger.error(f"Error creando plan de onboarding: {e}")
             return {"error": str(e)}
@@ -345,7 +419,7 @@ class NexusFinanceAgent(BaseAgent):
         prompt = f"""
         Procesa el siguiente gasto/factura:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Categorización
@@ -355,12 +429,8 @@ class NexusFinanceAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return {"expense_analysis": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return {"expense_analysis": content}
         except Exception as e:
             logger.error(f"Error procesando gasto: {e}")
             return {"error": str(e)}
@@ -390,7 +460,7 @@ class NexusSalesAgent(BaseAgent):
         prompt = f"""
         Crea un briefing completo para demo:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Resumen de la empresa del lead
@@ -401,12 +471,8 @@ class NexusSalesAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            return {"demo_briefing": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.3)
+            return {"demo_briefing": content}
         except Exception as e:
             logger.error(f"Error creando briefing: {e}")
             return {"error": str(e)}
@@ -436,7 +502,7 @@ class NexusMarketingAgent(BaseAgent):
         prompt = f"""
         Genera un email profesional para:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Asunto atractivo
@@ -447,12 +513,8 @@ class NexusMarketingAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4
-            )
-            return {"email_content": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.4)
+            return {"email_content": content}
         except Exception as e:
             logger.error(f"Error generando email: {e}")
             return {"error": str(e)}
@@ -482,7 +544,7 @@ class NexusSupportAgent(BaseAgent):
         prompt = f"""
         Crea un ticket de soporte para:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Categorización del problema
@@ -493,12 +555,8 @@ class NexusSupportAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return {"support_ticket": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return {"support_ticket": content}
         except Exception as e:
             logger.error(f"Error creando ticket: {e}")
             return {"error": str(e)}
@@ -528,7 +586,7 @@ class NexusAnalystAgent(BaseAgent):
         prompt = f"""
         Analiza la correlación solicitada:
         
-        {task.description}
+        {self.describe_task(task)}
         
         Incluye:
         1. Metodología de análisis
@@ -539,46 +597,42 @@ class NexusAnalystAgent(BaseAgent):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return {"correlation_analysis": response.choices[0].message.content}
+            content = await self.llm.complete(prompt, model="gpt-4", temperature=0.2)
+            return {"correlation_analysis": content}
         except Exception as e:
             logger.error(f"Error analizando correlación: {e}")
             return {"error": str(e)}
 
 # Métodos auxiliares para agentes que no implementan todas las funciones
-def _general_qa_task(self, task: Task) -> Dict[str, Any]:
+async def _general_qa_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de QA."""
     return {"status": "completed", "message": f"Tarea QA completada: {task.description}"}
 
-def _general_design_task(self, task: Task) -> Dict[str, Any]:
+async def _general_design_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de diseño."""
     return {"status": "completed", "message": f"Tarea de diseño completada: {task.description}"}
 
-def _general_hr_task(self, task: Task) -> Dict[str, Any]:
+async def _general_hr_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de HR."""
     return {"status": "completed", "message": f"Tarea HR completada: {task.description}"}
 
-def _general_finance_task(self, task: Task) -> Dict[str, Any]:
+async def _general_finance_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de finanzas."""
     return {"status": "completed", "message": f"Tarea financiera completada: {task.description}"}
 
-def _general_sales_task(self, task: Task) -> Dict[str, Any]:
+async def _general_sales_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de ventas."""
     return {"status": "completed", "message": f"Tarea de ventas completada: {task.description}"}
 
-def _general_marketing_task(self, task: Task) -> Dict[str, Any]:
+async def _general_marketing_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de marketing."""
     return {"status": "completed", "message": f"Tarea de marketing completada: {task.description}"}
 
-def _general_support_task(self, task: Task) -> Dict[str, Any]:
+async def _general_support_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de soporte."""
     return {"status": "completed", "message": f"Tarea de soporte completada: {task.description}"}
 
-def _general_analysis_task(self, task: Task) -> Dict[str, Any]:
+async def _general_analysis_task(self, task: Task) -> Dict[str, Any]:
     """Tarea general de análisis."""
     return {"status": "completed", "message": f"Tarea de análisis completada: {task.description}"}
 
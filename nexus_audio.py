@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Audio de Nexus
+==============
+
+Utilidades de audio para la integración de voz, sin dependencias de
+ElevenLabs:
+
+- ``iterate_in_thread`` consume un iterador bloqueante (p. ej. el stream de
+  ``elevenlabs.generate(..., stream=True)``) en un hilo del pool de síntesis
+  (NEXUS_TTS_THREADS hilos, separado del executor por defecto del event loop)
+  y entrega sus fragmentos al event loop según llegan.
+- ``AudioStore`` guarda los audios en AUDIO_STORAGE_PATH en segundo plano,
+  sin retrasar la entrega del audio al cliente.
+- ``synthesize_in_order`` sintetiza frases en paralelo acotado y entrega su
+  audio en el orden del texto, para empezar a reproducir la primera frase
+  mientras las siguientes aún se generan.
+- ``SpeechStats`` mide el tiempo hasta el primer byte de cada síntesis.
+- ``AudioCache`` guarda los audios por texto, voz, modelo y ajustes, en
+  memoria y en disco, para no volver a sintetizar frases fijas (bienvenidas,
+  anuncios de transferencia).
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Iterator, AsyncIterator, Deque, Set, Tuple, Union, Optional
+
+logger = logging.getLogger(__name__)
+
+# Síntesis de una frase: produce sus fragmentos de audio
+Synthesizer = Callable[[str], AsyncIterator[bytes]]
+
+_DONE = object()
+
+_tts_executor: Optional[ThreadPoolExecutor] = None
+_tts_executor_lock = threading.Lock()
+
+
+def tts_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos de la síntesis en streaming, creado en el primer uso.
+
+    Cada stream ocupa un hilo mientras dura; con un pool propio y acotado
+    (NEXUS_TTS_THREADS) los picos de síntesis esperan turno en lugar de
+    agotar el executor por defecto, que comparten ``asyncio.to_thread`` y el
+    resto de la aplicación.
+    """
+    global _tts_executor
+    with _tts_executor_lock:
+        if _tts_executor is None:
+            _tts_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('NEXUS_TTS_THREADS', '8')),
+                thread_name_prefix="nexus-tts",
+            )
+        return _tts_executor
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[Any]],
+                            executor: Executor = None) -> AsyncIterator[Any]:
+    """
+    Itera ``make_iterator()`` en un hilo de ``executor`` (por defecto, el pool
+    de síntesis) y produce sus elementos en el event loop. Si el consumidor
+    deja de iterar, el hilo se detiene tras el fragmento en curso.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def deliver(item: Any, error: Exception = None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            stop.set()  # el event loop ya se cerró
+
+    def produce():
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    return
+                deliver(item)
+        except Exception as e:
+            deliver(_DONE, e)
+            return
+        deliver(_DONE)
+
+    loop.run_in_executor(executor or tts_executor(), produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+async def synthesize_in_order(sentences: AsyncIterator[Union[str, Tuple[str, Synthesizer]]],
+                              synthesize: Synthesizer,
+                              max_parallel: int = 3) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Sintetiza cada frase según llega, con hasta ``max_parallel`` síntesis a la
+    vez, y produce el audio en el orden de las frases. Una frase puede ser un
+    par (texto, síntesis) para usar otra síntesis (p. ej. otra voz) en ese
+    segmento. Eventos:
+
+    - {"type": "sentence", "index", "text"} al empezar cada segmento
+    - {"type": "audio", "index", "chunk"} con sus fragmentos (los del segmento
+      en reproducción se entregan según llegan; los siguientes, al llegarle
+      su turno)
+    - {"type": "audio_error", "index", "error"} si falla su síntesis
+
+    Si el consumidor deja de iterar, las síntesis en curso se cancelan y se
+    esperan antes de salir.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    segments: asyncio.Queue = asyncio.Queue()
+    workers: List[asyncio.Task] = []
+
+    async def render(text: str, speak: Synthesizer, chunks: asyncio.Queue):
+        try:
+            async with semaphore:
+                async for chunk in speak(text):
+                    chunks.put_nowait(chunk)
+        except Exception as e:
+            logger.error(f"Error sintetizando frase: {e}")
+            chunks.put_nowait(e)
+        finally:
+            chunks.put_nowait(_DONE)
+
+    async def dispatch():
+        try:
+            async for sentence in sentences:
+                text, speak = sentence if isinstance(sentence, tuple) else (sentence, synthesize)
+                chunks: asyncio.Queue = asyncio.Queue()
+                workers.append(asyncio.ensure_future(render(text, speak, chunks)))
+                segments.put_nowait((text, chunks))
+        finally:
+            segments.put_nowait(_DONE)
+
+    dispatcher = asyncio.ensure_future(dispatch())
+    try:
+        index = 0
+        while True:
+            segment = await segments.get()
+            if segment is _DONE:
+                await dispatcher  # propaga el error del texto de origen, si lo hubo
+                return
+            text, chunks = segment
+            yield {"type": "sentence", "index": index, "text": text}
+            while True:
+                chunk = await chunks.get()
+                if chunk is _DONE:
+                    break
+                if isinstance(chunk, Exception):
+                    yield {"type": "audio_error", "index": index, "error": str(chunk)}
+                else:
+                    yield {"type": "audio", "index": index, "chunk": chunk}
+            index += 1
+    finally:
+        dispatcher.cancel()
+        for worker in workers:
+            worker.cancel()
+        # Se espera a que terminen de cancelarse antes de salir
+        await asyncio.gather(dispatcher, *workers, return_exceptions=True)
+
+
+class AudioStore:
+    """
+    Almacén local de audios generados.
+
+    ``save_in_background`` escribe el fichero en un hilo auxiliar; las
+    escrituras pendientes se pueden esperar con ``drain`` (p. ej. al apagar).
+    """
+
+    def __init__(self, directory: str = ".", base_url: str = "https://cdn.nexus-ai.com/audio"):
+        self.directory = directory
+        self.base_url = base_url
+        self._pending: Set[asyncio.Task] = set()
+        self.saved = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "AudioStore":
+        return cls(directory=os.getenv('AUDIO_STORAGE_PATH', '.'))
+
+    @staticmethod
+    def new_filename() -> str:
+        # El sufijo evita colisiones entre audios guardados en el mismo instante
+        return f"audio_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}.mp3"
+
+    def url(self, filename: str) -> str:
+        # En producción, subiría a CDN y devolvería su URL
+        return f"{self.base_url}/{filename}"
+
+    def save_in_background(self, filename: str, chunks: List[bytes]) -> asyncio.Task:
+        """Programa la escritura del audio sin esperarla."""
+        task = asyncio.ensure_future(asyncio.to_thread(self._write, filename, b"".join(chunks)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    def _write(self, filename: str, audio: bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, filename), "wb") as f:
+                f.write(audio)
+            self.saved += 1
+            logger.info(f"Audio guardado: {filename}")
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error guardando audio {filename}: {e}")
+
+    async def drain(self):
+        """Espera a que terminen las escrituras pendientes."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+
+class SpeechStats:
+    """Tiempo hasta el primer byte, duración y tamaño de las síntesis recientes."""
+
+    def __init__(self, samples: int = 1000):
+        self.streams = 0
+        self.errors = 0
+        self.bytes = 0
+        self._first_byte: Deque[float] = deque(maxlen=samples)
+        self._total: Deque[float] = deque(maxlen=samples)
+
+    def record(self, first_byte: float, total: float, size: int):
+        self.streams += 1
+        self.bytes += size
+        if first_byte is not None:
+            self._first_byte.append(first_byte)
+        self._total.append(total)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Percentiles (ms) del primer byte y de la síntesis completa."""
+        stats = {"streams": self.streams, "errors": self.errors, "bytes": self.bytes}
+        for name, samples in (("first_byte", self._first_byte), ("total", self._total)):
+            times = sorted(samples)
+            stats[f"{name}_p50_ms"] = times[len(times) // 2] * 1000 if times else 0.0
+            stats[f"{name}_p99_ms"] = (
+                times[min(len(times) - 1, int(0.99 * len(times)))] * 1000 if times else 0.0
+            )
+        return stats
+
+
+class SpeechTimer:
+    """Cronómetro de una síntesis: marca el primer fragmento y acumula bytes."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_byte = None
+        self.size = 0
+
+    def chunk(self, data: bytes):
+        if self.first_byte is None:
+            self.first_byte = time.perf_counter() - self.start
+        self.size += len(data)
+
+    def finish(self, stats: SpeechStats):
+        stats.record(self.first_byte, time.perf_counter() - self.start, self.size)
+
+
+class AudioCache:
+    """
+    Caché de audios sintetizados, direccionada por contenido.
+
+    La clave es el hash del texto, la voz, el modelo y los ajustes de voz. El
+    nivel en memoria es un LRU de hasta ``max_memory_bytes``; con ``path`` se
+    añade un nivel en SQLite de hasta ``max_disk_bytes`` que sobrevive a los
+    reinicios, desaloja los audios usados hace más tiempo y rellena la memoria
+    al acertar. Cada audio caduca a los ``ttl`` segundos (0 no guarda).
+
+    ``get`` y ``put`` son corrutinas: el nivel en memoria se consulta en el
+    event loop y el acceso a SQLite corre en un hilo (``asyncio.to_thread``)
+    con la conexión protegida por un candado. La ocupación en disco se lleva
+    en memoria, sin recorrer la tabla en cada escritura.
+    """
+
+    def __init__(self, max_memory_bytes: int = 32 * 2**20, max_disk_bytes: int = 512 * 2**20,
+                 ttl: float = 3600.0, path: str = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.path = path
+        # key -> (caduca_en, audio, caracteres del texto)
+        self._entries: "OrderedDict[str, Tuple[float, bytes, int]]" = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_characters": 0}
+        self._pending: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.connection = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS audio_cache ("
+                "key TEXT PRIMARY KEY, audio BLOB NOT NULL, characters INTEGER NOT NULL, "
+                "size INTEGER NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS audio_cache_last_used ON audio_cache (last_used)")
+            self.disk_bytes = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM audio_cache"
+            ).fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> Optional["AudioCache"]:
+        """Caché según CACHE_ENABLED, AUDIO_CACHE_TTL y AUDIO_CACHE_PATH (None si está desactivada)."""
+        if os.getenv('CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        # AUDIO_CACHE_PATH vacío deja solo el nivel en memoria
+        path = os.getenv('AUDIO_CACHE_PATH', 'audio_cache.db')
+        return cls(
+            max_memory_bytes=int(os.getenv('AUDIO_CACHE_MEMORY_MB', '32')) * 2**20,
+            max_disk_bytes=int(os.getenv('AUDIO_CACHE_DISK_MB', '512')) * 2**20,
+            ttl=float(os.getenv('AUDIO_CACHE_TTL', '3600')),
+            path=path or None
+        )
+
+    @staticmethod
+    def key(text: str, voice_id: str, model: str, settings: Dict[str, Any]) -> str:
+        """Hash estable de una síntesis."""
+        payload = json.dumps({"text": text, "voice_id": voice_id, "model": model, "settings": settings},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Audio guardado para ``key``, o None si no existe o ha caducado."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["saved_characters"] += entry[2]
+                return entry[1]
+            self._forget(key)
+
+        if self.connection is not None:
+            entry = await asyncio.to_thread(self._load, key, now)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats["disk_hits"] += 1
+                self.stats["saved_characters"] += entry[2]
+                return entry[1]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, audio: bytes, characters: int = 0):
+        """Guarda el audio de una síntesis de ``characters`` caracteres."""
+        task = self.put_in_background(key, audio, characters)
+        if task is not None:
+            await task
+
+    def put_in_background(self, key: str, audio: bytes, characters: int = 0) -> Optional[asyncio.Task]:
+        """Guarda el audio en memoria y programa la escritura en disco sin esperarla."""
+        if self.ttl <= 0 or not audio:
+            return None
+        now = time.time()
+        entry = (now + self.ttl, audio, characters)
+        self._remember(key, entry)
+        if self.connection is None:
+            return None
+        task = asyncio.ensure_future(asyncio.to_thread(self._store, key, entry, now))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def drain(self):
+        """Espera a que terminen las escrituras pendientes."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def _remember(self, key: str, entry: Tuple[float, bytes, int]):
+        self._forget(key)
+        self._entries[key] = entry
+        self.memory_bytes += len(entry[1])
+        while self.memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            self._forget(next(iter(self._entries)))
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= len(entry[1])
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, bytes, int]]:
+        """Lee un audio del nivel en disco (en un hilo); borra la fila si ha caducado."""
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT expires_at, audio, characters, size FROM audio_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self.connection.execute("DELETE FROM audio_cache WHERE key = ?", (key,))
+                self.disk_bytes -= row[3]
+                return None
+            self.connection.execute("UPDATE audio_cache SET last_used = ? WHERE key = ?", (now, key))
+            return row[0], bytes(row[1]), row[2]
+
+    def _store(self, key: str, entry: Tuple[float, bytes, int], now: float):
+        """Escribe un audio en el nivel en disco (en un hilo) y aplica el límite de tamaño."""
+        expires_at, audio, characters = entry
+        with self._lock:
+            disk_bytes = self.disk_bytes
+            try:
+                with self.connection:
+                    previous = self.connection.execute(
+                        "SELECT size FROM audio_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO audio_cache VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, audio, characters, len(audio), expires_at, now)
+                    )
+                    self.disk_bytes += len(audio) - (previous[0] if previous else 0)
+                    if self.disk_bytes > self.max_disk_bytes:
+                        self._trim_disk(now)
+            except sqlite3.Error as e:
+                self.disk_bytes = disk_bytes  # la transacción se ha deshecho
+                logger.error(f"Error guardando audio en la caché: {e}")
+
+    def _trim_disk(self, now: float):
+        """Borra los audios caducados y, si aún se supera el límite, los usados hace más tiempo."""
+        expired = self.connection.execute(
+            "SELECT key, size FROM audio_cache WHERE expires_at <= ?", (now,)
+        ).fetchall()
+        evicted = [(key,) for key, _ in expired]
+        self.disk_bytes -= sum(size for _, size in expired)
+        if self.disk_bytes > self.max_disk_bytes:
+            expired_keys = {key for key, _ in expired}
+            for key, size in self.connection.execute("SELECT key, size FROM audio_cache ORDER BY last_used"):
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+                if key in expired_keys:
+                    continue
+                evicted.append((key,))
+                self.disk_bytes -= size
+        self.connection.executemany("DELETE FROM audio_cache WHERE key = ?", evicted)
+
+    def clear(self):
+        """Vacía ambos niveles."""
+        self._entries.clear()
+        self.memory_bytes = 0
+        if self.connection is not None:
+            with self._lock, self.connection:
+                self.connection.execute("DELETE FROM audio_cache")
+                self.disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aciertos por nivel, caracteres no sintetizados y ocupación."""
+        stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["entries"] = len(self._entries)
+        stats["memory_bytes"] = self.memory_bytes
+        if self.connection is not None:
+            stats["disk_bytes"] = self.disk_bytes
+        return stats
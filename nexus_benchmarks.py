@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de Nexus
+===================
+
+Mediciones de rendimiento de los componentes de Nexus sobre datos sintéticos.
+No requieren credenciales ni acceso a red.
+
+Uso:
+    python nexus_benchmarks.py search
+    python nexus_benchmarks.py semantic   # requiere NumPy
+    python nexus_benchmarks.py persistence
+    python nexus_benchmarks.py memory
+    python nexus_benchmarks.py dev          # LLM simulado, sin red
+    python nexus_benchmarks.py pipeline     # LLM simulado, sin red
+    python nexus_benchmarks.py startup      # importación y arranque en frío
+    python nexus_benchmarks.py voice        # turno de voz con LLM simulado, sin red
+    python nexus_benchmarks.py tts          # síntesis de voz simulada: primer byte
+    python nexus_benchmarks.py voice_pipeline  # respuesta y síntesis por frases
+"""
+
+import sys
+import json
+import subprocess
+import time
+import asyncio
+import random
+import logging
+from typing import Dict, List, Tuple
+
+from nexus_search import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+_VOCABULARY = [
+    "endpoint", "usuarios", "autenticacion", "sesiones", "jwt", "factura",
+    "presupuesto", "onboarding", "mockup", "demo", "lead", "ticket", "jira",
+    "slack", "reunion", "sprint", "backend", "frontend", "metricas", "reporte",
+    "deploy", "bug", "regresion", "cliente", "contrato", "roadmap", "api",
+    "base", "datos", "migracion", "cache", "latencia", "seguridad", "pagos",
+]
+
+
+def _synthetic_documents(count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """Genera documentos sintéticos con un vocabulario de cola larga (Zipf)."""
+    rng = random.Random(seed)
+    vocabulary = _VOCABULARY + [f"termino{i}" for i in range(5_000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    documents = []
+    for i in range(count):
+        words = rng.choices(vocabulary, weights=weights, k=20)
+        # Término raro por documento para simular nombres propios e IDs
+        words.append(f"proyecto{rng.randint(0, count // 10 + 1)}")
+        documents.append((f"doc_{i}", " ".join(words)))
+    return documents
+
+
+def _time_queries(run, queries: List[str], repeat: int = 3) -> float:
+    """Tiempo medio por consulta en milisegundos."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            run(query)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+def bench_search(sizes: List[int] = None) -> List[Dict[str, float]]:
+    """Compara el índice invertido con el escaneo lineal a distintos tamaños."""
+    sizes = sizes or [1_000, 10_000, 100_000]
+    queries = ["proyecto7 termino900", "proyecto42", "termino3100 termino4500 proyecto3"]
+    rows = []
+
+    for size in sizes:
+        documents = _synthetic_documents(size)
+        index = InvertedIndex()
+        start = time.perf_counter()
+        for doc_id, text in documents:
+            index.add(doc_id, text)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def linear(query: str):
+            query_lower = query.lower()
+            return [doc_id for doc_id, text in documents if query_lower in text.lower()]
+
+        rows.append({
+            "items": size,
+            "build_ms": build_ms,
+            "linear_ms": _time_queries(linear, queries),
+            "indexed_ms": _time_queries(lambda q: index.top_k(q, 10), queries),
+        })
+
+    print(f"{'items':>10} {'build (ms)':>12} {'lineal (ms)':>12} {'índice (ms)':>12}")
+    for row in rows:
+        print(f"{row['items']:>10} {row['build_ms']:>12.1f} "
+              f"{row['linear_ms']:>12.3f} {row['indexed_ms']:>12.3f}")
+    return rows
+
+
+def bench_semantic(sizes: List[int] = None, dimension: int = 128) -> List[Dict[str, float]]:
+    """
+    Compara búsqueda exacta e IVF sobre vectores agrupados sintéticos.
+
+    Los vectores se generan directamente (sin embeber texto) para poder llegar
+    al millón de elementos en segundos; el recall se mide contra la búsqueda exacta.
+    """
+    import numpy as np
+    from nexus_vector import FlatIndex, IVFIndex, _normalize_rows
+
+    sizes = sizes or [100_000, 1_000_000]
+    rng = np.random.default_rng(0)
+    rows = []
+
+    for size in sizes:
+        centers = _normalize_rows(rng.standard_normal((512, dimension)).astype(np.float32))
+        labels = rng.integers(0, len(centers), size)
+        matrix = centers[labels] + 0.05 * rng.standard_normal((size, dimension)).astype(np.float32)
+        matrix = _normalize_rows(matrix)
+        active = np.ones(size, dtype=bool)
+        queries = matrix[rng.choice(size, 20, replace=False)]
+
+        ivf = IVFIndex(n_lists=int(4 * size ** 0.5), nprobe=16, train_threshold=0)
+        start = time.perf_counter()
+        ivf.train(matrix)
+        train_ms = (time.perf_counter() - start) * 1000
+
+        flat = FlatIndex()
+        exact = [set(flat.search(matrix, active, q, 10)[1].tolist()) for q in queries]
+        approximate = [set(ivf.search(matrix, active, q, 10)[1].tolist()) for q in queries]
+        recall = sum(len(e & a) for e, a in zip(exact, approximate)) / (10 * len(queries))
+
+        query_list = list(range(len(queries)))
+        rows.append({
+            "items": size,
+            "train_ms": train_ms,
+            "flat_ms": _time_queries(lambda i: flat.search(matrix, active, queries[i], 10), query_list),
+            "ivf_ms": _time_queries(lambda i: ivf.search(matrix, active, queries[i], 10), query_list),
+            "recall": recall,
+        })
+
+    print(f"{'items':>10} {'train (ms)':>12} {'exacta (ms)':>12} {'IVF (ms)':>10} {'recall@10':>10}")
+    for row in rows:
+        print(f"{row['items']:>10} {row['train_ms']:>12.0f} {row['flat_ms']:>12.2f} "
+              f"{row['ivf_ms']:>10.2f} {row['recall']:>10.2f}")
+    return rows
+
+
+def bench_persistence(size: int = 20_000) -> Dict[str, float]:
+    """Mide escritura, reapertura en frío y primera consulta de SQLiteMemoryStore."""
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+    from nexus_core import ContextItem
+    from nexus_persistence import SQLiteMemoryStore
+
+    logging.getLogger("nexus_core").setLevel(logging.WARNING)
+    logging.getLogger("nexus_persistence").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench_memory.db")
+        store = SQLiteMemoryStore(path)
+        start_time = datetime(2024, 1, 1)
+        start = time.perf_counter()
+        for i, (doc_id, text) in enumerate(_synthetic_documents(size)):
+            store.add_context(ContextItem(
+                id=doc_id, type="conversation", content=text, source="slack",
+                timestamp=start_time + timedelta(seconds=i),
+                metadata={"conversation_id": f"canal{i % 50}", "participants": [f"user{i % 200}"]},
+                importance_score=0.7
+            ))
+        write_ms = (time.perf_counter() - start) * 1000
+        store.close()
+
+        start = time.perf_counter()
+        store = SQLiteMemoryStore(path)
+        reopen_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        store.search_context("proyecto42 termino900")
+        first_query_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        store.query_context(conversation_id="canal7", participant="user7", limit=20)
+        filter_ms = (time.perf_counter() - start) * 1000
+        store.close()
+
+    result = {"items": size, "write_ms": write_ms, "reopen_ms": reopen_ms,
+              "first_query_ms": first_query_ms, "filter_ms": filter_ms}
+    print(f"items={size} escritura={write_ms:.0f} ms reapertura={reopen_ms:.1f} ms "
+          f"primera búsqueda={first_query_ms:.1f} ms filtro={filter_ms:.1f} ms")
+    return result
+
+
+def _slack_events(count: int) -> List[Tuple[int, int, str, float]]:
+    """Eventos sintéticos de Slack: (canal, usuario, texto, timestamp)."""
+    start_time = 1_704_067_200.0
+    return [
+        (i % 40, i % 300, f"mensaje {i} sobre el sprint y el endpoint de usuarios", start_time + i)
+        for i in range(count)
+    ]
+
+
+def _context_fields(event: Tuple[int, int, str, float]) -> Dict[str, object]:
+    """Campos de ContextItem como los construye add_conversation_context."""
+    from datetime import datetime
+
+    channel_number, user_number, text, timestamp = event
+    # Los identificadores llegan como cadenas nuevas en cada evento
+    channel = f"C0{channel_number:04d}"
+    return {
+        "id": f"conv_slack_{channel}_{timestamp}",
+        "type": "conversation",
+        "content": text,
+        "source": "slack",
+        "timestamp": datetime.fromtimestamp(timestamp),
+        "metadata": {"participants": [f"U0{user_number:05d}"], "conversation_id": channel,
+                     "event_type": "message"},
+        "importance_score": 0.7,
+    }
+
+
+def _measure_bytes(build) -> Tuple[int, object]:
+    """Bytes asignados (tracemalloc) por la estructura que devuelve ``build``."""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def bench_memory(size: int = 100_000) -> Dict[str, float]:
+    """Bytes por elemento de ContextItem frente a CompactContextItem."""
+    from nexus_core import ContextItem, ContextColumns, CompactContextItem, MemoryStore
+
+    logging.getLogger("nexus_core").setLevel(logging.WARNING)
+    # Los textos se generan fuera de la medición: ambas representaciones los comparten
+    events = _slack_events(size)
+
+    def build_plain():
+        return [ContextItem(**_context_fields(event)) for event in events]
+
+    def build_compact():
+        columns = ContextColumns()
+        return [CompactContextItem(**_context_fields(event), columns=columns) for event in events]
+
+    def build_store(compact: bool):
+        def build():
+            store = MemoryStore(compact=compact)
+            for event in events:
+                store.add_context(ContextItem(**_context_fields(event)))
+            return store
+        return build
+
+    plain_bytes, _ = _measure_bytes(build_plain)
+    compact_bytes, _ = _measure_bytes(build_compact)
+    store_bytes, _ = _measure_bytes(build_store(False))
+    compact_store_bytes, _ = _measure_bytes(build_store(True))
+
+    result = {
+        "items": size,
+        "plain_bytes_per_item": plain_bytes / size,
+        "compact_bytes_per_item": compact_bytes / size,
+        "store_bytes_per_item": store_bytes / size,
+        "compact_store_bytes_per_item": compact_store_bytes / size,
+    }
+    print(f"items={size}")
+    print(f"  ContextItem:            {result['plain_bytes_per_item']:8.0f} bytes/elemento")
+    print(f"  CompactContextItem:     {result['compact_bytes_per_item']:8.0f} bytes/elemento")
+    print(f"  MemoryStore():          {result['store_bytes_per_item']:8.0f} bytes/elemento")
+    print(f"  MemoryStore(compact):   {result['compact_store_bytes_per_item']:8.0f} bytes/elemento")
+    return result
+
+
+class _SimulatedLLM:
+    """
+    Sustituto de LLMClient con latencia fija por llamada.
+
+    Cuenta llamadas y caracteres de prompt enviados, y devuelve respuestas
+    válidas para los prompts de NexusDevAgent.
+    """
+
+    def __init__(self, latency: float = 0.2, decomposition_agent: str = "NexusDev"):
+        self.latency = latency
+        self.decomposition_agent = decomposition_agent
+        self.calls = 0
+        self.prompt_chars = 0
+
+    async def complete(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        await asyncio.sleep(self.latency)
+        if "descomponer el siguiente comando" in prompt:
+            return json.dumps({"tasks": [{"id": "t1", "description": "Implementar el módulo",
+                                          "agent_type": self.decomposition_agent,
+                                          "priority": 1, "dependencies": []}]})
+        analysis = {"language": "python", "framework": "flask", "type": "endpoint",
+                    "requirements": ["jwt"], "dependencies": ["flask"]}
+        artifact = {"endpoint_code": "def login(): ...", "test_code": "def test_login(): ...",
+                    "code": "def main(): ...", "documentation": "POST /login",
+                    "dependencies": ["flask"], "setup_instructions": "pip install flask"}
+        if '"artifact"' in prompt:
+            return json.dumps({"analysis": analysis, "artifact": artifact})
+        if "extrae los requisitos técnicos" in prompt:
+            return json.dumps(analysis)
+        return json.dumps(artifact)
+
+    async def complete_stream(self, prompt: str, **kwargs):
+        yield await self.complete(prompt, **kwargs)
+
+
+def bench_dev(tasks_per_kind: int = 5, latency: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """Compara los modos fused y two_step de NexusDevAgent con un LLM simulado."""
+    from datetime import datetime
+    from nexus_core import AgentType, MemoryStore, Task
+    from nexus_agents import NexusDevAgent
+
+    logging.getLogger("nexus_core").setLevel(logging.WARNING)
+    logging.getLogger("nexus_agents").setLevel(logging.WARNING)
+    descriptions = ["Crear endpoint de login con JWT", "Escribir tests del carrito",
+                    "Refactorizar el módulo de facturas"]
+    tasks = [
+        Task(id=f"dev_{kind}_{i}", description=description, agent_type=AgentType.NEXUS_DEV,
+             priority=1, status="pending", created_at=datetime.now())
+        for kind, description in enumerate(descriptions) for i in range(tasks_per_kind)
+    ]
+
+    rows = {}
+    for mode in ("two_step", "fused"):
+        llm = _SimulatedLLM(latency)
+        agent = NexusDevAgent(AgentType.NEXUS_DEV, MemoryStore(), llm, mode=mode)
+
+        async def run_all():
+            for task in tasks:
+                await agent.execute_task(task)
+
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows[mode] = {
+            "ms_per_task": elapsed_ms / len(tasks),
+            "calls_per_task": llm.calls / len(tasks),
+            "prompt_chars_per_task": llm.prompt_chars / len(tasks),
+            "fallbacks": agent.stats["fused_fallbacks"],
+        }
+
+    print(f"latencia simulada por llamada: {latency * 1000:.0f} ms, {len(tasks)} tareas")
+    print(f"{'modo':>10} {'ms/tarea':>10} {'llamadas':>10} {'chars prompt':>13} {'fallbacks':>10}")
+    for mode, row in rows.items():
+        print(f"{mode:>10} {row['ms_per_task']:>10.0f} {row['calls_per_task']:>10.1f} "
+              f"{row['prompt_chars_per_task']:>13.0f} {row['fallbacks']:>10}")
+    return rows
+
+
+def bench_pipeline(commands: int = 5, latency: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """
+    Tiempo hasta el primer resultado y total, secuencial frente a pipeline.
+
+    El comando no es concluyente para el enrutador (NexusDev con NexusAnalyst
+    como alternativa), así que pasa por la descomposición; con
+    ``decomposition_agent`` distinto de NexusDev la especulación se descarta.
+    """
+    from nexus_core import NexusOrchestrator, MemoryStore
+
+    for name in ("nexus_core", "nexus_agents", "nexus_concurrency"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    command = "Implementación con debugging del módulo de reportes"
+
+    rows = {}
+    for label, pipelined, agent in (("secuencial", False, "NexusDev"),
+                                    ("pipeline", True, "NexusDev"),
+                                    ("pipeline (descarta)", True, "NexusAnalyst")):
+        llm = _SimulatedLLM(latency, decomposition_agent=agent)
+        orchestrator = NexusOrchestrator(MemoryStore(), llm=llm, pipelined=pipelined)
+
+        async def run_all():
+            timings = []
+            for _ in range(commands):
+                result = await orchestrator.process_natural_language_command(command)
+                timings.append(result["timings"])
+            return timings
+
+        timings = asyncio.run(run_all())
+        rows[label] = {
+            "first_result_ms": 1000 * sum(t["time_to_first_result"] for t in timings) / commands,
+            "total_ms": 1000 * sum(t["total"] for t in timings) / commands,
+            "calls_per_command": llm.calls / commands,
+        }
+
+    print(f"latencia simulada por llamada: {latency * 1000:.0f} ms")
+    print(f"{'modo':>20} {'1er resultado (ms)':>19} {'total (ms)':>11} {'llamadas':>9}")
+    for label, row in rows.items():
+        print(f"{label:>20} {row['first_result_ms']:>19.0f} {row['total_ms']:>11.0f} "
+              f"{row['calls_per_command']:>9.1f}")
+    return rows
+
+
+_VOICE_TURNS = [
+    ("nexus_dev", "I get an error when the system starts"),
+    ("nexus_hr", "What is the pricing for the enterprise plan?"),
+    ("nexus_sales", "Can you help me with an issue in my account?"),
+    ("nexus_support", "I need a report with the metrics of last week"),
+    ("nexus_dev", "Thanks, that was useful"),
+]
+
+
+def bench_voice(turns: int = 10, latency: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """
+    Latencia por turno de voz (sin TTS): análisis de transferencia más
+    respuesta del agente, con el análisis hecho por el orquestador completo
+    (como antes) o por el clasificador local de nexus_voice_intents.
+    """
+    from nexus_core import NexusOrchestrator, MemoryStore
+    from nexus_voice_intents import DEFAULT_TRANSFER_RULES, TransferClassifier
+
+    for name in ("nexus_core", "nexus_agents", "nexus_concurrency"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+
+    rows = {}
+    for label in ("orquestador", "clasificador"):
+        llm = _SimulatedLLM(latency)
+        orchestrator = NexusOrchestrator(MemoryStore(), llm=llm)
+
+        async def analyze(message: str, agent: str):
+            if label == "orquestador":
+                await orchestrator.process_natural_language_command(
+                    f"Analiza esta consulta y determina qué agente especializado la manejaría mejor: {message}",
+                    {"current_agent": agent}
+                )
+            return classifier.classify(message, agent)
+
+        async def run_all():
+            analysis = response = 0.0
+            for turn in range(turns):
+                agent, message = _VOICE_TURNS[turn % len(_VOICE_TURNS)]
+                start = time.perf_counter()
+                transfer = await analyze(message, agent)
+                analyzed = time.perf_counter()
+                await orchestrator.process_natural_language_command(
+                    f"Eres {transfer.get('target_agent', agent)}. Usuario dice: {message}"
+                )
+                analysis += analyzed - start
+                response += time.perf_counter() - analyzed
+            return analysis, response
+
+        analysis, response = asyncio.run(run_all())
+        rows[label] = {
+            "analysis_ms": 1000 * analysis / turns,
+            "response_ms": 1000 * response / turns,
+            "turn_ms": 1000 * (analysis + response) / turns,
+            "calls_per_turn": llm.calls / turns,
+        }
+
+    print(f"latencia simulada por llamada: {latency * 1000:.0f} ms, {turns} turnos")
+    print(f"{'análisis':>13} {'análisis (ms)':>14} {'respuesta (ms)':>15} {'turno (ms)':>11} {'llamadas':>9}")
+    for label, row in rows.items():
+        print(f"{label:>13} {row['analysis_ms']:>14.3f} {row['response_ms']:>15.0f} "
+              f"{row['turn_ms']:>11.0f} {row['calls_per_turn']:>9.1f}")
+    return rows
+
+
+def _simulated_tts(chunks: int = 20, first_chunk: float = 0.15, per_chunk: float = 0.02,
+                   chunk_size: int = 2048):
+    """Iterador bloqueante con el ritmo de generate(..., stream=True) de ElevenLabs."""
+    time.sleep(first_chunk)
+    for position in range(chunks):
+        if position:
+            time.sleep(per_chunk)
+        yield bytes(chunk_size)
+
+
+def bench_tts(utterances: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Tiempo hasta el primer byte y bloqueo del event loop por síntesis: la
+    llamada bloqueante anterior (audio completo y escritura en disco dentro del
+    event loop) frente a iterate_in_thread con guardado en segundo plano.
+    """
+    import tempfile
+    from nexus_audio import AudioStore, SpeechStats, SpeechTimer, iterate_in_thread
+
+    logging.getLogger("nexus_audio").setLevel(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix="nexus_tts_")
+
+    async def heartbeat(lags: List[float], stop: asyncio.Event, interval: float = 0.005):
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def blocking(store: AudioStore, stats: SpeechStats):
+        timer = SpeechTimer()
+        audio = b"".join(_simulated_tts())
+        store._write(store.new_filename(), audio)
+        timer.chunk(audio)  # el cliente recibe el audio de una vez, ya guardado
+        timer.finish(stats)
+
+    async def streaming(store: AudioStore, stats: SpeechStats):
+        timer = SpeechTimer()
+        chunks = []
+        async for chunk in iterate_in_thread(_simulated_tts):
+            timer.chunk(chunk)
+            chunks.append(chunk)
+        timer.finish(stats)
+        store.save_in_background(store.new_filename(), chunks)
+
+    rows = {}
+    for label, synthesize in (("bloqueante", blocking), ("streaming", streaming)):
+        store, stats = AudioStore(directory), SpeechStats()
+
+        async def run_all():
+            lags: List[float] = []
+            stop = asyncio.Event()
+            beat = asyncio.ensure_future(heartbeat(lags, stop))
+            await asyncio.sleep(0)
+            for _ in range(utterances):
+                await synthesize(store, stats)
+            await store.drain()
+            stop.set()
+            await beat
+            return max(lags, default=0.0)
+
+        max_lag = asyncio.run(run_all())
+        summary = stats.get_stats()
+        rows[label] = {
+            "first_byte_ms": summary["first_byte_p50_ms"],
+            "total_ms": summary["total_p50_ms"],
+            "max_loop_lag_ms": 1000 * max_lag,
+        }
+
+    print(f"{utterances} síntesis simuladas de 20 fragmentos (150 ms al primero, 20 ms entre fragmentos)")
+    print(f"{'modo':>11} {'1er byte (ms)':>14} {'total (ms)':>11} {'bloqueo loop (ms)':>18}")
+    for label, row in rows.items():
+        print(f"{label:>11} {row['first_byte_ms']:>14.0f} {row['total_ms']:>11.0f} "
+              f"{row['max_loop_lag_ms']:>18.1f}")
+    return rows
+
+
+def bench_voice_pipeline(turns: int = 3, sentences: int = 4, sentence_delay: float = 0.3,
+                         parallelism: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Primer audio y duración de un turno de voz: respuesta completa y una sola
+    síntesis (process_message) frente a síntesis por frases según se genera
+    el texto (process_message_stream). El LLM produce una frase cada
+    ``sentence_delay`` segundos y la síntesis tarda 150 ms más 20 ms por
+    fragmento (5 fragmentos por frase).
+
+    En los turnos con transferencia, el anuncio se sintetiza antes de generar
+    la respuesta (secuencial) o a la vez, como primer segmento del audio
+    (pipeline).
+    """
+    from nexus_audio import SpeechStats, SpeechTimer, iterate_in_thread, synthesize_in_order
+    from nexus_llm import iter_sentences
+
+    text = [f"Esta es la frase número {position} de la respuesta. " for position in range(sentences)]
+
+    async def response_deltas():
+        for sentence in text:
+            await asyncio.sleep(sentence_delay)
+            yield sentence
+
+    def speak(sentence: str):
+        chunks = 5 * max(1, round(len(sentence) / len(text[0])))
+        return iterate_in_thread(lambda: _simulated_tts(chunks=chunks))
+
+    announcement = "Te transfiero a NexusSupport, especialista en soporte técnico. "
+
+    async def sequential(timer: SpeechTimer, transfer: bool):
+        if transfer:
+            # El audio del anuncio se entregaba completo, antes de generar la respuesta
+            audio = b"".join([chunk async for chunk in speak(announcement)])
+            timer.chunk(audio)
+        response = "".join([delta async for delta in response_deltas()])
+        async for chunk in speak(response):
+            timer.chunk(chunk)
+
+    async def pipelined(timer: SpeechTimer, transfer: bool):
+        async def segments():
+            if transfer:
+                yield announcement
+            async for sentence in iter_sentences(response_deltas()):
+                yield sentence
+
+        async for event in synthesize_in_order(segments(), speak, parallelism):
+            if event["type"] == "audio":
+                timer.chunk(event["chunk"])
+
+    rows = {}
+    for label, turn, transfer in (("secuencial", sequential, False), ("pipeline", pipelined, False),
+                                  ("transferencia secuencial", sequential, True),
+                                  ("transferencia pipeline", pipelined, True)):
+        stats = SpeechStats()
+
+        async def run_all():
+            for _ in range(turns):
+                timer = SpeechTimer()
+                await turn(timer, transfer)
+                timer.finish(stats)
+
+        asyncio.run(run_all())
+        summary = stats.get_stats()
+        rows[label] = {"first_audio_ms": summary["first_byte_p50_ms"], "turn_ms": summary["total_p50_ms"]}
+
+    print(f"{sentences} frases, una cada {sentence_delay * 1000:.0f} ms; hasta {parallelism} síntesis a la vez")
+    print(f"{'modo':>24} {'1er audio (ms)':>15} {'turno (ms)':>11}")
+    for label, row in rows.items():
+        print(f"{label:>24} {row['first_audio_ms']:>15.0f} {row['turn_ms']:>11.0f}")
+    return rows
+
+
+_STARTUP_PROBE = """
+import json, logging, time
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+import nexus_core
+imported = time.perf_counter()
+nexus = nexus_core.get_nexus()
+created = time.perf_counter()
+nexus.router
+ready = time.perf_counter()
+print(json.dumps({"import_ms": 1000 * (imported - start), "factory_ms": 1000 * (created - imported),
+                  "agents_ms": 1000 * (ready - created)}))
+"""
+
+
+def bench_startup(runs: int = 5) -> Dict[str, float]:
+    """
+    Arranque en frío en procesos nuevos: importar nexus_core, crear el
+    orquestador con get_nexus() y construir los agentes y el enrutador en el
+    primer comando (mediana de ``runs`` ejecuciones).
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    medians = {key: sorted(sample[key] for sample in samples)[runs // 2] for key in samples[0]}
+    for key, value in medians.items():
+        print(f"{key:>12}: {value:8.1f} ms")
+    return medians
+
+
+BENCHMARKS = {
+    "search": bench_search,
+    "semantic": bench_semantic,
+    "persistence": bench_persistence,
+    "memory": bench_memory,
+    "dev": bench_dev,
+    "pipeline": bench_pipeline,
+    "startup": bench_startup,
+    "voice": bench_voice,
+    "tts": bench_tts,
+    "voice_pipeline": bench_voice_pipeline,
+}
+
+
+def main():
+    """Ejecuta los benchmarks indicados por línea de comandos (todos por defecto)."""
+    logging.basicConfig(level=logging.INFO)
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            logger.error(f"Benchmark desconocido: {name}")
+            continue
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Control de Concurrencia de Nexus
+================================
+
+Pools acotados con cola de espera y rechazo de carga. El orquestador usa uno
+por tipo de agente, para no lanzar llamadas ilimitadas al proveedor de LLM,
+y otro de admisión para los comandos entrantes. Cada pool expone la
+profundidad de su cola y los tiempos de espera.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Awaitable, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class PoolFullError(Exception):
+    """La cola de un pool está llena y la petición se descarta."""
+    pass
+
+
+AGENT_CONCURRENCY_PREFIX = "NEXUS_AGENT_CONCURRENCY_"
+
+
+def _agent_key(agent_name: str) -> str:
+    """Nombre de agente normalizado: "NexusDev", "NEXUS_DEV" y "DEV" coinciden."""
+    key = re.sub(r"[^a-z0-9]", "", agent_name.lower())
+    return key[len("nexus"):] if key.startswith("nexus") and key != "nexus" else key
+
+
+@dataclass
+class ConcurrencyLimits:
+    """Límites de concurrencia del orquestador."""
+    agent_concurrency: int = 4  # llamadas simultáneas por tipo de agente
+    agent_queue_size: int = 32  # peticiones en espera por tipo de agente
+    per_agent: Dict[str, int] = field(default_factory=dict)  # {"NexusDev": 8, ...}
+    max_concurrent_commands: int = 16
+    command_queue_size: int = 64
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyLimits":
+        """
+        Lee los límites de las variables NEXUS_* (con los valores por defecto).
+        
+        El límite de un agente concreto se fija con
+        NEXUS_AGENT_CONCURRENCY_<AGENTE>, p. ej. NEXUS_AGENT_CONCURRENCY_NEXUS_DEV=8.
+        """
+        defaults = cls()
+        per_agent = {
+            name[len(AGENT_CONCURRENCY_PREFIX):]: int(value)
+            for name, value in os.environ.items()
+            if name.startswith(AGENT_CONCURRENCY_PREFIX) and value.strip()
+        }
+        return cls(
+            agent_concurrency=int(os.getenv('NEXUS_AGENT_CONCURRENCY', defaults.agent_concurrency)),
+            agent_queue_size=int(os.getenv('NEXUS_AGENT_QUEUE_SIZE', defaults.agent_queue_size)),
+            per_agent=per_agent,
+            max_concurrent_commands=int(os.getenv('NEXUS_MAX_CONCURRENT_COMMANDS',
+                                                  defaults.max_concurrent_commands)),
+            command_queue_size=int(os.getenv('NEXUS_COMMAND_QUEUE_SIZE', defaults.command_queue_size)),
+        )
+
+    def for_agent(self, agent_name: str) -> int:
+        key = _agent_key(agent_name)
+        for name, limit in self.per_agent.items():
+            if _agent_key(name) == key:
+                return limit
+        return self.agent_concurrency
+
+
+class BoundedPool:
+    """
+    Pool con un semáforo de ``max_concurrency`` plazas y una cola de espera
+    de hasta ``max_queue`` peticiones. Con la cola llena, las nuevas
+    peticiones se rechazan con PoolFullError en lugar de acumularse.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, wait_samples: int = 1000):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_times: deque = deque(maxlen=wait_samples)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Ocupa una plaza del pool mientras dura el bloque."""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Pool {self.name} saturado: {self.queued} peticiones en cola")
+            raise PoolFullError(f"{self.name} saturado, inténtalo más tarde")
+
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self._wait_times.append(time.perf_counter() - start)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def run(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecuta ``operation()`` dentro de una plaza del pool."""
+        async with self.slot():
+            return await operation()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Ocupación, cola y tiempos de espera (ms) del pool."""
+        waits = sorted(self._wait_times)
+
+        def percentile(fraction: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(fraction * len(waits)))] * 1000
+
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_p50_ms": percentile(0.5),
+            "wait_p99_ms": percentile(0.99),
+        }
@@ -19,22 +19,46 @@ Arquitectura:
 import os
 import json
 import logging
+import sys
+import math
 import asyncio
+import bisect
+import heapq
+import time
+import functools
+import threading
+from array import array
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Callable, Set, Tuple, Deque, AsyncIterator
+from collections import deque
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, asdict, field
 from enum import Enum
-import openai
-from dotenv import load_dotenv
+from nexus_search import InvertedIndex
+from nexus_concurrency import BoundedPool, ConcurrencyLimits
+from nexus_llm import LLMClient, get_llm_client
+from nexus_router import CapabilityRouter
+from nexus_prompts import SynthesisPromptBuilder, SynthesisPolicy, SynthesisDecision
 
-# Cargar variables de entorno
-load_dotenv()
+_environment_loaded = False
+
+
+def load_environment():
+    """Carga las variables del fichero .env (una sola vez por proceso)."""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def configure_logging(level: int = logging.INFO):
+    """Configura el logging del proceso; lo llaman los puntos de entrada, no los módulos."""
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class AgentType(Enum):
@@ -62,67 +86,638 @@ class ContextItem:
     metadata: Dict[str, Any]
     importance_score: float = 0.5
 
+class ContextColumns:
+    """
+    Columnas compartidas por los elementos de contexto compactos.
+    
+    importance_score y el timestamp (microsegundos desde epoch) se guardan en
+    arrays de tipos primitivos en lugar de como objetos float/datetime por
+    elemento. Las filas liberadas se reutilizan. Las tuplas de claves de
+    metadata también se comparten entre los elementos con la misma forma.
+    """
+    
+    def __init__(self):
+        self.importance = array('d')
+        self.epoch_us = array('q')
+        self.free_rows: List[int] = []
+        self.metadata_shapes: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.importance) - len(self.free_rows)
+    
+    def allocate(self, importance_score: float, epoch_us: int) -> int:
+        """Reserva una fila y devuelve su posición."""
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.importance[row] = importance_score
+            self.epoch_us[row] = epoch_us
+            return row
+        self.importance.append(importance_score)
+        self.epoch_us.append(epoch_us)
+        return len(self.importance) - 1
+    
+    def release(self, row: int):
+        """Marca una fila como reutilizable."""
+        self.free_rows.append(row)
+    
+    def shape(self, keys: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Tupla canónica (compartida) de claves de metadata."""
+        return self.metadata_shapes.setdefault(keys, keys)
+
+class _MetadataView(dict):
+    """
+    Metadata de un CompactContextItem como dict: las modificaciones se
+    escriben de vuelta en el elemento, igual que en un ContextItem.
+    """
+    
+    __slots__ = ("_owner",)
+    
+    def __init__(self, items=(), owner: "CompactContextItem" = None):
+        super().__init__(items)
+        self._owner = owner
+    
+    def _write_back(self):
+        if self._owner is not None:
+            self._owner.metadata = self
+    
+    def __reduce__(self):
+        # Las copias y el pickle producen un dict normal, desligado del elemento
+        return (dict, (dict(self),))
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._write_back()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._write_back()
+    
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._write_back()
+        return self
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._write_back()
+    
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._write_back()
+        return value
+    
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._write_back()
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        self._write_back()
+        return item
+    
+    def clear(self):
+        super().clear()
+        self._write_back()
+
+class CompactContextItem:
+    """
+    Representación compacta de un ContextItem.
+    
+    Usa __slots__, cadenas internadas para type/source/participantes y
+    almacena importance_score y timestamp en un ContextColumns compartido.
+    La metadata se guarda como una tupla de valores junto a una tupla de
+    claves compartida. Expone los mismos atributos que ContextItem
+    (timestamp y metadata se reconstruyen al leerlos; los cambios en el dict
+    de metadata se escriben de vuelta en el elemento).
+    """
+    
+    __slots__ = ("id", "type", "content", "source", "_metadata_keys", "_metadata_values",
+                 "_columns", "_row")
+    
+    def __init__(self, id: str, type: str, content: str, source: str,
+                 timestamp: datetime, metadata: Dict[str, Any],
+                 importance_score: float = 0.5, columns: ContextColumns = None):
+        self.id = id
+        self.type = sys.intern(type)
+        self.content = content
+        self.source = sys.intern(source)
+        self._columns = columns if columns is not None else ContextColumns()
+        self.metadata = metadata
+        self._row = self._columns.allocate(importance_score, int(timestamp.timestamp() * 1_000_000))
+    
+    @classmethod
+    def from_item(cls, context_item, columns: ContextColumns) -> "CompactContextItem":
+        """Crea la versión compacta de cualquier elemento con la API de ContextItem."""
+        return cls(
+            id=context_item.id,
+            type=context_item.type,
+            content=context_item.content,
+            source=context_item.source,
+            timestamp=context_item.timestamp,
+            metadata=context_item.metadata,
+            importance_score=context_item.importance_score,
+            columns=columns
+        )
+    
+    @property
+    def importance_score(self) -> float:
+        return self._columns.importance[self._row]
+    
+    @importance_score.setter
+    def importance_score(self, value: float):
+        self._columns.importance[self._row] = value
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return _MetadataView(zip(self._metadata_keys, self._metadata_values), self)
+    
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]):
+        keys, self._metadata_values = _compact_metadata(value)
+        self._metadata_keys = self._columns.shape(keys)
+    
+    @property
+    def epoch(self) -> float:
+        """Timestamp en segundos desde epoch, sin construir un datetime."""
+        return self._columns.epoch_us[self._row] / 1_000_000
+    
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch)
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._columns.epoch_us[self._row] = int(value.timestamp() * 1_000_000)
+    
+    def detach(self):
+        """Copia los valores columnares a columnas propias y libera la fila compartida."""
+        columns = ContextColumns()
+        row = columns.allocate(self.importance_score, self._columns.epoch_us[self._row])
+        self._columns.release(self._row)
+        self._columns, self._row = columns, row
+    
+    def to_item(self) -> ContextItem:
+        """Convierte a un ContextItem convencional."""
+        return ContextItem(
+            id=self.id,
+            type=self.type,
+            content=self.content,
+            source=self.source,
+            timestamp=self.timestamp,
+            metadata=dict(self.metadata),
+            importance_score=self.importance_score
+        )
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (ContextItem, CompactContextItem)):
+            return NotImplemented
+        return (self.id, self.type, self.content, self.source, self.timestamp,
+                dict(self.metadata), self.importance_score) == \
+               (other.id, other.type, other.content, other.source, other.timestamp,
+                dict(other.metadata), other.importance_score)
+    
+    def __repr__(self) -> str:
+        return (f"CompactContextItem(id={self.id!r}, type={self.type!r}, source={self.source!r}, "
+                f"timestamp={self.timestamp!r}, importance_score={self.importance_score!r})")
+
+def _compact_metadata(metadata: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+    """
+    (claves, valores) de la metadata, con claves y valores cortos internados;
+    las listas pasan a tuplas.
+    """
+    keys, values = [], []
+    for key, value in metadata.items():
+        if isinstance(value, str) and len(value) <= 64:
+            value = sys.intern(value)
+        elif isinstance(value, list):
+            value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+        keys.append(sys.intern(key))
+        values.append(value)
+    return tuple(keys), tuple(values)
+
 @dataclass
 class Task:
     """Tarea delegada a un agente especializado."""
     id: str
     description: str
     agent_type: AgentType
-    priority: int = 1
+    priority: int = 1  # 1 = máxima prioridad
     status: str = "pending"
     created_at: datetime = None
     completed_at: datetime = None
     result: Any = None
     error: str = None
+    dependencies: List[str] = field(default_factory=list)  # ids de tareas previas
+    dependency_results: Dict[str, Any] = field(default_factory=dict)
+    started_at: datetime = None
 
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
 
+def synchronized(method):
+    """Serializa el método con el cerrojo ``_lock`` del almacén."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class MemoryStore:
     """Almacén de memoria organizacional colectiva."""
     
-    def __init__(self):
+    # Peso de importance_score frente a la relevancia textual en las búsquedas
+    IMPORTANCE_WEIGHT = 0.3
+    
+    # Campos con índice hash secundario; los de metadata se leen de item.metadata
+    INDEXED_FIELDS = ("type", "source", "project_id", "conversation_id", "participants")
+    
+    # Días en los que la retención de un elemento de importancia 0 cae a 1/e;
+    # cuanto mayor es importance_score, más lento decae
+    RETENTION_DECAY_DAYS = 1.0
+    # Elementos duraderos: solo se desalojan cuando no queda ningún otro
+    # candidato, sea cual sea su antigüedad, y solo si hay nivel frío que los
+    # conserve; sin él, la memoria puede superar el presupuesto antes que perderlos
+    DURABLE_IMPORTANCE = 0.9
+    DURABLE_TYPES = ("decision",)
+    # Retención por debajo de la cual un elemento se considera olvidado
+    RETENTION_FLOOR = 0.01
+    # Coste fijo estimado por elemento residente (objeto, dicts e índices)
+    ITEM_OVERHEAD_BYTES = 600
+    
+    def __init__(self, semantic_backend=None, max_items: int = None,
+                 max_bytes: int = None, cold_store: "MemoryStore" = None,
+                 max_history: int = None, compact: bool = False):
         self.context_items: Dict[str, ContextItem] = {}
-        self.conversation_history: List[Dict[str, Any]] = []
-        self.decisions: List[Dict[str, Any]] = []
-        self.documents: List[Dict[str, Any]] = []
+        self.conversation_history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        # Las decisiones son duraderas: max_history no las recorta
+        self.decisions: Deque[Dict[str, Any]] = deque()
+        self.documents: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self.search_index = InvertedIndex()
+        # Backend opcional de búsqueda por embeddings (ver nexus_vector.SemanticBackend)
+        self.semantic_backend = semantic_backend
+        # Índices secundarios: campo -> valor -> ids, y (timestamp, id) ordenado
+        self.field_indexes: Dict[str, Dict[Any, Set[str]]] = {
+            field: {} for field in self.INDEXED_FIELDS
+        }
+        self.timeline: List[Tuple[float, str]] = []
+        # Presupuesto de memoria residente (por elementos y/o bytes estimados).
+        # Los elementos desalojados pasan a cold_store si existe (p. ej. un
+        # SQLiteMemoryStore) y vuelven a memoria cuando una búsqueda los encuentra
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.cold_store = cold_store
+        self.resident_bytes = 0
+        self.item_bytes: Dict[str, int] = {}
+        self.access_counts: Dict[str, int] = {}
+        # Orden de desalojo: montículo de (clave, id) con invalidación perezosa;
+        # una entrada es válida si su clave coincide con eviction_keys[id]
+        self.eviction_keys: Dict[str, Tuple[int, float]] = {}
+        self._eviction_heap: List[Tuple[Tuple[int, float], str]] = []
+        self._protected: Set[str] = set()
+        self.stats = {"hot_hits": 0, "cold_hits": 0, "evictions": 0, "promotions": 0,
+                      "durable_over_budget": 0}
+        # Con compact=True los elementos se guardan como CompactContextItem
+        self.columns: Optional[ContextColumns] = ContextColumns() if compact else None
+        # Las búsquedas pueden ejecutarse en un hilo auxiliar (modo pipeline del orquestador)
+        self._lock = threading.RLock()
     
+    @synchronized
     def add_context(self, context_item: ContextItem):
         """Añade un elemento de contexto a la memoria."""
+        if self.columns is not None and getattr(context_item, "_columns", None) is not self.columns:
+            context_item = CompactContextItem.from_item(context_item, self.columns)
+        
+        previous = self.context_items.get(context_item.id)
+        if previous is not None:
+            self._unindex_fields(previous)
+            self.resident_bytes -= self.item_bytes.pop(context_item.id, 0)
+            if previous is not context_item and getattr(previous, "_columns", None) is self.columns:
+                previous.detach()
+        elif self.cold_store is not None:
+            # Una versión nueva reemplaza a la que pudiera haber en el nivel frío
+            self.cold_store.remove_context(context_item.id)
+        
         self.context_items[context_item.id] = context_item
+        self.item_bytes[context_item.id] = self._estimate_bytes(context_item)
+        self.resident_bytes += self.item_bytes[context_item.id]
+        self._index_fields(context_item)
+        if self.max_items is not None or self.max_bytes is not None:
+            self._schedule_eviction(context_item.id)
+        searchable_text = self._searchable_text(context_item)
+        self.search_index.add(context_item.id, searchable_text)
+        if self.semantic_backend is not None:
+            self.semantic_backend.add(context_item.id, searchable_text)
         logger.info(f"Contexto añadido: {context_item.type} - {context_item.id}")
+        
+        self._enforce_budget(protected=context_item.id)
     
+    @synchronized
     def search_context(self, query: str, limit: int = 10) -> List[ContextItem]:
         """Busca contexto relevante basado en una consulta."""
-        # Implementación simple de búsqueda semántica
-        # En producción, usaría embeddings y vector search
-        relevant_items = []
-        query_lower = query.lower()
+        if self.cold_store is not None:
+            self._promote(self.cold_store.search_context(query, limit))
+        
+        if self.semantic_backend is not None:
+            results = self.semantic_search(query, limit)
+        else:
+            results = self._keyword_search(query, limit)
+        return self._record_access(results)
+    
+    def _keyword_search(self, query: str, limit: int) -> List[ContextItem]:
+        # Búsqueda BM25 sobre el índice invertido, mezclada con la importancia
+        # del elemento; solo se recorren los postings de los términos de la consulta
+        ranked = self.search_index.top_k(
+            query,
+            limit,
+            boost=lambda item_id: self.context_items[item_id].importance_score,
+            boost_weight=self.IMPORTANCE_WEIGHT
+        )
+        return [self.context_items[item_id] for _, item_id in ranked]
+    
+    def semantic_search(self, query: str, limit: int = 10) -> List[ContextItem]:
+        """Busca contexto por similitud de embeddings, mezclada con la importancia."""
+        if self.semantic_backend is None:
+            raise ValueError("MemoryStore sin backend semántico configurado")
+        
+        hits = self.semantic_backend.search(query, limit)
+        ranked = [
+            ((1 - self.IMPORTANCE_WEIGHT) * similarity +
+             self.IMPORTANCE_WEIGHT * self.context_items[item_id].importance_score, item_id)
+            for similarity, item_id in hits
+            if similarity > 0 and item_id in self.context_items
+        ]
+        ranked.sort(reverse=True)
+        return [self.context_items[item_id] for _, item_id in ranked]
+    
+    @staticmethod
+    def _searchable_text(context_item: ContextItem) -> str:
+        """Texto indexado de un elemento: contenido, tipo y valores de metadata."""
+        metadata_text = " ".join(str(v) for v in context_item.metadata.values())
+        return f"{context_item.content} {context_item.type} {metadata_text}"
+    
+    @synchronized
+    def remove_context(self, item_id: str) -> bool:
+        """Elimina un elemento de contexto y todas sus entradas de índice."""
+        removed_cold = self.cold_store is not None and self.cold_store.remove_context(item_id)
+        context_item = self._release(item_id)
+        if context_item is None:
+            return removed_cold
+        
+        logger.info(f"Contexto eliminado: {context_item.type} - {item_id}")
+        return True
+    
+    def _release(self, item_id: str) -> Optional[ContextItem]:
+        """Saca un elemento de la memoria residente y de todos sus índices."""
+        context_item = self.context_items.pop(item_id, None)
+        if context_item is None:
+            return None
+        
+        self._unindex_fields(context_item)
+        self.search_index.remove(item_id)
+        if self.semantic_backend is not None:
+            self.semantic_backend.remove(item_id)
+        self.resident_bytes -= self.item_bytes.pop(item_id, 0)
+        self.access_counts.pop(item_id, None)
+        self.eviction_keys.pop(item_id, None)
+        if self.columns is not None and getattr(context_item, "_columns", None) is self.columns:
+            context_item.detach()
+        return context_item
+    
+    def _estimate_bytes(self, context_item: ContextItem) -> int:
+        """Estimación del coste residente de un elemento."""
+        metadata_size = sum(len(str(v)) for v in context_item.metadata.values())
+        return self.ITEM_OVERHEAD_BYTES + sys.getsizeof(context_item.content) + metadata_size
+    
+    def _over_budget(self) -> bool:
+        return ((self.max_items is not None and len(self.context_items) > self.max_items) or
+                (self.max_bytes is not None and self.resident_bytes > self.max_bytes))
+    
+    def _eviction_key(self, item_id: str) -> Tuple[int, float]:
+        """
+        Clave de desalojo (nivel, instante de olvido) de un elemento residente.
+        
+        Los elementos duraderos (decisiones o importancia de al menos
+        DURABLE_IMPORTANCE) forman el nivel 1 y no se desalojan mientras quede
+        alguno del nivel 0. Dentro de cada nivel se desaloja antes el que
+        antes se olvida: su retención, importance_score · (1 + log(1 + accesos)),
+        decae exponencialmente con la edad a un ritmo proporcional a
+        (1 - importance_score), y el instante de olvido es cuando cae por
+        debajo de RETENTION_FLOOR. La clave no depende del momento actual, por
+        lo que el orden se mantiene en un montículo sin recalcularlo.
+        """
+        context_item = self.context_items[item_id]
+        importance = context_item.importance_score
+        durable = importance >= self.DURABLE_IMPORTANCE or context_item.type in self.DURABLE_TYPES
+        strength = importance * (1 + math.log1p(self.access_counts.get(item_id, 0)))
+        created = self._timestamp_key(context_item)
+        if importance >= 1:
+            forget_at = math.inf
+        elif strength <= self.RETENTION_FLOOR:
+            forget_at = created
+        else:
+            lifetime_days = self.RETENTION_DECAY_DAYS * math.log(strength / self.RETENTION_FLOOR) / (1 - importance)
+            forget_at = created + lifetime_days * 86400
+        return (1 if durable else 0), forget_at
+    
+    def _schedule_eviction(self, item_id: str):
+        """(Re)calcula la clave de desalojo de un elemento tras añadirlo o accederlo."""
+        key = self._eviction_key(item_id)
+        self.eviction_keys[item_id] = key
+        heapq.heappush(self._eviction_heap, (key, item_id))
+        # Las entradas obsoletas se purgan cuando duplican a las válidas
+        if len(self._eviction_heap) > 2 * len(self.eviction_keys) + 64:
+            self._eviction_heap = [(key, item_id) for item_id, key in self.eviction_keys.items()]
+            heapq.heapify(self._eviction_heap)
+    
+    def _enforce_budget(self, protected: str = None):
+        """
+        Desaloja los elementos de menor retención hasta volver bajo el presupuesto.
         
-        for item in self.context_items.values():
-            if (query_lower in item.content.lower() or 
-                query_lower in item.type.lower() or
-                any(query_lower in str(v).lower() for v in item.metadata.values())):
-                relevant_items.append(item)
+        Sin nivel frío los elementos duraderos no se desalojan (se perderían):
+        si solo quedan ellos, la memoria se queda por encima del presupuesto.
+        """
+        if not self._over_budget():
+            return
         
-        # Ordenar por importancia y relevancia
-        relevant_items.sort(key=lambda x: x.importance_score, reverse=True)
-        return relevant_items[:limit]
+        skipped = []
+        while self._eviction_heap and self._over_budget():
+            key, item_id = heapq.heappop(self._eviction_heap)
+            if self.eviction_keys.get(item_id) != key:
+                continue  # entrada obsoleta
+            if item_id == protected or item_id in self._protected:
+                skipped.append((key, item_id))
+                continue
+            if key[0] == 1 and self.cold_store is None:
+                # El montículo está ordenado por nivel: solo quedan duraderos
+                skipped.append((key, item_id))
+                if self.stats["durable_over_budget"] == 0:
+                    logger.warning("Memoria por encima del presupuesto: solo quedan elementos duraderos "
+                                   "y sin nivel frío no se desalojan")
+                self.stats["durable_over_budget"] += 1
+                break
+            self._evict(item_id)
+        for entry in skipped:
+            heapq.heappush(self._eviction_heap, entry)
+    
+    def _evict(self, item_id: str):
+        """Desaloja un elemento, moviéndolo al nivel frío si está configurado."""
+        context_item = self._release(item_id)
+        if context_item is None:
+            return
+        self.stats["evictions"] += 1
+        if self.cold_store is not None:
+            self.cold_store.add_context(context_item)
+    
+    def _promote(self, context_items: List[ContextItem]):
+        """Devuelve a memoria residente elementos encontrados en el nivel frío."""
+        promoted = [item for item in context_items if item.id not in self.context_items]
+        self._protected.update(item.id for item in promoted)
+        try:
+            for context_item in promoted:
+                self.add_context(context_item)
+        finally:
+            self._protected.clear()
+        self.stats["promotions"] += len(promoted)
+        self.stats["cold_hits"] += len(promoted)
+    
+    def _record_access(self, context_items: List[ContextItem]) -> List[ContextItem]:
+        for context_item in context_items:
+            self.access_counts[context_item.id] = self.access_counts.get(context_item.id, 0) + 1
+            if context_item.id in self.eviction_keys:
+                self._schedule_eviction(context_item.id)
+        self.stats["hot_hits"] += len(context_items)
+        return context_items
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos, desalojos y ocupación de la memoria."""
+        return {
+            **self.stats,
+            "resident_items": len(self.context_items),
+            "resident_bytes": self.resident_bytes,
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+        }
     
     def get_project_context(self, project_id: str) -> List[ContextItem]:
         """Obtiene todo el contexto relacionado con un proyecto específico."""
-        return [
-            item for item in self.context_items.values()
-            if item.metadata.get('project_id') == project_id
+        return self.query_context(project_id=project_id)
+    
+    @synchronized
+    def query_context(self, type: str = None, source: str = None,
+                      project_id: str = None, conversation_id: str = None,
+                      participant: str = None, since: datetime = None,
+                      until: datetime = None, limit: int = None) -> List[ContextItem]:
+        """
+        Filtra el contexto combinando los índices secundarios.
+        
+        Con nivel frío configurado, los resultados residentes se combinan con
+        los del nivel frío (sin promoverlos) manteniendo el orden cronológico.
+        """
+        filters = dict(type=type, source=source, project_id=project_id,
+                       conversation_id=conversation_id, participant=participant,
+                       since=since, until=until, limit=limit)
+        results = self._record_access(self._query_resident(**filters))
+        if self.cold_store is None:
+            return results
+        
+        cold_results = self.cold_store.query_context(**filters)
+        self.stats["cold_hits"] += len(cold_results)
+        merged = sorted(results + cold_results, key=self._timestamp_key)
+        if limit is not None:
+            merged = merged[-limit:] if limit > 0 else []
+        return merged
+    
+    def _query_resident(self, type: str = None, source: str = None,
+                        project_id: str = None, conversation_id: str = None,
+                        participant: str = None, since: datetime = None,
+                        until: datetime = None, limit: int = None) -> List[ContextItem]:
+        """
+        Filtra la memoria residente combinando los índices secundarios.
+        
+        Los filtros por campo se intersectan empezando por el conjunto más
+        pequeño y el rango temporal [since, until] usa el índice ordenado, así
+        que el coste es proporcional al resultado y no al tamaño de la memoria.
+        Devuelve los elementos en orden cronológico; con ``limit`` se quedan
+        los más recientes.
+        """
+        filters = {
+            "type": type,
+            "source": source,
+            "project_id": project_id,
+            "conversation_id": conversation_id,
+            "participants": participant,
+        }
+        candidate_sets = [
+            self.field_indexes[field].get(value, set())
+            for field, value in filters.items() if value is not None
         ]
+        
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            item_ids = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+            ordered = sorted(
+                (self._timestamp_key(self.context_items[item_id]), item_id)
+                for item_id in item_ids
+            )
+            if since is not None or until is not None:
+                lower = since.timestamp() if since is not None else float("-inf")
+                upper = until.timestamp() if until is not None else float("inf")
+                ordered = [entry for entry in ordered if lower <= entry[0] <= upper]
+        else:
+            start = 0 if since is None else bisect.bisect_left(self.timeline, (since.timestamp(), ""))
+            end = (len(self.timeline) if until is None
+                   else bisect.bisect_right(self.timeline, (until.timestamp(), "\U0010ffff")))
+            ordered = self.timeline[start:end]
+        
+        if limit is not None:
+            ordered = ordered[-limit:] if limit > 0 else []
+        return [self.context_items[item_id] for _, item_id in ordered]
+    
+    @staticmethod
+    def _timestamp_key(context_item: ContextItem) -> float:
+        if isinstance(context_item, CompactContextItem):
+            return context_item.epoch
+        return context_item.timestamp.timestamp()
+    
+    def _field_values(self, context_item: ContextItem):
+        """Pares (campo, valor) indexables de un elemento."""
+        yield "type", context_item.type
+        yield "source", context_item.source
+        for field in ("project_id", "conversation_id"):
+            value = context_item.metadata.get(field)
+            if value is not None:
+                yield field, value
+        for participant in context_item.metadata.get("participants") or []:
+            yield "participants", participant
+    
+    def _index_fields(self, context_item: ContextItem):
+        for field, value in self._field_values(context_item):
+            self.field_indexes[field].setdefault(value, set()).add(context_item.id)
+        bisect.insort(self.timeline, (self._timestamp_key(context_item), context_item.id))
+    
+    def _unindex_fields(self, context_item: ContextItem):
+        for field, value in self._field_values(context_item):
+            item_ids = self.field_indexes[field].get(value)
+            if item_ids is None:
+                continue
+            item_ids.discard(context_item.id)
+            if not item_ids:
+                del self.field_indexes[field][value]
+        
+        entry = (self._timestamp_key(context_item), context_item.id)
+        position = bisect.bisect_left(self.timeline, entry)
+        if position < len(self.timeline) and self.timeline[position] == entry:
+            del self.timeline[position]
 
 class BaseAgent:
     """Clase base para todos los agentes especializados."""
     
-    def __init__(self, agent_type: AgentType, memory_store: MemoryStore):
+    def __init__(self, agent_type: AgentType, memory_store: MemoryStore, llm: LLMClient = None):
         self.agent_type = agent_type
         self.memory_store = memory_store
+        self.llm = llm or get_llm_client()
         self.capabilities = self._define_capabilities()
         logger.info(f"Agente {agent_type.value} inicializado")
     
@@ -134,80 +729,297 @@ class BaseAgent:
         """Ejecuta una tarea específica."""
         raise NotImplementedError(f"Agente {self.agent_type.value} debe implementar execute_task")
     
+    def describe_task(self, task: Task) -> str:
+        """Descripción de la tarea para los prompts, con los resultados de sus dependencias."""
+        if not task.dependency_results:
+            return task.description
+        
+        upstream = "\n".join(
+            f"- {task_id}: {json.dumps(result, default=str, ensure_ascii=False)[:1500]}"
+            for task_id, result in task.dependency_results.items()
+        )
+        return f"{task.description}\n\nResultados de tareas previas:\n{upstream}"
+    
     def can_handle_task(self, task_description: str) -> bool:
         """Determina si el agente puede manejar una tarea específica."""
         task_lower = task_description.lower()
         return any(cap.lower() in task_lower for cap in self.capabilities)
 
+def build_agents(memory_store: Optional[MemoryStore], llm: LLMClient) -> Dict[AgentType, BaseAgent]:
+    """Crea los agentes especializados (importa nexus_agents en la primera llamada)."""
+    from nexus_agents import (
+        NexusDevAgent, NexusQAAgent, NexusDesignerAgent,
+        NexusHRAgent, NexusFinanceAgent, NexusSalesAgent,
+        NexusMarketingAgent, NexusSupportAgent, NexusAnalystAgent
+    )
+    
+    agent_classes = {
+        AgentType.NEXUS_DEV: NexusDevAgent,
+        AgentType.NEXUS_QA: NexusQAAgent,
+        AgentType.NEXUS_DESIGNER: NexusDesignerAgent,
+        AgentType.NEXUS_HR: NexusHRAgent,
+        AgentType.NEXUS_FINANCE: NexusFinanceAgent,
+        AgentType.NEXUS_SALES: NexusSalesAgent,
+        AgentType.NEXUS_MARKETING: NexusMarketingAgent,
+        AgentType.NEXUS_SUPPORT: NexusSupportAgent,
+        AgentType.NEXUS_ANALYST: NexusAnalystAgent,
+    }
+    
+    return {agent_type: agent_class(agent_type, memory_store, llm)
+            for agent_type, agent_class in agent_classes.items()}
+
 class NexusOrchestrator:
     """
     Orquestador principal de Nexus que coordina todos los sub-agentes
     y mantiene el contexto persistente.
     """
     
-    def __init__(self):
-        self.memory_store = MemoryStore()
-        self.agents: Dict[AgentType, BaseAgent] = {}
+    # Caducidad (s) de las respuestas LLM cacheadas por punto de llamada (las
+    # únicas que se cachean: la síntesis resume resultados fijos)
+    DECOMPOSITION_CACHE_TTL = 600.0
+    SYNTHESIS_CACHE_TTL = 300.0
+    
+    # En modo pipeline se ejecuta especulativamente el agente candidato del
+    # enrutador cuando supera esta fracción del peso de palabras clave
+    SPECULATION_CONFIDENCE = 0.5
+    
+    def __init__(self, memory_store: MemoryStore = None, max_parallel_tasks: int = None,
+                 limits: ConcurrencyLimits = None, llm: LLMClient = None,
+                 router: CapabilityRouter = None, pipelined: bool = None,
+                 agents: Dict[AgentType, BaseAgent] = None,
+                 agent_pools: Dict[AgentType, BoundedPool] = None):
+        load_environment()
+        self.memory_store = memory_store or MemoryStore()
+        # Cliente LLM asíncrono compartido con los agentes
+        self.llm = llm or get_llm_client()
+        # Los agentes y el enrutador se construyen en el primer uso (o se
+        # comparten entre orquestadores, ver nexus_tenants.TenantRegistry)
+        self._agents: Optional[Dict[AgentType, BaseAgent]] = agents
         self.active_tasks: Dict[str, Task] = {}
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        # Límite de tareas simultáneas por comando (None = sin límite)
+        self.max_parallel_tasks = max_parallel_tasks
+        # Límites globales: comandos en curso y llamadas simultáneas por tipo de agente
+        self.limits = limits or ConcurrencyLimits.from_env()
+        self.admission_pool = BoundedPool("admission", self.limits.max_concurrent_commands,
+                                          self.limits.command_queue_size)
+        self.agent_pools: Dict[AgentType, BoundedPool] = agent_pools if agent_pools is not None else {}
+        
+        # Enrutado local previo a la descomposición (NEXUS_FAST_ROUTING=false lo desactiva)
+        self._router = router
+        self._fast_routing = router is None and os.getenv('NEXUS_FAST_ROUTING', 'true').lower() == 'true'
         
-        # Inicializar agentes especializados
-        self._initialize_agents()
+        # Modo pipeline: recuperación de contexto en paralelo y ejecución especulativa
+        if pipelined is None:
+            pipelined = os.getenv('NEXUS_PIPELINED', 'false').lower() == 'true'
+        self.pipelined = pipelined
+        self.pipeline_stats = {"commands": 0, "speculations": 0, "speculations_kept": 0,
+                               "speculations_discarded": 0}
+        self._first_result_times: Deque[float] = deque(maxlen=1000)
+        self._first_token_times: Deque[float] = deque(maxlen=1000)
+        
+        # Prompt de síntesis compacto y acotado (NEXUS_SYNTHESIS_MAX_TOKENS)
+        self.synthesis_prompts = SynthesisPromptBuilder.from_env()
+        # Cuándo hace falta el LLM para sintetizar (NEXUS_SYNTHESIS_POLICY=auto|full)
+        self.synthesis_policy = SynthesisPolicy.from_env(self.synthesis_prompts)
         
         logger.info("Nexus Orchestrator inicializado")
     
+    @property
+    def agents(self) -> Dict[AgentType, BaseAgent]:
+        """Agentes especializados, creados (e importados) en el primer acceso."""
+        if self._agents is None:
+            self._initialize_agents()
+        return self._agents
+    
+    @property
+    def router(self) -> Optional[CapabilityRouter]:
+        """Enrutador por capacidades de los agentes, creado en el primer comando."""
+        if self._router is None and self._fast_routing:
+            self._router = CapabilityRouter.from_env(self.agents)
+        return self._router
+    
     def _initialize_agents(self):
         """Inicializa todos los agentes especializados."""
-        from nexus_agents import (
-            NexusDevAgent, NexusQAAgent, NexusDesignerAgent,
-            NexusHRAgent, NexusFinanceAgent, NexusSalesAgent,
-            NexusMarketingAgent, NexusSupportAgent, NexusAnalystAgent
-        )
-        
-        agent_classes = {
-            AgentType.NEXUS_DEV: NexusDevAgent,
-            AgentType.NEXUS_QA: NexusQAAgent,
-            AgentType.NEXUS_DESIGNER: NexusDesignerAgent,
-            AgentType.NEXUS_HR: NexusHRAgent,
-            AgentType.NEXUS_FINANCE: NexusFinanceAgent,
-            AgentType.NEXUS_SALES: NexusSalesAgent,
-            AgentType.NEXUS_MARKETING: NexusMarketingAgent,
-            AgentType.NEXUS_SUPPORT: NexusSupportAgent,
-            AgentType.NEXUS_ANALYST: NexusAnalystAgent,
-        }
-        
-        for agent_type, agent_class in agent_classes.items():
-            self.agents[agent_type] = agent_class(self.memory_store)
+        self._agents = build_agents(self.memory_store, self.llm)
     
     async def process_natural_language_command(self, command: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Procesa un comando en lenguaje natural y lo descompone en tareas
         para los agentes especializados.
         """
-        logger.info(f"Procesando comando: {command}")
-        
-        # Analizar el comando con IA para identificar tareas
-        tasks = await self._decompose_command(command, context)
+        result = None
+        async for event in self.process_natural_language_command_stream(command, context):
+            if event["type"] == "completed":
+                result = event["result"]
+        return result
+    
+    async def process_natural_language_command_stream(self, command: str,
+                                                      context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Variante en streaming de process_natural_language_command.
         
-        # Ejecutar tareas en paralelo
-        results = await self._execute_tasks_parallel(tasks)
+        Produce eventos según avanza el comando:
+        - {"type": "decomposed", "tasks": [...]} tras la descomposición
+        - {"type": "task_result", "task_id", "agent_type", "status", "result"}
+          en cuanto termina cada tarea, en orden de finalización
+        - {"type": "synthesis_delta", "text"} con cada fragmento de la síntesis
+          según lo genera el LLM (nexus_llm.iter_sentences los agrupa en frases)
+        - {"type": "completed", "result": {...}} con el mismo resultado que
+          devuelve process_natural_language_command
         
-        # Sintetizar resultados
-        synthesis = await self._synthesize_results(command, tasks, results)
+        Si la cola de admisión está llena lanza PoolFullError sin procesar el comando.
+        La plaza de admisión cubre la descomposición y la ejecución de las tareas
+        y se libera antes de la síntesis, para que un consumidor lento del texto
+        (p. ej. la síntesis de voz) no la retenga; si el consumidor abandona el
+        stream antes, ``aclose()`` la libera.
+        """
+        async with AsyncExitStack() as admission:
+            await admission.enter_async_context(self.admission_pool.slot())
+            logger.info(f"Procesando comando: {command}")
+            start = time.perf_counter()
+            first_result = None
+            self.pipeline_stats["commands"] += 1
+            
+            # Analizar el comando con IA para identificar tareas
+            speculative: Dict[str, asyncio.Future] = {}
+            if self.pipelined:
+                tasks, speculative = await self._decompose_pipelined(command, context)
+            else:
+                tasks = await self._decompose_command(command, context)
+            try:
+                yield {"type": "decomposed", "tasks": [asdict(task) for task in tasks]}
+                
+                # Ejecutar tareas según sus dependencias; los resultados se indexan por task.id
+                results = {}
+                async for task, task_result in self._stream_tasks(tasks, speculative):
+                    results[task.id] = task_result
+                    if first_result is None:
+                        first_result = time.perf_counter() - start
+                        self._first_result_times.append(first_result)
+                    yield {
+                        "type": "task_result",
+                        "task_id": task.id,
+                        "agent_type": task.agent_type.value,
+                        "description": task.description,
+                        "status": task.status,
+                        "result": task_result
+                    }
+            finally:
+                # Si el consumidor abandona el stream, no deja ejecuciones especulativas vivas
+                for speculation in speculative.values():
+                    await self._cancel_speculation(speculation)
+            
+            # La síntesis se reenvía al ritmo del consumidor: sin la plaza de admisión
+            await admission.aclose()
+            
+            # Sintetizar resultados, reenviando el texto según se genera
+            first_token = None
+            synthesis_parts = []
+            decision = self.synthesis_policy.decide(tasks, results)
+            synthesis_start = time.perf_counter()
+            async for delta in self._synthesize_results_stream(command, tasks, results, decision):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    self._first_token_times.append(first_token)
+                synthesis_parts.append(delta)
+                yield {"type": "synthesis_delta", "text": delta}
+            synthesis = "".join(synthesis_parts)
+            synthesis_savings = self.synthesis_policy.record(decision, time.perf_counter() - synthesis_start)
         
-        return {
-            "original_command": command,
-            "decomposed_tasks": [asdict(task) for task in tasks],
-            "results": results,
-            "synthesis": synthesis,
-            "status": "completed"
+        yield {
+            "type": "completed",
+            "result": {
+                "original_command": command,
+                "decomposed_tasks": [asdict(task) for task in tasks],
+                "results": results,
+                "synthesis": synthesis,
+                "synthesis_policy": synthesis_savings,
+                "status": "completed",
+                "timings": {
+                    "time_to_first_result": first_result,
+                    "time_to_first_token": first_token,
+                    "total": time.perf_counter() - start
+                }
+            }
         }
     
     async def _decompose_command(self, command: str, context: Dict[str, Any] = None) -> List[Task]:
         """Descompone un comando en lenguaje natural en tareas específicas."""
         
+        # Los comandos de una sola intención clara van directos a su agente
+        decision = self.router.route(command) if self.router is not None else None
+        if decision is not None and decision.target is not None:
+            logger.info(f"Comando enrutado a {decision.target.value} "
+                        f"({decision.reason}, confianza {decision.confidence:.2f})")
+            return [self._routed_task(command, decision.target)]
+        
         # Buscar contexto relevante
         relevant_context = self.memory_store.search_context(command)
+        return await self._decompose_with_llm(command, relevant_context)
+    
+    async def _decompose_pipelined(self, command: str,
+                                   context: Dict[str, Any] = None) -> Tuple[List[Task], Dict[str, asyncio.Future]]:
+        """
+        Descomposición en modo pipeline.
+        
+        La búsqueda de contexto corre en un hilo auxiliar y, si el enrutador
+        tiene un candidato razonable, su agente empieza a ejecutar el comando
+        mientras el LLM descompone. El trabajo especulativo se conserva solo si
+        la descomposición asigna una única tarea sin dependencias a ese mismo
+        agente; si no, se cancela. Devuelve las tareas y {task_id: ejecución
+        especulativa} para las que se conservan.
+        """
+        decision = self.router.route(command) if self.router is not None else None
+        if decision is not None and decision.target is not None:
+            return [self._routed_task(command, decision.target)], {}
+        
+        speculative_task = None
+        speculation = None
+        if decision is not None and decision.scores and decision.confidence > self.SPECULATION_CONFIDENCE:
+            candidate = max(decision.scores, key=decision.scores.get)
+            speculative_task = self._routed_task(command, candidate)
+            speculation = asyncio.ensure_future(self._execute_single_task(speculative_task))
+            self.pipeline_stats["speculations"] += 1
+        
+        try:
+            relevant_context = await asyncio.to_thread(self.memory_store.search_context, command)
+            tasks = await self._decompose_with_llm(command, relevant_context)
+        except BaseException:
+            if speculation is not None:
+                await self._cancel_speculation(speculation)
+            raise
+        
+        if speculation is None:
+            return tasks, {}
+        
+        matching = [task for task in tasks if task.agent_type == speculative_task.agent_type]
+        if len(matching) == 1 and not matching[0].dependencies:
+            logger.info(f"Ejecución especulativa de {speculative_task.agent_type.value} conservada")
+            self.pipeline_stats["speculations_kept"] += 1
+            return tasks, {matching[0].id: speculation}
+        
+        logger.info(f"Ejecución especulativa de {speculative_task.agent_type.value} descartada")
+        self.pipeline_stats["speculations_discarded"] += 1
+        await self._cancel_speculation(speculation)
+        return tasks, {}
+    
+    @staticmethod
+    async def _cancel_speculation(speculation: asyncio.Future):
+        """Cancela una ejecución especulativa y espera a que libere sus recursos."""
+        speculation.cancel()
+        await asyncio.gather(speculation, return_exceptions=True)
+    
+    def _routed_task(self, command: str, agent_type: AgentType) -> Task:
+        """Tarea única que envía el comando completo a un agente."""
+        return Task(
+            id=f"task_0_{datetime.now().timestamp()}",
+            description=command,
+            agent_type=agent_type,
+            priority=1
+        )
+    
+    async def _decompose_with_llm(self, command: str, relevant_context: List[ContextItem]) -> List[Task]:
+        """Descompone el comando con el LLM usando el contexto recuperado."""
         context_summary = self._summarize_context(relevant_context)
         
         # Prompt para descomposición
@@ -233,34 +1045,25 @@ class NexusOrchestrator:
         {{
             "tasks": [
                 {{
+                    "id": "t1",
                     "description": "Descripción clara de la tarea",
                     "agent_type": "NexusDev|NexusQA|NexusDesigner|NexusHR|NexusFinance|NexusSales|NexusMarketing|NexusSupport|NexusAnalyst",
-                    "priority": 1-5,
-                    "dependencies": ["task_id_1", "task_id_2"]
+                    "priority": 1-5 (1 = máxima),
+                    "dependencies": ["ids de las tareas de esta lista que deben terminar antes"]
                 }}
             ]
         }}
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": decomposition_prompt}],
-                temperature=0.1
-            )
-            
-            decomposition = json.loads(response.choices[0].message.content)
-            tasks = []
-            
-            for task_data in decomposition["tasks"]:
-                task = Task(
-                    id=f"task_{len(tasks)}_{datetime.now().timestamp()}",
-                    description=task_data["description"],
-                    agent_type=AgentType(task_data["agent_type"]),
-                    priority=task_data.get("priority", 1)
-                )
-                tasks.append(task)
+            content = await self.llm.complete(decomposition_prompt, model="gpt-4", temperature=0,
+                                             cache=True, cache_ttl=self.DECOMPOSITION_CACHE_TTL)
             
+            decomposition = json.loads(content)
+            tasks = self._build_tasks(decomposition["tasks"])
+            # Las decisiones de una sola tarea entrenan el modelo del enrutador
+            if len(tasks) == 1 and self.router is not None:
+                self.router.learn(command, tasks[0].agent_type)
             return tasks
             
         except Exception as e:
@@ -273,47 +1076,77 @@ class NexusOrchestrator:
                 priority=1
             )]
     
+    def _build_tasks(self, tasks_data: List[Dict[str, Any]]) -> List[Task]:
+        """Crea las tareas de una descomposición, traduciendo sus dependencias a ids reales."""
+        tasks = []
+        local_ids: Dict[str, str] = {}
+        
+        for position, task_data in enumerate(tasks_data):
+            task = Task(
+                id=f"task_{len(tasks)}_{datetime.now().timestamp()}",
+                description=task_data["description"],
+                agent_type=AgentType(task_data["agent_type"]),
+                priority=task_data.get("priority", 1)
+            )
+            # Las dependencias pueden llegar como id local ("t1") o como posición (1-based)
+            local_ids[str(task_data.get("id", f"t{position + 1}"))] = task.id
+            local_ids[str(position + 1)] = task.id
+            tasks.append(task)
+        
+        for task, task_data in zip(tasks, tasks_data):
+            task.dependencies = [
+                local_ids[str(dependency)] for dependency in task_data.get("dependencies") or []
+                if str(dependency) in local_ids and local_ids[str(dependency)] != task.id
+            ]
+        
+        return tasks
+    
     async def _execute_tasks_parallel(self, tasks: List[Task]) -> Dict[str, Any]:
-        """Ejecuta múltiples tareas en paralelo."""
+        """
+        Ejecuta las tareas respetando sus dependencias.
+        
+        Cada tarea arranca en cuanto terminan sus prerequisitos (ver
+        nexus_scheduler.DAGScheduler); sin dependencias, todas corren en paralelo.
+        Los resultados se indexan por task.id.
+        """
         results = {}
+        async for task, task_result in self._stream_tasks(tasks):
+            results[task.id] = task_result
+        return results
+    
+    async def _stream_tasks(self, tasks: List[Task],
+                            speculative: Dict[str, asyncio.Future] = None) -> AsyncIterator[Tuple[Task, Any]]:
+        """
+        Ejecuta las tareas y produce (tarea, resultado) a medida que terminan.
         
-        # Agrupar tareas por agente para optimizar
-        tasks_by_agent = {}
-        for task in tasks:
-            if task.agent_type not in tasks_by_agent:
-                tasks_by_agent[task.agent_type] = []
-            tasks_by_agent[task.agent_type].append(task)
-        
-        # Ejecutar tareas en paralelo por agente
-        execution_tasks = []
-        for agent_type, agent_tasks in tasks_by_agent.items():
-            if agent_type in self.agents:
-                for task in agent_tasks:
-                    execution_tasks.append(self._execute_single_task(task))
-        
-        # Esperar a que todas las tareas se completen
-        task_results = await asyncio.gather(*execution_tasks, return_exceptions=True)
-        
-        # Procesar resultados
-        for i, task in enumerate(tasks):
-            if i < len(task_results):
-                if isinstance(task_results[i], Exception):
-                    task.status = "error"
-                    task.error = str(task_results[i])
-                    results[task.id] = {"error": str(task_results[i])}
-                else:
-                    task.status = "completed"
-                    task.result = task_results[i]
-                    task.completed_at = datetime.now()
-                    results[task.id] = task_results[i]
+        Las tareas con ejecución especulativa en ``speculative`` esperan a esa
+        ejecución en lugar de lanzar otra; las que no llegan a consumirse se
+        cancelan al terminar.
+        """
+        from nexus_scheduler import DAGScheduler
+        speculative = dict(speculative or {})
         
-        return results
+        async def run_task(task: Task, upstream: Dict[str, Any]) -> Any:
+            task.dependency_results = upstream
+            speculation = speculative.pop(task.id, None)
+            if speculation is not None:
+                return await speculation
+            return await self._execute_single_task(task)
+        
+        scheduler = DAGScheduler(run_task, max_concurrency=self.max_parallel_tasks)
+        try:
+            async for task, result in scheduler.stream(tasks):
+                yield task, result
+        finally:
+            for speculation in speculative.values():
+                await self._cancel_speculation(speculation)
     
     async def _execute_single_task(self, task: Task) -> Any:
         """Ejecuta una tarea individual."""
         try:
             if task.agent_type in self.agents:
-                result = await self.agents[task.agent_type].execute_task(task)
+                agent = self.agents[task.agent_type]
+                result = await self._agent_pool(task.agent_type).run(lambda: agent.execute_task(task))
                 return result
             else:
                 raise ValueError(f"Agente {task.agent_type.value} no disponible")
@@ -321,37 +1154,74 @@ class NexusOrchestrator:
             logger.error(f"Error ejecutando tarea {task.id}: {e}")
             raise
     
+    def _agent_pool(self, agent_type: AgentType) -> BoundedPool:
+        """Pool acotado de un tipo de agente (se crea en el primer uso)."""
+        pool = self.agent_pools.get(agent_type)
+        if pool is None:
+            pool = BoundedPool(agent_type.value, self.limits.for_agent(agent_type.value),
+                               self.limits.agent_queue_size)
+            self.agent_pools[agent_type] = pool
+        return pool
+    
+    def get_load_stats(self) -> Dict[str, Any]:
+        """Profundidad de cola y tiempos de espera de la admisión y de cada agente."""
+        return {
+            "admission": self.admission_pool.get_stats(),
+            "agents": {agent_type.value: pool.get_stats()
+                       for agent_type, pool in self.agent_pools.items()},
+            "routing": self._router.get_stats() if self._router is not None else None,
+            "pipeline": self.get_pipeline_stats(),
+            "synthesis_prompts": self.synthesis_prompts.get_stats(),
+            "synthesis_policy": self.synthesis_policy.get_stats()
+        }
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """
+        Especulaciones y tiempos (ms) de los comandos recientes: hasta el primer
+        resultado de tarea y hasta el primer token de la síntesis.
+        """
+        stats = dict(self.pipeline_stats)
+        for name, samples in (("time_to_first_result", self._first_result_times),
+                              ("time_to_first_token", self._first_token_times)):
+            times = sorted(samples)
+            stats[f"{name}_p50_ms"] = times[len(times) // 2] * 1000 if times else 0.0
+            stats[f"{name}_p99_ms"] = (
+                times[min(len(times) - 1, int(0.99 * len(times)))] * 1000 if times else 0.0
+            )
+        return stats
+    
     async def _synthesize_results(self, original_command: str, tasks: List[Task], results: Dict[str, Any]) -> str:
         """Sintetiza los resultados de múltiples tareas en una respuesta coherente."""
+        parts = [delta async for delta in self._synthesize_results_stream(original_command, tasks, results)]
+        return "".join(parts)
+    
+    async def _synthesize_results_stream(self, original_command: str, tasks: List[Task],
+                                         results: Dict[str, Any],
+                                         decision: SynthesisDecision = None) -> AsyncIterator[str]:
+        """
+        Variante de _synthesize_results que produce el texto según lo genera el LLM.
         
-        synthesis_prompt = f"""
-        Eres Nexus. Has ejecutado múltiples tareas basadas en el siguiente comando:
-        
-        Comando original: {original_command}
-        
-        Tareas ejecutadas:
-        {json.dumps([asdict(task) for task in tasks], indent=2, default=str)}
-        
-        Resultados:
-        {json.dumps(results, indent=2, default=str)}
-        
-        Proporciona una síntesis clara y concisa de lo que se ha completado, 
-        incluyendo cualquier problema encontrado y próximos pasos recomendados.
-        Mantén un tono profesional pero conversacional.
+        Si la política de síntesis ya tiene la respuesta (una sola tarea) se
+        produce de una vez sin llamar al LLM.
         """
+        decision = decision or self.synthesis_policy.decide(tasks, results)
+        if not decision.uses_llm:
+            yield decision.text
+            return
+        
+        synthesis_prompt = self.synthesis_prompts.build(original_command, tasks, results)
         
+        produced = False
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": synthesis_prompt}],
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content
+            async for delta in self.llm.complete_stream(synthesis_prompt, model=decision.model, temperature=0.3,
+                                                        cache=True, cache_ttl=self.SYNTHESIS_CACHE_TTL):
+                produced = True
+                yield delta
             
         except Exception as e:
             logger.error(f"Error al sintetizar resultados: {e}")
-            return f"Tareas completadas con algunos errores. Revisa los logs para más detalles."
+            if not produced:
+                yield f"Tareas completadas con algunos errores. Revisa los logs para más detalles."
     
     def _summarize_context(self, context_items: List[ContextItem]) -> str:
         """Resume el contexto relevante para el análisis."""
@@ -443,13 +1313,9 @@ class NexusOrchestrator:
             """
             
             try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[{"role": "user", "content": intervention_prompt}],
-                    temperature=0.3
-                )
+                content = await self.llm.complete(intervention_prompt, model="gpt-4", temperature=0.3)
                 
-                return response.choices[0].message.content
+                return content
                 
             except Exception as e:
                 logger.error(f"Error generando intervención proactiva: {e}")
@@ -457,11 +1323,30 @@ class NexusOrchestrator:
         
         return None
 
-# Instancia global de Nexus
-nexus = NexusOrchestrator()
+# Instancia global de Nexus, creada en el primer uso
+_nexus: Optional[NexusOrchestrator] = None
+_nexus_lock = threading.Lock()
+
+
+def get_nexus() -> NexusOrchestrator:
+    """Orquestador compartido del proceso, creado en la primera llamada."""
+    global _nexus
+    if _nexus is None:
+        with _nexus_lock:
+            if _nexus is None:
+                _nexus = NexusOrchestrator()
+    return _nexus
+
+
+def __getattr__(name: str):
+    # Compatibilidad con ``from nexus_core import nexus``
+    if name == "nexus":
+        return get_nexus()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def main():
     """Función principal para demostrar Nexus."""
+    configure_logging()
     logger.info("🚀 Iniciando Nexus - Agente Cognitivo de Colaboración")
     
     # Ejemplo de uso
@@ -472,7 +1357,7 @@ async def main():
     3. Genera el código base en Python para ese endpoint incluyendo los tests unitarios
     """
     
-    result = await nexus.process_natural_language_command(command)
+    result = await get_nexus().process_natural_language_command(command)
     
     print("\n" + "="*60)
     print("RESULTADO DE NEXUS")
@@ -16,11 +16,9 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from nexus_core import NexusOrchestrator, ContextItem
+from nexus_core import NexusOrchestrator, ContextItem, configure_logging
 from nexus_integrations import integration_manager
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class NexusDemo:
@@ -248,6 +246,7 @@ class NexusDemo:
 
 async def main():
     """Función principal de la demostración."""
+    configure_logging()
     demo = NexusDemo()
     
     import sys
@@ -11,15 +11,16 @@ transparente en el flujo de trabajo existente.
 import os
 import json
 import logging
+import time
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 from abc import ABC, abstractmethod
 import requests
-from dotenv import load_dotenv
 
-# Cargar variables de entorno
-load_dotenv()
+from nexus_concurrency import PoolFullError
+from nexus_core import configure_logging, load_environment
+from nexus_llm import SENTENCE_END
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +111,45 @@ class SlackIntegration(PlatformIntegration):
             logger.error(f"Error enviando mensaje a Slack: {e}")
             return False
     
+    async def post_message(self, channel: str, message: str) -> Optional[str]:
+        """
+        Publica un mensaje con la Web API (chat.postMessage) y devuelve su ``ts``,
+        necesario para editarlo después. Devuelve None sin token de bot.
+        """
+        if not self.api_token:
+            return None
+        try:
+            response = await asyncio.to_thread(
+                requests.post,
+                "https://slack.com/api/chat.postMessage",
+                headers={"Authorization": f"Bearer {self.api_token}"},
+                json={"channel": channel, "text": message}
+            )
+            data = response.json()
+            if data.get("ok"):
+                return data.get("ts")
+            logger.error(f"Error publicando mensaje en Slack: {data.get('error')}")
+        except Exception as e:
+            logger.error(f"Error publicando mensaje en Slack: {e}")
+        return None
+    
+    async def update_message(self, channel: str, ts: str, message: str) -> bool:
+        """Reemplaza el texto de un mensaje publicado (chat.update)."""
+        try:
+            response = await asyncio.to_thread(
+                requests.post,
+                "https://slack.com/api/chat.update",
+                headers={"Authorization": f"Bearer {self.api_token}"},
+                json={"channel": channel, "ts": ts, "text": message}
+            )
+            data = response.json()
+            if not data.get("ok"):
+                logger.error(f"Error actualizando mensaje en Slack: {data.get('error')}")
+            return bool(data.get("ok"))
+        except Exception as e:
+            logger.error(f"Error actualizando mensaje en Slack: {e}")
+            return False
+    
     async def get_conversation_history(self, channel: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Obtiene el historial de conversación de un canal."""
         try:
@@ -358,9 +398,13 @@ class NotionIntegration(PlatformIntegration):
 class IntegrationManager:
     """Gestor central de todas las integraciones de Nexus."""
     
+    # Intervalo mínimo (s) entre ediciones del mensaje de síntesis en Slack (límite de chat.update)
+    SLACK_UPDATE_INTERVAL = 1.0
+    
     def __init__(self):
         self.integrations: Dict[str, PlatformIntegration] = {}
         self.nexus_core = None  # Referencia al núcleo de Nexus
+        self.tenants = None  # Registro multi-tenant (nexus_tenants.TenantRegistry)
     
     def register_integration(self, integration: PlatformIntegration):
         """Registra una nueva integración."""
@@ -401,27 +445,61 @@ class IntegrationManager:
         """Establece referencia al núcleo de Nexus."""
         self.nexus_core = nexus_core
     
+    def set_tenant_registry(self, tenants):
+        """Atiende cada evento con el orquestador de su workspace en lugar del global."""
+        self.tenants = tenants
+    
+    def _nexus_for(self, event_data: Dict[str, Any]):
+        """Orquestador del tenant del evento ("tenant_id" o el "team" de Slack)."""
+        if self.tenants is None:
+            return self.nexus_core
+        tenant_id = event_data.get("tenant_id") or event_data.get("team") or "default"
+        return self.tenants.get(tenant_id)
+    
     async def handle_platform_event(self, platform: str, event_data: Dict[str, Any]):
         """Maneja eventos de plataformas externas."""
-        if not self.nexus_core:
+        if not self.nexus_core and self.tenants is None:
             logger.error("Nexus core no configurado")
             return
         
+        try:
+            nexus_core = self._nexus_for(event_data)
+        except ValueError as e:
+            # Id de tenant no válido (nexus_tenants.validate_tenant_id): no se atiende
+            logger.warning(f"Evento de {platform} descartado: {e}")
+            await self._reply_invalid_tenant(platform, event_data)
+            return
+        
         try:
             # Procesar evento con Nexus
             if platform == "slack":
-                await self._handle_slack_event(event_data)
+                await self._handle_slack_event(nexus_core, event_data)
             elif platform == "google_meet":
-                await self._handle_meet_event(event_data)
+                await self._handle_meet_event(nexus_core, event_data)
             elif platform == "jira":
-                await self._handle_jira_event(event_data)
+                await self._handle_jira_event(nexus_core, event_data)
             else:
                 logger.warning(f"Plataforma no manejada: {platform}")
                 
         except Exception as e:
             logger.error(f"Error manejando evento de {platform}: {e}")
     
-    async def _handle_slack_event(self, event_data: Dict[str, Any]):
+    @staticmethod
+    def _mentions_nexus(text: str) -> bool:
+        """Indica si el mensaje va dirigido a Nexus."""
+        return "nexus" in text.lower() or "<@nexus>" in text
+    
+    async def _reply_invalid_tenant(self, platform: str, event_data: Dict[str, Any]):
+        """Avisa en Slack cuando se menciona a Nexus desde un workspace no válido."""
+        if (platform == "slack" and event_data.get("type") == "message" and event_data.get("channel")
+                and self._mentions_nexus(event_data.get("text", ""))):
+            await self.send_message_to_platform(
+                "slack",
+                event_data["channel"],
+                "No puedo atender esta solicitud: el workspace no es válido para Nexus."
+            )
+    
+    async def _handle_slack_event(self, nexus_core, event_data: Dict[str, Any]):
         """Maneja eventos específicos de Slack."""
         event_type = event_data.get("type")
         
@@ -432,7 +510,7 @@ class IntegrationManager:
             text = event_data.get("text", "")
             
             # Añadir contexto a Nexus
-            self.nexus_core.add_conversation_context(
+            nexus_core.add_conversation_context(
                 platform="slack",
                 conversation_id=channel,
                 participants=[user],
@@ -441,18 +519,57 @@ class IntegrationManager:
             )
             
             # Verificar si Nexus es mencionado
-            if "nexus" in text.lower() or "<@nexus>" in text:
-                # Procesar comando con Nexus
-                result = await self.nexus_core.process_natural_language_command(text)
+            if self._mentions_nexus(text):
+                # Procesar comando con Nexus, publicando cada resultado parcial
+                # en cuanto termina su tarea en lugar de esperar al agente más lento
+                await self.send_message_to_platform("slack", channel, "Procesando tu solicitud...")
+                
+                slack = self.integrations.get("slack")
+                synthesis_ts = None
+                synthesis_text = ""
+                last_update = 0.0
                 
-                # Responder en Slack
-                await self.send_message_to_platform(
-                    "slack", 
-                    channel, 
-                    f"Procesando tu solicitud...\n{result['synthesis']}"
-                )
-    
-    async def _handle_meet_event(self, event_data: Dict[str, Any]):
+                try:
+                    async for event in nexus_core.process_natural_language_command_stream(text):
+                        if event["type"] == "task_result":
+                            icon = "✅" if event["status"] == "completed" else "❌"
+                            await self.send_message_to_platform(
+                                "slack",
+                                channel,
+                                f"{icon} [{event['agent_type']}] {event['description']}"
+                            )
+                        elif event["type"] == "synthesis_delta" and isinstance(slack, SlackIntegration):
+                            # La síntesis se publica en un único mensaje que se edita al
+                            # completar frases, como mucho una vez por SLACK_UPDATE_INTERVAL
+                            synthesis_text += event["text"]
+                            boundary = SENTENCE_END.search(
+                                synthesis_text, max(0, len(synthesis_text) - len(event["text"]) - 1)
+                            )
+                            if boundary is None:
+                                continue
+                            completed_sentences = synthesis_text[:boundary.start()]
+                            if synthesis_ts is None:
+                                synthesis_ts = await slack.post_message(channel, completed_sentences)
+                                last_update = time.monotonic()
+                            elif time.monotonic() - last_update >= self.SLACK_UPDATE_INTERVAL:
+                                await slack.update_message(channel, synthesis_ts, completed_sentences)
+                                last_update = time.monotonic()
+                        elif event["type"] == "completed":
+                            # Responder en Slack con la síntesis final
+                            synthesis = event["result"]["synthesis"]
+                            if synthesis_ts is not None:
+                                await slack.update_message(channel, synthesis_ts, synthesis)
+                            else:
+                                await self.send_message_to_platform("slack", channel, synthesis)
+                except PoolFullError:
+                    # Nexus está saturado: se descarta la petición en lugar de encolarla sin límite
+                    await self.send_message_to_platform(
+                        "slack",
+                        channel,
+                        "Nexus está atendiendo demasiadas solicitudes ahora mismo. Inténtalo de nuevo en unos minutos."
+                    )
+    
+    async def _handle_meet_event(self, nexus_core, event_data: Dict[str, Any]):
         """Maneja eventos específicos de Google Meet."""
         event_type = event_data.get("type")
         
@@ -462,7 +579,7 @@ class IntegrationManager:
             participants = event_data.get("participants", [])
             
             # Añadir contexto de reunión
-            self.nexus_core.add_conversation_context(
+            nexus_core.add_conversation_context(
                 platform="google_meet",
                 conversation_id=meeting_id,
                 participants=participants,
@@ -470,7 +587,7 @@ class IntegrationManager:
                 metadata={"event_type": event_type}
             )
     
-    async def _handle_jira_event(self, event_data: Dict[str, Any]):
+    async def _handle_jira_event(self, nexus_core, event_data: Dict[str, Any]):
         """Maneja eventos específicos de Jira."""
         event_type = event_data.get("type")
         
@@ -480,7 +597,7 @@ class IntegrationManager:
             summary = event_data.get("summary")
             
             # Añadir contexto de decisión
-            self.nexus_core.add_decision_context(
+            nexus_core.add_decision_context(
                 decision_id=issue_key,
                 decision=f"Crear ticket: {summary}",
                 rationale="Ticket creado en Jira",
@@ -488,19 +605,27 @@ class IntegrationManager:
                 project_id=event_data.get("project_key")
             )
 
-# Instancia global del gestor de integraciones
-integration_manager = IntegrationManager()
+def register_default_integrations(manager: IntegrationManager):
+    """
+    Registra Slack, Google Meet, Jira y Notion (las que no lo estén ya),
+    que leen sus credenciales del entorno y del fichero .env.
+    """
+    load_environment()
+    for integration_class in (SlackIntegration, GoogleMeetIntegration, JiraIntegration, NotionIntegration):
+        integration = integration_class()
+        if integration.platform_name not in manager.integrations:
+            manager.register_integration(integration)
 
-# Registrar integraciones por defecto
-integration_manager.register_integration(SlackIntegration())
-integration_manager.register_integration(GoogleMeetIntegration())
-integration_manager.register_integration(JiraIntegration())
-integration_manager.register_integration(NotionIntegration())
+# Instancia global del gestor de integraciones; las integraciones por defecto
+# se registran al inicializarlas, no al importar el módulo
+integration_manager = IntegrationManager()
 
 async def initialize_integrations():
-    """Inicializa todas las integraciones."""
+    """Registra las integraciones por defecto e inicializa todas."""
+    register_default_integrations(integration_manager)
     await integration_manager.initialize_all_integrations()
 
 if __name__ == "__main__":
     # Prueba de integraciones
+    configure_logging()
     asyncio.run(initialize_integrations()) 
\ No newline at end of file
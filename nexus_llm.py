@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Cliente LLM de Nexus
+====================
+
+Cliente asíncrono compartido por el orquestador y todos los agentes. Usa
+AsyncOpenAI sobre un único pool de conexiones HTTP, de modo que las llamadas
+concurrentes no bloquean el event loop, y aplica a cada llamada un tiempo
+máximo. Al cancelar la corrutina que espera la respuesta se cancela también
+la petición HTTP en curso.
+
+Las respuestas deterministas (temperature=0, o las llamadas que lo piden con
+``cache=True``) se guardan en una caché direccionada por contenido (hash del
+modelo, los mensajes y los parámetros) con un nivel LRU en memoria y un
+nivel opcional en disco (SQLite).
+
+openai y httpx se importan al crear el primer cliente HTTP, no al importar el
+módulo, para que importar Nexus no pague su coste de arranque.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Tuple, AsyncIterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+# Fin de frase: signo de cierre seguido de espacio, o salto de línea
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+class ResponseCache:
+    """
+    Caché de respuestas LLM con caducidad.
+
+    El nivel en memoria es un LRU de ``max_entries`` respuestas; con ``path``
+    se añade un nivel en SQLite que sobrevive a los reinicios y rellena la
+    memoria al acertar. Cada entrada caduca a los ``ttl`` segundos indicados
+    al guardarla (``default_ttl`` si no se indica; 0 no guarda).
+
+    Como en nexus_audio.AudioCache, ``get`` y ``put`` son corrutinas: el
+    nivel en memoria se consulta en el event loop y el acceso a SQLite corre
+    en un hilo (``asyncio.to_thread``) con la conexión protegida por un candado.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 3600.0, path: str = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.path = path
+        # key -> (caduca_en, contenido, latencia original en segundos)
+        self._entries: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_latency": 0.0}
+        self._pending: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                "latency REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Hash estable de la petición."""
+        payload = json.dumps({"model": model, "messages": messages, "params": params},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Respuesta guardada para ``key``, o None si no existe o ha caducado."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["saved_latency"] += entry[2]
+                return entry[1]
+            del self._entries[key]
+
+        if self.connection is not None:
+            entry = await asyncio.to_thread(self._load, key, now)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats["disk_hits"] += 1
+                self.stats["saved_latency"] += entry[2]
+                return entry[1]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, content: str, latency: float, ttl: float = None):
+        """Guarda una respuesta obtenida en ``latency`` segundos."""
+        task = self.put_in_background(key, content, latency, ttl)
+        if task is not None:
+            await task
+
+    def put_in_background(self, key: str, content: str, latency: float,
+                          ttl: float = None) -> Optional[asyncio.Task]:
+        """Guarda la respuesta en memoria y programa la escritura en disco sin esperarla."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or content is None:
+            return None
+        entry = (time.time() + ttl, content, latency)
+        self._remember(key, entry)
+        if self.connection is None:
+            return None
+        task = asyncio.ensure_future(asyncio.to_thread(self._store, key, entry))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def drain(self):
+        """Espera a que terminen las escrituras pendientes."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def _remember(self, key: str, entry: Tuple[float, str, float]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, str, float]]:
+        """Lee una respuesta del nivel en disco (en un hilo); borra la fila si ha caducado."""
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT expires_at, content, latency FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self.connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return tuple(row)
+
+    def _store(self, key: str, entry: Tuple[float, str, float]):
+        """Escribe una respuesta en el nivel en disco (en un hilo)."""
+        try:
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, expires_at, content, latency) VALUES (?, ?, ?, ?)",
+                    (key,) + entry
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error guardando respuesta en la caché: {e}")
+
+    def clear(self):
+        """Vacía ambos niveles."""
+        self._entries.clear()
+        if self.connection is not None:
+            with self._lock, self.connection:
+                self.connection.execute("DELETE FROM llm_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aciertos por nivel, fallos, ratio de aciertos y latencia ahorrada (s)."""
+        stats = dict(self.stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["entries"] = len(self._entries)
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+class LLMClient:
+    """
+    Cliente de chat completions asíncrono con conexiones reutilizadas.
+
+    El cliente HTTP se crea en la primera llamada, dentro del event loop que
+    lo va a usar. ``timeout`` es el tiempo máximo total de cada llamada y
+    puede sobrescribirse por llamada. Con ``cache`` las respuestas se sirven
+    desde ResponseCache, pero por defecto solo las de temperature=0: con
+    temperatura mayor el mismo prompt debe poder dar respuestas distintas.
+    Cada llamada puede forzarlo con ``cache=True``/``cache=False`` y fijar
+    su ``cache_ttl``.
+
+    Las llamadas idénticas y concurrentes se agrupan siempre, se cacheen o
+    no (single-flight): solo la primera llega al proveedor y el resto espera
+    su resultado. La petición compartida solo se cancela cuando la cancelan
+    todos los que la esperan.
+    """
+
+    def __init__(self, api_key: str = None, default_model: str = "gpt-4",
+                 timeout: float = 60.0, max_connections: int = 100, max_retries: int = 2,
+                 cache: ResponseCache = None):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.cache = cache
+        self.default_model = default_model
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self._client: Optional["openai.AsyncOpenAI"] = None
+        # key -> [petición compartida, número de llamadas esperándola]
+        self._inflight: Dict[str, list] = {}
+        self.stats = {"calls": 0, "errors": 0, "timeouts": 0, "cancelled": 0,
+                      "coalesced": 0, "total_latency": 0.0,
+                      "streams": 0, "total_first_token_latency": 0.0}
+
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        if self._client is None:
+            import httpx
+            import openai
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, http_client=http_client,
+                                              max_retries=self.max_retries)
+        return self._client
+
+    async def chat(self, messages: List[Dict[str, str]], model: str = None,
+                   temperature: float = None, timeout: float = None,
+                   cache: bool = None, cache_ttl: float = None, **params) -> str:
+        """Envía una conversación y devuelve el contenido de la respuesta."""
+        model = model or self.default_model
+        if temperature is not None:
+            params["temperature"] = temperature
+
+        timeout = timeout or self.timeout
+        key = ResponseCache.key(model, messages, params)
+        cacheable = self.cache is not None and self._cacheable(cache, params)
+        if cacheable:
+            content = await self.cache.get(key)
+            if content is not None:
+                return content
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = [asyncio.ensure_future(
+                self._fetch(key, model, messages, timeout, params, cache_ttl if cacheable else 0)
+            ), 0]
+            self._inflight[key] = flight
+        else:
+            self.stats["coalesced"] += 1
+
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            if flight[1] == 1 and not flight[0].done():
+                flight[0].cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    @staticmethod
+    def _cacheable(cache: Optional[bool], params: Dict[str, Any]) -> bool:
+        """Sin indicación explícita solo se cachean las llamadas deterministas."""
+        if cache is None:
+            return params.get("temperature") == 0
+        return cache
+
+    async def _fetch(self, key: str, model: str, messages: List[Dict[str, str]],
+                     timeout: float, params: Dict[str, Any], cache_ttl: float = None) -> str:
+        """Petición compartida por las llamadas con la misma clave; la guarda en caché salvo con ``cache_ttl=0``."""
+        try:
+            start = time.perf_counter()
+            content = await self._request(model, messages, timeout, params)
+            if self.cache is not None and cache_ttl != 0:
+                self.cache.put_in_background(key, content, time.perf_counter() - start, cache_ttl)
+            return content
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _request(self, model: str, messages: List[Dict[str, str]],
+                       timeout: float, params: Dict[str, Any]) -> str:
+        """Llamada real al proveedor, con tiempo máximo y estadísticas."""
+        self.stats["calls"] += 1
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=model, messages=messages, timeout=timeout, **params
+                ),
+                timeout
+            )
+            return response.choices[0].message.content
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["total_latency"] += time.perf_counter() - start
+
+    async def complete(self, prompt: str, **kwargs) -> str:
+        """Atajo de chat() para un único mensaje de usuario."""
+        return await self.chat([{"role": "user", "content": prompt}], **kwargs)
+
+    async def stream_chat(self, messages: List[Dict[str, str]], model: str = None,
+                          temperature: float = None, timeout: float = None,
+                          cache: bool = None, cache_ttl: float = None, **params) -> AsyncIterator[str]:
+        """
+        Como chat(), pero produce los fragmentos de texto según llegan.
+
+        Un acierto de caché se produce como un único fragmento. ``timeout`` se
+        aplica al stream completo. Las llamadas en streaming no se agrupan.
+        """
+        model = model or self.default_model
+        if temperature is not None:
+            params["temperature"] = temperature
+
+        key = None
+        if self._cacheable(cache, params) and self.cache is not None:
+            key = ResponseCache.key(model, messages, params)
+            content = await self.cache.get(key)
+            if content is not None:
+                yield content
+                return
+
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.stats["calls"] += 1
+        self.stats["streams"] += 1
+        start = time.perf_counter()
+        parts: List[str] = []
+        response = None
+        try:
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=model, messages=messages, timeout=timeout, stream=True, **params
+                ),
+                timeout
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if not parts:
+                    self.stats["total_first_token_latency"] += time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["total_latency"] += time.perf_counter() - start
+            # Si el consumidor abandona el stream, se cierra la respuesta HTTP
+            if response is not None and getattr(response, "response", None) is not None:
+                await response.response.aclose()
+
+        if key is not None:
+            self.cache.put_in_background(key, "".join(parts), time.perf_counter() - start, cache_ttl)
+
+    async def complete_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Atajo de stream_chat() para un único mensaje de usuario."""
+        async for delta in self.stream_chat([{"role": "user", "content": prompt}], **kwargs):
+            yield delta
+
+    async def aclose(self):
+        """Cierra el pool de conexiones HTTP, tras las escrituras pendientes en la caché."""
+        if self.cache is not None:
+            await self.cache.drain()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Llamadas realizadas, fallos, latencia media (s) y estadísticas de caché."""
+        stats = dict(self.stats)
+        stats["avg_latency"] = stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0
+        stats["avg_first_token_latency"] = (
+            stats["total_first_token_latency"] / stats["streams"] if stats["streams"] else 0.0
+        )
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+
+_shared_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Cliente LLM compartido del proceso."""
+    global _shared_client
+    if _shared_client is None:
+        cache = None
+        if os.getenv('NEXUS_LLM_CACHE_ENABLED', 'true').lower() == 'true':
+            cache = ResponseCache(
+                max_entries=int(os.getenv('NEXUS_LLM_CACHE_SIZE', '1024')),
+                default_ttl=float(os.getenv('NEXUS_LLM_CACHE_TTL', '3600')),
+                path=os.getenv('NEXUS_LLM_CACHE_PATH') or None
+            )
+        _shared_client = LLMClient(cache=cache)
+    return _shared_client
+
+
+async def iter_sentences(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Agrupa un stream de fragmentos de texto en frases completas."""
+    buffer = ""
+    async for delta in deltas:
+        buffer += delta
+        parts = SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Memoria Persistente de Nexus
+============================
+
+Implementación de MemoryStore respaldada por SQLite en modo WAL. El contexto
+sobrevive a los reinicios, los índices (FTS5 para texto e índices B-tree para
+proyecto, canal, participante y tiempo) viven en el propio fichero y se
+reabren sin volver a procesar el contenido, y los ContextItem solo se
+construyen cuando se accede a ellos.
+
+Las escrituras se agrupan: cada cambio va en su propio savepoint dentro de
+una transacción que se confirma cada ``batch_size`` cambios o, como muy
+tarde, a los ``flush_interval`` segundos del primero pendiente.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Any, Iterator, Optional
+
+from nexus_core import MemoryStore, ContextItem, synchronized
+from nexus_search import tokenize
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS context_items (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    source TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    importance_score REAL NOT NULL,
+    project_id TEXT,
+    conversation_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_context_timestamp ON context_items (timestamp);
+CREATE INDEX IF NOT EXISTS idx_context_type ON context_items (type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_context_source ON context_items (source, timestamp);
+CREATE INDEX IF NOT EXISTS idx_context_project ON context_items (project_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_context_conversation ON context_items (conversation_id, timestamp);
+CREATE TABLE IF NOT EXISTS context_participants (
+    participant TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    PRIMARY KEY (participant, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_participants_item ON context_participants (item_id);
+-- El rowid de cada fila FTS coincide con el rowid de su fila en context_items
+CREATE VIRTUAL TABLE IF NOT EXISTS context_fts USING fts5(
+    body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_COLUMNS = "id, type, content, source, timestamp, metadata, importance_score"
+
+
+class _PersistentContextItems(MutableMapping):
+    """
+    Vista tipo dict de los elementos guardados en SQLite.
+
+    Hidrata cada ContextItem al accederlo y mantiene los más recientes en una
+    caché LRU acotada, de modo que el código que usa ``context_items[item_id]``
+    funciona sin cargar toda la memoria.
+    """
+
+    def __init__(self, store: "SQLiteMemoryStore", cache_size: int):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, ContextItem]" = OrderedDict()
+
+    def __getitem__(self, item_id: str) -> ContextItem:
+        context_item = self._cache.get(item_id)
+        if context_item is not None:
+            self._cache.move_to_end(item_id)
+            return context_item
+
+        row = self.store.connection.execute(
+            f"SELECT {_COLUMNS} FROM context_items WHERE id = ?", (item_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(item_id)
+        return self._remember(_row_to_item(row))
+
+    def __setitem__(self, item_id: str, context_item: ContextItem):
+        self.store.add_context(context_item)
+
+    def __delitem__(self, item_id: str):
+        if not self.store.remove_context(item_id):
+            raise KeyError(item_id)
+
+    def __contains__(self, item_id: object) -> bool:
+        if item_id in self._cache:
+            return True
+        return self.store.connection.execute(
+            "SELECT 1 FROM context_items WHERE id = ?", (item_id,)
+        ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (item_id,) in self.store.connection.execute(
+            "SELECT id FROM context_items ORDER BY timestamp"
+        ):
+            yield item_id
+
+    def __len__(self) -> int:
+        return self.store.connection.execute("SELECT COUNT(*) FROM context_items").fetchone()[0]
+
+    def _remember(self, context_item: ContextItem) -> ContextItem:
+        self._cache[context_item.id] = context_item
+        self._cache.move_to_end(context_item.id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return context_item
+
+    def _forget(self, item_id: str):
+        self._cache.pop(item_id, None)
+
+
+def _row_to_item(row) -> ContextItem:
+    item_id, item_type, content, source, timestamp, metadata, importance_score = row
+    return ContextItem(
+        id=item_id,
+        type=item_type,
+        content=content,
+        source=source,
+        timestamp=datetime.fromtimestamp(timestamp),
+        metadata=json.loads(metadata),
+        importance_score=importance_score
+    )
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """
+    MemoryStore persistente sobre SQLite (WAL).
+
+    Mantiene la API de MemoryStore: ``add_context``, ``remove_context``,
+    ``search_context``, ``get_project_context`` y ``query_context``. La
+    búsqueda de texto usa FTS5 con BM25 mezclado con ``importance_score``.
+    Los valores de metadata se serializan como JSON (los no serializables,
+    como datetime, se guardan como texto).
+
+    Los cambios se confirman en lotes de ``batch_size`` (NEXUS_MEMORY_BATCH_SIZE)
+    o a los ``flush_interval`` segundos (NEXUS_MEMORY_FLUSH_SECONDS); la propia
+    conexión los ve antes de confirmarse. ``flush`` y ``close`` confirman lo
+    pendiente; con ``batch_size=1`` cada cambio se confirma al hacerlo.
+    """
+
+    def __init__(self, path: str = "nexus_memory.db", cache_size: int = 10_000,
+                 batch_size: int = None, flush_interval: float = None):
+        super().__init__()
+        self.path = path
+        if batch_size is None:
+            batch_size = int(os.getenv('NEXUS_MEMORY_BATCH_SIZE', '64'))
+        if flush_interval is None:
+            flush_interval = float(os.getenv('NEXUS_MEMORY_FLUSH_SECONDS', '1.0'))
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending_writes = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self.stats.update(writes=0, commits=0)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self.context_items = _PersistentContextItems(self, cache_size)
+        logger.info(f"Memoria persistente abierta: {path} ({len(self.context_items)} elementos)")
+
+    def close(self):
+        """Confirma las escrituras pendientes y cierra la conexión con la base de datos."""
+        self.flush()
+        self.connection.close()
+
+    @synchronized
+    def flush(self):
+        """Confirma las escrituras pendientes."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self.connection.in_transaction:
+            self.connection.commit()
+            self.stats["commits"] += 1
+        self._pending_writes = 0
+
+    @contextmanager
+    def _write(self):
+        """Un cambio atómico dentro del lote en curso."""
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN")
+        self.connection.execute("SAVEPOINT nexus_write")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK TO nexus_write")
+            self.connection.execute("RELEASE nexus_write")
+            raise
+        self.connection.execute("RELEASE nexus_write")
+        self.stats["writes"] += 1
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    @synchronized
+    def add_context(self, context_item: ContextItem):
+        """Añade (o reemplaza) un elemento de contexto en la base de datos."""
+        metadata = context_item.metadata
+        participants = metadata.get("participants") or []
+
+        with self._write():
+            self._delete_rows(context_item.id)
+            cursor = self.connection.execute(
+                "INSERT INTO context_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    context_item.id, context_item.type, context_item.content,
+                    context_item.source, context_item.timestamp.timestamp(),
+                    json.dumps(metadata, default=str), context_item.importance_score,
+                    _optional_text(metadata.get("project_id")),
+                    _optional_text(metadata.get("conversation_id")),
+                )
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO context_participants VALUES (?, ?)",
+                [(str(participant), context_item.id) for participant in participants]
+            )
+            self.connection.execute(
+                "INSERT INTO context_fts (rowid, body) VALUES (?, ?)",
+                (cursor.lastrowid, self._searchable_text(context_item))
+            )
+
+        self.context_items._remember(context_item)
+        logger.info(f"Contexto añadido: {context_item.type} - {context_item.id}")
+
+    @synchronized
+    def remove_context(self, item_id: str) -> bool:
+        """Elimina un elemento de contexto de la base de datos."""
+        with self._write():
+            removed = self._delete_rows(item_id)
+        self.context_items._forget(item_id)
+        if removed:
+            logger.info(f"Contexto eliminado: {item_id}")
+        return removed
+
+    def _delete_rows(self, item_id: str) -> bool:
+        row = self.connection.execute(
+            "SELECT rowid FROM context_items WHERE id = ?", (item_id,)
+        ).fetchone()
+        if row is None:
+            return False
+        self.connection.execute("DELETE FROM context_fts WHERE rowid = ?", row)
+        self.connection.execute("DELETE FROM context_items WHERE rowid = ?", row)
+        self.connection.execute("DELETE FROM context_participants WHERE item_id = ?", (item_id,))
+        return True
+
+    @synchronized
+    def search_context(self, query: str, limit: int = 10) -> List[ContextItem]:
+        """Busca contexto con FTS5 (BM25) mezclado con la importancia."""
+        terms = tokenize(query)
+        if not terms or limit <= 0:
+            return []
+
+        match = " OR ".join(f'"{term}"' for term in set(terms))
+        # Se traen más candidatos que ``limit`` para que la importancia pueda reordenarlos
+        rows = self.connection.execute(
+            """
+            SELECT context_items.id, -bm25(context_fts), context_items.importance_score
+            FROM context_fts JOIN context_items ON context_items.rowid = context_fts.rowid
+            WHERE context_fts MATCH ?
+            ORDER BY bm25(context_fts)
+            LIMIT ?
+            """,
+            (match, limit * 5)
+        ).fetchall()
+        if not rows:
+            return []
+
+        max_relevance = max(relevance for _, relevance, _ in rows) or 1.0
+        ranked = sorted(
+            (
+                ((1 - self.IMPORTANCE_WEIGHT) * relevance / max_relevance +
+                 self.IMPORTANCE_WEIGHT * importance_score, item_id)
+                for item_id, relevance, importance_score in rows
+            ),
+            reverse=True
+        )[:limit]
+        return [self.context_items[item_id] for _, item_id in ranked]
+
+    @synchronized
+    def query_context(self, type: str = None, source: str = None,
+                      project_id: str = None, conversation_id: str = None,
+                      participant: str = None, since: datetime = None,
+                      until: datetime = None, limit: int = None) -> List[ContextItem]:
+        """Filtra el contexto con los índices de SQLite (misma semántica que MemoryStore)."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("type", type), ("source", source),
+                              ("project_id", project_id), ("conversation_id", conversation_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(_optional_text(value))
+        if participant is not None:
+            clauses.append("id IN (SELECT item_id FROM context_participants WHERE participant = ?)")
+            params.append(str(participant))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until.timestamp())
+
+        sql = f"SELECT {_COLUMNS} FROM context_items"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            if limit <= 0:
+                return []
+            sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+            params.append(limit)
+            rows = self.connection.execute(sql, params).fetchall()[::-1]
+        else:
+            sql += " ORDER BY timestamp, id"
+            rows = self.connection.execute(sql, params).fetchall()
+
+        return [self.context_items._remember(_row_to_item(row)) for row in rows]
+
+
+def _optional_text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
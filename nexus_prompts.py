@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Construcción de Prompts de Nexus
+================================
+
+Prompt de síntesis con presupuesto de tokens. En lugar de volcar las tareas
+y los resultados completos (código, tests y documentación incluidos), cada
+tarea se reduce a sus campos útiles, los resultados largos se recortan y el
+conjunto se ajusta a un techo configurable.
+
+Los tokens se estiman como caracteres / 4, suficiente para presupuestar sin
+depender de un tokenizador concreto.
+
+La política de síntesis decide además si hace falta llamar al LLM: los
+comandos de una sola tarea se responden directamente con su resultado (o una
+plantilla si es estructurado) y el resto puede ir a un modelo más barato.
+"""
+
+import os
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Any, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación aproximada de tokens de un texto."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class SynthesisPromptBuilder:
+    """
+    Prompt de síntesis acotado a ``max_tokens`` tokens estimados.
+
+    Cada resultado se compacta (los campos de código se resumen en su número
+    de líneas, los textos se cortan a ``max_field_chars`` y las listas a
+    ``max_list_items``) y después se recorta para que todas las tareas quepan
+    en el presupuesto: las líneas cortas ceden su sobrante a las largas. Si
+    ni siquiera caben ``MIN_TASK_CHARS`` por tarea, las últimas se omiten con
+    una nota. El comando original se recorta a ``max_command_chars``.
+    """
+
+    INSTRUCTIONS = (
+        "Proporciona una síntesis clara y concisa de lo que se ha completado, "
+        "incluyendo cualquier problema encontrado y próximos pasos recomendados. "
+        "Mantén un tono profesional pero conversacional."
+    )
+    MIN_TASK_CHARS = 200
+
+    def __init__(self, max_tokens: int = 3000, max_field_chars: int = 400,
+                 max_list_items: int = 10, history: int = 1000,
+                 max_command_chars: int = 2000, raw_sample_every: int = 20):
+        self.max_tokens = max_tokens
+        self.max_field_chars = max_field_chars
+        self.max_list_items = max_list_items
+        # Nunca más de un cuarto del presupuesto para el comando
+        self.max_command_chars = min(max_command_chars, max_tokens * CHARS_PER_TOKEN // 4)
+        # El tamaño del volcado completo solo se mide en uno de cada N prompts
+        self.raw_sample_every = max(1, raw_sample_every)
+        self._builds = 0
+        self._prompt_tokens: Deque[int] = deque(maxlen=history)
+        self._raw_tokens: Deque[int] = deque(maxlen=history)
+
+    @classmethod
+    def from_env(cls) -> "SynthesisPromptBuilder":
+        return cls(max_tokens=int(os.getenv('NEXUS_SYNTHESIS_MAX_TOKENS', '3000')))
+
+    def build(self, command: str, tasks: List[Any], results: Dict[str, Any]) -> str:
+        """Construye el prompt de síntesis para las tareas de un comando."""
+        header = (
+            "Eres Nexus. Has ejecutado múltiples tareas basadas en el siguiente comando:\n\n"
+            f"Comando original: {self._clip(' '.join(command.split()), self.max_command_chars)}\n\n"
+            "Tareas ejecutadas y sus resultados (JSON compacto; los resultados largos están recortados):\n"
+        )
+        footer = f"\n\n{self.INSTRUCTIONS}"
+        available_chars = self.max_tokens * CHARS_PER_TOKEN - len(header) - len(footer)
+        local_ids = {task.id: f"t{position + 1}" for position, task in enumerate(tasks)}
+
+        lines = []
+        for task in tasks:
+            entry = {
+                "id": local_ids[task.id],
+                "agente": task.agent_type.value,
+                "descripcion": self._truncate(task.description),
+                "estado": task.status,
+            }
+            if task.dependencies:
+                entry["depende_de"] = [local_ids.get(dependency, dependency) for dependency in task.dependencies]
+            if task.error:
+                entry["error"] = self._truncate(task.error)
+            elif task.id in results:
+                entry["resultado"] = self._compact(results[task.id])
+            lines.append(_compact_json(entry))
+
+        body = "\n".join(self._fit(lines, available_chars))
+        prompt = header + body + footer
+        self._record(prompt, tasks, results)
+        return prompt
+
+    def _fit(self, lines: List[str], available_chars: int) -> List[str]:
+        """Recorta y, si hace falta, omite líneas para que quepan en ``available_chars``."""
+        if sum(len(line) + 1 for line in lines) <= available_chars:
+            return lines
+
+        def omitted_note(kept: int) -> str:
+            return f"… ({len(lines) - kept} tareas más omitidas por espacio)" if kept < len(lines) else ""
+
+        def room(kept: int) -> int:
+            # Cada línea lleva su salto de línea, igual que la nota de omisión
+            note = omitted_note(kept)
+            return available_chars - kept - (len(note) + 1 if note else 0)
+
+        kept = len(lines)
+        while kept and room(kept) // kept < self.MIN_TASK_CHARS:
+            kept -= 1
+        budget = room(kept)
+
+        # Reparto equitativo: las líneas que caben enteras liberan su sobrante
+        limits = {}
+        remaining = sorted(range(kept), key=lambda index: len(lines[index]))
+        while remaining:
+            share = max(0, budget) // len(remaining)
+            index = remaining[0]
+            if len(lines[index]) > share:
+                for index in remaining:
+                    limits[index] = share
+                break
+            limits[index] = len(lines[index])
+            budget -= len(lines[index])
+            remaining.pop(0)
+
+        fitted = [self._clip(lines[index], limits[index]) for index in range(kept)]
+        if kept < len(lines):
+            fitted.append(omitted_note(kept))
+        return fitted
+
+    @staticmethod
+    def _clip(text: str, limit: int) -> str:
+        if len(text) <= limit:
+            return text
+        return text[:max(0, limit - 1)] + "…"
+
+    def _compact(self, value: Any, key: str = "") -> Any:
+        """Versión reducida de un resultado para el prompt."""
+        if isinstance(value, dict):
+            return {k: self._compact(v, str(k)) for k, v in value.items() if v not in (None, "", [], {})}
+        if isinstance(value, (list, tuple)):
+            items = [self._compact(item, key) for item in value[:self.max_list_items]]
+            if len(value) > self.max_list_items:
+                items.append(f"... ({len(value) - self.max_list_items} más)")
+            return items
+        if isinstance(value, str):
+            if key.endswith("code") and "\n" in value:
+                return f"[código de {value.count(chr(10)) + 1} líneas]"
+            return self._truncate(value)
+        return value
+
+    def _truncate(self, text: str) -> str:
+        return self._clip(" ".join(text.split()), self.max_field_chars)
+
+    def _record(self, prompt: str, tasks: List[Any], results: Dict[str, Any]):
+        self._prompt_tokens.append(estimate_tokens(prompt))
+        self._builds += 1
+        # Tamaño del volcado completo anterior, para medir la reducción (muestreado:
+        # serializar los resultados completos cuesta más que construir el prompt)
+        if (self._builds - 1) % self.raw_sample_every == 0:
+            raw = _compact_json([getattr(task, "__dict__", str(task)) for task in tasks]) + _compact_json(results)
+            self._raw_tokens.append(estimate_tokens(raw))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Distribución del tamaño (tokens estimados) de los prompts recientes."""
+        sizes = sorted(self._prompt_tokens)
+        if not sizes:
+            return {"prompts": 0}
+
+        def percentile(fraction: float) -> int:
+            return sizes[min(len(sizes) - 1, int(fraction * len(sizes)))]
+
+        return {
+            "prompts": len(sizes),
+            "max_tokens": self.max_tokens,
+            "mean": sum(sizes) / len(sizes),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "max": sizes[-1],
+            "raw_mean": sum(self._raw_tokens) / len(self._raw_tokens),
+            "raw_samples": len(self._raw_tokens),
+        }
+
+
+@dataclass
+class SynthesisDecision:
+    """Cómo sintetizar un comando: skip | template | cheap | full."""
+    mode: str
+    model: Optional[str] = None  # modelo LLM (cheap y full)
+    text: Optional[str] = None  # respuesta ya construida (skip y template)
+
+    @property
+    def uses_llm(self) -> bool:
+        return self.text is None
+
+
+class SynthesisPolicy:
+    """
+    Decide si la síntesis necesita una llamada al LLM.
+
+    Con la política ``auto``:
+
+    - una sola tarea con resultado de texto se devuelve tal cual (skip)
+    - una sola tarea con resultado estructurado o con error se resume con
+      una plantilla (template)
+    - varias tareas completadas sin errores van al modelo barato (cheap)
+    - varias tareas con algún error van al modelo completo (full), que debe
+      explicar los problemas y proponer próximos pasos
+
+    La política ``full`` conserva el comportamiento anterior (siempre GPT-4).
+    Por cada comando se registra el modo elegido y la latencia de la síntesis.
+    """
+
+    MODES = ("skip", "template", "cheap", "full")
+
+    def __init__(self, policy: str = "auto", full_model: str = "gpt-4",
+                 cheap_model: str = "gpt-3.5-turbo", prompts: SynthesisPromptBuilder = None):
+        self.policy = policy
+        self.full_model = full_model
+        self.cheap_model = cheap_model
+        self.prompts = prompts or SynthesisPromptBuilder()
+        self.counts = {mode: 0 for mode in self.MODES}
+        self.seconds = {mode: 0.0 for mode in self.MODES}
+
+    @classmethod
+    def from_env(cls, prompts: SynthesisPromptBuilder = None) -> "SynthesisPolicy":
+        return cls(
+            policy=os.getenv('NEXUS_SYNTHESIS_POLICY', 'auto').lower(),
+            cheap_model=os.getenv('NEXUS_SYNTHESIS_CHEAP_MODEL', 'gpt-3.5-turbo'),
+            prompts=prompts,
+        )
+
+    def decide(self, tasks: List[Any], results: Dict[str, Any]) -> SynthesisDecision:
+        """Elige el modo de síntesis para las tareas de un comando."""
+        if self.policy != "auto":
+            return SynthesisDecision("full", model=self.full_model)
+
+        if len(tasks) == 1:
+            task = tasks[0]
+            result = results.get(task.id)
+            if task.status == "completed" and isinstance(result, str) and result.strip():
+                return SynthesisDecision("skip", text=result.strip())
+            return SynthesisDecision("template", text=self.render(task, result))
+
+        if all(task.status == "completed" for task in tasks):
+            return SynthesisDecision("cheap", model=self.cheap_model)
+        return SynthesisDecision("full", model=self.full_model)
+
+    def render(self, task: Any, result: Any) -> str:
+        """Resumen en texto de una sola tarea, sin LLM."""
+        agent = task.agent_type.value
+        if task.status != "completed":
+            return (f"{agent} no pudo completar la tarea \"{task.description}\": "
+                    f"{task.error or 'error desconocido'}. Revisa los logs para más detalles.")
+
+        lines = [f"{agent} ha completado la tarea \"{task.description}\"."]
+        if isinstance(result, dict):
+            if isinstance(result.get("message"), str):
+                lines.append(result["message"])
+            else:
+                for key, value in self.prompts._compact(result).items():
+                    if isinstance(value, (dict, list)):
+                        value = _compact_json(value)
+                    lines.append(f"- {key}: {value}")
+        elif result is not None:
+            lines.append(self.prompts._truncate(str(result)))
+        return "\n".join(lines)
+
+    def record(self, decision: SynthesisDecision, seconds: float) -> Dict[str, Any]:
+        """Registra la síntesis de un comando y devuelve su resumen de ahorro."""
+        self.counts[decision.mode] += 1
+        self.seconds[decision.mode] += seconds
+        return {
+            "mode": decision.mode,
+            "model": decision.model,
+            "seconds": seconds,
+            "llm_calls_saved": 0 if decision.uses_llm else 1,
+            "estimated_seconds_saved": max(0.0, self._average("full") - seconds) if decision.mode != "full" else 0.0,
+        }
+
+    def _average(self, mode: str) -> float:
+        return self.seconds[mode] / self.counts[mode] if self.counts[mode] else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Comandos por modo, latencia media de cada uno y llamadas LLM evitadas."""
+        commands = sum(self.counts.values())
+        return {
+            "policy": self.policy,
+            "commands": commands,
+            "counts": dict(self.counts),
+            "avg_seconds": {mode: self._average(mode) for mode in self.MODES},
+            "llm_calls_saved": self.counts["skip"] + self.counts["template"],
+            "skip_ratio": (self.counts["skip"] + self.counts["template"]) / commands if commands else 0.0,
+        }
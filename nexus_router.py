@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Enrutador Local de Nexus
+========================
+
+Clasificador previo a la descomposición con LLM. Los comandos que encajan
+claramente con las capacidades de un único agente se envían directamente a
+ese agente en microsegundos; los ambiguos o de varios pasos siguen yendo al
+descomponedor. Opcionalmente, un modelo Naive Bayes entrenado con las
+descomposiciones anteriores resuelve los casos que las palabras clave no
+deciden.
+"""
+
+import os
+import math
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Hashable
+
+from nexus_search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Conectores que indican un comando de varios pasos
+MULTI_STEP_MARKERS = frozenset({
+    "luego", "despues", "ademas", "tambien", "finalmente", "then", "after", "also",
+})
+
+
+def _stem(token: str) -> str:
+    """Reducción mínima de plurales para comparar términos ("endpoints" -> "endpoint")."""
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(token) for token in tokenize(text)]
+
+
+@dataclass
+class RouteDecision:
+    """Resultado del enrutado: agente elegido (None = usar el LLM) y su confianza."""
+    target: Optional[Hashable]
+    confidence: float
+    reason: str  # keywords | model | multi_step | ambiguous
+    scores: Dict[Any, float] = field(default_factory=dict)
+
+
+class NaiveBayesIntentModel:
+    """
+    Clasificador Naive Bayes multinomial sobre términos, entrenable en línea.
+
+    No predice nada hasta haber visto ``min_examples`` ejemplos.
+    """
+
+    def __init__(self, alpha: float = 1.0, min_examples: int = 50):
+        self.alpha = alpha
+        self.min_examples = min_examples
+        self.label_counts: Dict[Hashable, int] = {}
+        self.term_counts: Dict[Hashable, Dict[str, int]] = {}
+        self.label_totals: Dict[Hashable, int] = {}
+        self.vocabulary: set = set()
+        self.examples = 0
+
+    def learn(self, text: str, label: Hashable):
+        """Añade un ejemplo etiquetado."""
+        self.examples += 1
+        self.label_counts[label] = self.label_counts.get(label, 0) + 1
+        counts = self.term_counts.setdefault(label, {})
+        for term in _terms(text):
+            counts[term] = counts.get(term, 0) + 1
+            self.label_totals[label] = self.label_totals.get(label, 0) + 1
+            self.vocabulary.add(term)
+
+    def fit(self, examples: Iterable[Tuple[str, Hashable]]) -> "NaiveBayesIntentModel":
+        """Entrena con una colección de (texto, etiqueta)."""
+        for text, label in examples:
+            self.learn(text, label)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[Hashable], float]:
+        """Devuelve (etiqueta más probable, probabilidad a posteriori)."""
+        if self.examples < self.min_examples or not self.label_counts:
+            return None, 0.0
+
+        terms = _terms(text)
+        vocabulary_size = len(self.vocabulary) or 1
+        log_scores = {}
+        for label, label_count in self.label_counts.items():
+            counts = self.term_counts.get(label, {})
+            denominator = self.label_totals.get(label, 0) + self.alpha * vocabulary_size
+            score = math.log(label_count / self.examples)
+            for term in terms:
+                score += math.log((counts.get(term, 0) + self.alpha) / denominator)
+            log_scores[label] = score
+
+        best = max(log_scores, key=log_scores.get)
+        top = log_scores[best]
+        normalizer = sum(math.exp(score - top) for score in log_scores.values())
+        return best, 1.0 / normalizer
+
+
+class CapabilityRouter:
+    """
+    Enrutador por palabras clave de capacidades.
+
+    Cada capacidad (p. ej. "casos de prueba") cuenta como coincidencia cuando
+    todos sus términos aparecen en el comando; las capacidades compartidas por
+    varios agentes reparten su peso. Un comando se enruta directamente cuando
+    el agente con más peso reúne al menos ``min_confidence`` del total.
+    """
+
+    def __init__(self, capabilities: Dict[Hashable, List[str]], min_confidence: float = 0.75,
+                 model: NaiveBayesIntentModel = None, model_confidence: float = 0.9):
+        self.min_confidence = min_confidence
+        self.model = model
+        self.model_confidence = model_confidence
+        self.stats = {"keywords": 0, "model": 0, "llm": 0, "route_seconds": 0.0}
+
+        owners: Dict[frozenset, List[Hashable]] = {}
+        for target, phrases in capabilities.items():
+            for phrase in phrases:
+                terms = frozenset(_terms(phrase))
+                if terms and target not in owners.setdefault(terms, []):
+                    owners[terms].append(target)
+
+        # término -> capacidades que lo contienen, para revisar solo las candidatas
+        self._phrases: Dict[str, List[Tuple[frozenset, List[Hashable]]]] = {}
+        for terms, targets in owners.items():
+            for term in terms:
+                self._phrases.setdefault(term, []).append((terms, targets))
+
+    @classmethod
+    def from_agents(cls, agents: Dict[Hashable, Any], **kwargs) -> "CapabilityRouter":
+        """Construye el enrutador con las ``capabilities`` de cada agente."""
+        return cls({agent_type: agent.capabilities for agent_type, agent in agents.items()}, **kwargs)
+
+    @classmethod
+    def from_env(cls, agents: Dict[Hashable, Any]) -> "CapabilityRouter":
+        """
+        Enrutador de ``agents`` con un modelo Naive Bayes que aprende de las
+        descomposiciones del LLM (ver ``learn``).
+
+        NEXUS_INTENT_MODEL=false lo construye sin modelo y
+        NEXUS_INTENT_MIN_EXAMPLES fija los ejemplos necesarios para predecir.
+        """
+        model = None
+        if os.getenv('NEXUS_INTENT_MODEL', 'true').lower() == 'true':
+            model = NaiveBayesIntentModel(min_examples=int(os.getenv('NEXUS_INTENT_MIN_EXAMPLES', '50')))
+        return cls.from_agents(agents, model=model)
+
+    def keyword_scores(self, command: str) -> Dict[Hashable, float]:
+        """Peso de cada agente según las capacidades presentes en el comando."""
+        terms = set(_terms(command))
+        matched = set()
+        scores: Dict[Hashable, float] = {}
+        for term in terms:
+            for phrase, targets in self._phrases.get(term, ()):
+                if phrase in matched or not phrase <= terms:
+                    continue
+                matched.add(phrase)
+                for target in targets:
+                    scores[target] = scores.get(target, 0.0) + 1.0 / len(targets)
+        return scores
+
+    def route(self, command: str) -> RouteDecision:
+        """Decide si el comando puede ir directamente a un agente."""
+        start = time.perf_counter()
+        decision = self._decide(command)
+        self.stats["route_seconds"] += time.perf_counter() - start
+        self.stats[decision.reason if decision.target is not None else "llm"] += 1
+        return decision
+
+    def _decide(self, command: str) -> RouteDecision:
+        if MULTI_STEP_MARKERS.intersection(tokenize(command)):
+            return RouteDecision(None, 0.0, "multi_step")
+
+        scores = self.keyword_scores(command)
+        confidence = 0.0
+        best = None
+        if scores:
+            best = max(scores, key=scores.get)
+            confidence = scores[best] / sum(scores.values())
+            if confidence >= self.min_confidence:
+                return RouteDecision(best, confidence, "keywords", scores)
+
+        if self.model is not None:
+            label, probability = self.model.predict(command)
+            # El modelo no puede contradecir a las palabras clave, solo desempatar o completar
+            if label is not None and probability >= self.model_confidence and (not scores or label in scores):
+                return RouteDecision(label, probability, "model", scores)
+
+        return RouteDecision(None, confidence, "ambiguous", scores)
+
+    def learn(self, command: str, target: Hashable):
+        """Registra un enrutado confirmado (p. ej. una descomposición de una sola tarea)."""
+        if self.model is not None:
+            self.model.learn(command, target)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Comandos por camino (keywords, model, llm) y latencia media de enrutado (µs)."""
+        stats = dict(self.stats)
+        routed = stats["keywords"] + stats["model"] + stats["llm"]
+        stats["fast_path_ratio"] = (stats["keywords"] + stats["model"]) / routed if routed else 0.0
+        stats["avg_route_us"] = stats.pop("route_seconds") * 1e6 / routed if routed else 0.0
+        return stats
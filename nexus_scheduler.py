@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Planificador de Tareas de Nexus
+===============================
+
+Ejecuta las tareas descompuestas como un grafo acíclico de dependencias: cada
+tarea arranca en cuanto terminan sus prerequisitos y recibe sus resultados,
+las ramas independientes se solapan por completo y el fallo de una tarea solo
+cancela a las que dependen de ella.
+"""
+
+import heapq
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Awaitable, Set, AsyncIterator, Tuple
+
+from nexus_core import Task
+
+logger = logging.getLogger(__name__)
+
+# Ejecuta una tarea con los resultados de sus dependencias {task_id: resultado}
+TaskRunner = Callable[[Task, Dict[str, Any]], Awaitable[Any]]
+
+
+class DAGScheduler:
+    """
+    Planificador de tareas con dependencias.
+
+    Con ``max_concurrency`` se limita el número de tareas simultáneas y, entre
+    las listas para ejecutarse, se elige primero la de menor ``priority``
+    (1 = máxima) y, a igualdad, la de orden original.
+    """
+
+    def __init__(self, run_task: TaskRunner, max_concurrency: int = None):
+        self.run_task = run_task
+        self.max_concurrency = max_concurrency
+
+    async def run(self, tasks: List[Task]) -> Dict[str, Any]:
+        """Ejecuta el grafo completo y devuelve {task_id: resultado o {"error": ...}}."""
+        results: Dict[str, Any] = {}
+        async for task, result in self.stream(tasks):
+            results[task.id] = result
+        return results
+
+    async def stream(self, tasks: List[Task]) -> AsyncIterator[Tuple[Task, Any]]:
+        """
+        Ejecuta el grafo y produce (tarea, resultado) según va terminando cada tarea.
+
+        Las tareas canceladas por el fallo de una dependencia se producen en
+        cuanto se detecta el fallo. Una tarea con dependencias desconocidas
+        falla sin ejecutarse. Si el consumidor deja de iterar, las tareas en
+        curso se cancelan y se esperan antes de salir.
+        """
+        tasks_by_id = {task.id: task for task in tasks}
+        order = {task.id: position for position, task in enumerate(tasks)}
+        dependents: Dict[str, List[str]] = {task.id: [] for task in tasks}
+        pending_dependencies: Dict[str, Set[str]] = {}
+        missing: Dict[str, List[str]] = {}
+
+        for task in tasks:
+            known = set()
+            for dependency in task.dependencies:
+                if dependency in tasks_by_id:
+                    known.add(dependency)
+                    dependents[dependency].append(task.id)
+                else:
+                    missing.setdefault(task.id, []).append(dependency)
+            pending_dependencies[task.id] = known
+
+        results: Dict[str, Any] = {}
+        for task_id, dependencies in missing.items():
+            task = tasks_by_id[task_id]
+            task.status = "error"
+            task.error = f"Dependencia desconocida: {', '.join(dependencies)}"
+            logger.warning(f"{task_id}: {task.error}")
+            results[task_id] = {"error": task.error}
+            yield task, results[task_id]
+            for cancelled in self._cancel_dependents(task_id, dependents, tasks_by_id, results):
+                yield cancelled, results[cancelled.id]
+
+        ready: List[tuple] = []
+        for task in tasks:
+            if not pending_dependencies[task.id] and task.status == "pending":
+                heapq.heappush(ready, (task.priority, order[task.id], task.id))
+
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while ready or running:
+                while ready and (self.max_concurrency is None or len(running) < self.max_concurrency):
+                    _, _, task_id = heapq.heappop(ready)
+                    task = tasks_by_id[task_id]
+                    upstream = {dependency: results[dependency] for dependency in task.dependencies
+                                if dependency in results}
+                    running[asyncio.ensure_future(self._run_one(task, upstream))] = task_id
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    task = tasks_by_id[task_id]
+                    if task.status == "error":
+                        results[task_id] = {"error": task.error}
+                        yield task, results[task_id]
+                        for cancelled in self._cancel_dependents(task_id, dependents, tasks_by_id, results):
+                            yield cancelled, results[cancelled.id]
+                        continue
+
+                    results[task_id] = task.result
+                    yield task, task.result
+                    for dependent_id in dependents[task_id]:
+                        remaining = pending_dependencies[dependent_id]
+                        remaining.discard(task_id)
+                        if not remaining and tasks_by_id[dependent_id].status == "pending":
+                            heapq.heappush(ready, (tasks_by_id[dependent_id].priority,
+                                                   order[dependent_id], dependent_id))
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        # Lo que no llegó a ejecutarse está en un ciclo de dependencias o depende de uno
+        unresolved = {task.id for task in tasks if task.id not in results}
+        cyclic = self._cyclic(unresolved, tasks_by_id)
+        for task in tasks:
+            if task.id not in unresolved:
+                continue
+            if task.id in cyclic:
+                task.status = "error"
+                task.error = "Dependencia circular"
+            else:
+                task.status = "cancelled"
+                task.error = "Cancelada: depende de un ciclo de dependencias"
+            results[task.id] = {"error": task.error}
+            yield task, results[task.id]
+
+    async def _run_one(self, task: Task, upstream: Dict[str, Any]):
+        """Ejecuta una tarea y registra su estado en el propio Task."""
+        task.status = "running"
+        task.started_at = datetime.now()
+        try:
+            task.result = await self.run_task(task, upstream)
+            task.status = "completed"
+        except asyncio.CancelledError:
+            task.status = "cancelled"
+            task.error = "Cancelada"
+            raise
+        except Exception as e:
+            task.status = "error"
+            task.error = str(e)
+        task.completed_at = datetime.now()
+
+    @staticmethod
+    def _cyclic(unresolved: Set[str], tasks_by_id: Dict[str, Task]) -> Set[str]:
+        """Tareas sin resolver que forman parte de un ciclo (se alcanzan a sí mismas)."""
+        cyclic = set()
+        for start in unresolved:
+            stack = [dependency for dependency in tasks_by_id[start].dependencies if dependency in unresolved]
+            seen = set()
+            while stack:
+                task_id = stack.pop()
+                if task_id == start:
+                    cyclic.add(start)
+                    break
+                if task_id in seen:
+                    continue
+                seen.add(task_id)
+                stack.extend(dependency for dependency in tasks_by_id[task_id].dependencies
+                             if dependency in unresolved)
+        return cyclic
+
+    @staticmethod
+    def _cancel_dependents(failed_id: str, dependents: Dict[str, List[str]],
+                           tasks_by_id: Dict[str, Task], results: Dict[str, Any]) -> List[Task]:
+        """Cancela transitivamente las tareas que dependen de una tarea fallida."""
+        cancelled = []
+        stack = list(dependents[failed_id])
+        while stack:
+            task_id = stack.pop()
+            task = tasks_by_id[task_id]
+            if task.status != "pending":
+                continue
+            task.status = "cancelled"
+            task.error = f"Cancelada: la dependencia {failed_id} falló"
+            results[task_id] = {"error": task.error}
+            cancelled.append(task)
+            stack.extend(dependents[task_id])
+        return cancelled
+
+
+def critical_path_seconds(tasks: List[Task]) -> float:
+    """Duración del camino crítico según los tiempos registrados en cada tarea."""
+    tasks_by_id = {task.id: task for task in tasks}
+    finish: Dict[str, float] = {}
+
+    def longest(task_id: str, visiting: Set[str]) -> float:
+        if task_id in finish:
+            return finish[task_id]
+        task = tasks_by_id[task_id]
+        duration = 0.0
+        if task.started_at and task.completed_at:
+            duration = (task.completed_at - task.started_at).total_seconds()
+        visiting.add(task_id)
+        upstream = [longest(dependency, visiting) for dependency in task.dependencies
+                    if dependency in tasks_by_id and dependency not in visiting]
+        visiting.discard(task_id)
+        finish[task_id] = duration + max(upstream, default=0.0)
+        return finish[task_id]
+
+    return max((longest(task.id, set()) for task in tasks), default=0.0)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Motor de Búsqueda de Nexus
+==========================
+
+Índice invertido incremental con puntuación BM25 para la memoria organizacional.
+El índice se actualiza en cada inserción, de modo que una consulta solo recorre
+las listas de postings de sus términos en lugar de toda la memoria.
+"""
+
+import re
+import sys
+import math
+import heapq
+import unicodedata
+from typing import Dict, List, Tuple, Callable, Optional
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Palabras vacías frecuentes (español e inglés) que no aportan relevancia
+# y cuyas listas de postings crecerían con toda la memoria
+STOPWORDS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "para", "por", "que", "se", "su", "un", "una", "y", "o", "como", "mas",
+    "the", "and", "or", "of", "to", "in", "on", "for", "is", "an", "with",
+})
+
+
+def normalize_text(text: str) -> str:
+    """Convierte a minúsculas y elimina acentos para comparar términos."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Divide un texto en términos normalizados, sin palabras vacías."""
+    return [
+        token for token in _TOKEN_PATTERN.findall(normalize_text(text))
+        if token not in STOPWORDS
+    ]
+
+
+class InvertedIndex:
+    """
+    Índice invertido con puntuación BM25.
+
+    Mantiene para cada término un diccionario {doc_id: frecuencia} y la
+    longitud de cada documento, de forma que añadir o eliminar un documento
+    solo toca los términos que contiene.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: str, text: str):
+        """Indexa un documento, reemplazando la versión previa si existe."""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        tokens = tokenize(text)
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            # Términos internados: doc_terms comparte las cadenas del vocabulario
+            token = sys.intern(token)
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        for token, frequency in frequencies.items():
+            self.postings.setdefault(token, {})[doc_id] = frequency
+
+        self.doc_lengths[doc_id] = len(tokens)
+        self.doc_terms[doc_id] = tuple(frequencies)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        """Elimina un documento del índice."""
+        if doc_id not in self.doc_lengths:
+            return
+
+        for token in self.doc_terms.pop(doc_id):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[token]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def score(self, query: str) -> Dict[str, float]:
+        """Calcula la puntuación BM25 de cada documento que contiene algún término."""
+        doc_count = len(self.doc_lengths)
+        if doc_count == 0:
+            return {}
+
+        average_length = self.total_length / doc_count or 1.0
+        scores: Dict[str, float] = {}
+
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+
+            document_frequency = len(posting)
+            idf = math.log(1 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+            for doc_id, frequency in posting.items():
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / average_length
+                term_score = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + term_score
+
+        return scores
+
+    def top_k(self, query: str, k: int,
+              boost: Optional[Callable[[str], float]] = None,
+              boost_weight: float = 0.0) -> List[Tuple[float, str]]:
+        """
+        Devuelve los k documentos más relevantes como (puntuación, doc_id).
+
+        Si se indica ``boost``, la relevancia BM25 normalizada se mezcla con
+        el valor de ``boost(doc_id)`` según ``boost_weight``. La selección usa
+        un heap, así que el coste es O(n log k) sobre los candidatos.
+        """
+        scores = self.score(query)
+        if not scores or k <= 0:
+            return []
+
+        max_score = max(scores.values())
+
+        def blended(doc_id: str) -> float:
+            relevance = scores[doc_id] / max_score
+            if boost is None or boost_weight <= 0:
+                return relevance
+            return (1 - boost_weight) * relevance + boost_weight * boost(doc_id)
+
+        return heapq.nlargest(k, ((blended(doc_id), doc_id) for doc_id in scores))
+
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Registro Multi-Tenant de Nexus
+==============================
+
+Un orquestador por workspace (tenant) con su propio MemoryStore, de modo que
+las búsquedas de contexto solo recorren los datos de ese tenant y los tenants
+no comparten candados ni índices. Los agentes, el cliente LLM, el enrutador y
+los pools por tipo de agente se comparten entre todos: el límite de llamadas
+al proveedor sigue siendo global.
+
+Los tenants inactivos se desalojan de memoria en orden LRU, al superar
+``max_tenants`` o tras ``idle_seconds`` sin uso. Con NEXUS_TENANT_DB_DIR cada
+tenant usa un SQLiteMemoryStore propio y su contexto sobrevive al desalojo.
+Sin almacenamiento persistente el desalojo pierde el contexto del tenant, por
+lo que solo se desaloja al superar ``max_tenants`` (nunca por inactividad) y
+cada pérdida se registra como aviso.
+
+Los ids de tenant llegan de eventos externos y acaban en rutas de ficheros:
+solo se aceptan ``[A-Za-z0-9_-]`` (hasta 128 caracteres).
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable
+
+from nexus_core import (
+    AgentType, BaseAgent, MemoryStore, NexusOrchestrator, build_agents, load_environment
+)
+from nexus_concurrency import BoundedPool, ConcurrencyLimits
+from nexus_llm import LLMClient, get_llm_client
+from nexus_router import CapabilityRouter
+
+logger = logging.getLogger(__name__)
+
+StoreFactory = Callable[[str], MemoryStore]
+
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def validate_tenant_id(tenant_id: str) -> str:
+    """Devuelve el id si es válido; lanza ValueError si podría escapar del directorio de datos."""
+    if not isinstance(tenant_id, str) or not TENANT_ID_PATTERN.fullmatch(tenant_id):
+        raise ValueError(f"Id de tenant no válido: {tenant_id!r}")
+    return tenant_id
+
+
+@dataclass
+class _Tenant:
+    orchestrator: NexusOrchestrator
+    last_used: float
+
+
+class TenantRegistry:
+    """
+    Orquestadores por tenant, creados en el primer uso y desalojados en LRU.
+
+    Un tenant con comandos en curso o en cola no se desaloja aunque sea el
+    menos usado. ``on_evict(tenant_id, orchestrator)`` se llama antes de
+    cerrar el MemoryStore de un tenant desalojado.
+
+    ``persistent`` indica si los stores de ``store_factory`` sobreviven al
+    desalojo; por defecto se supone que sí con una factoría propia y que no
+    con la de por defecto (MemoryStore en RAM). Con stores no persistentes
+    se desactiva el desalojo por inactividad.
+    """
+
+    def __init__(self, store_factory: StoreFactory = None, max_tenants: int = 1000,
+                 idle_seconds: float = 1800.0, llm: LLMClient = None,
+                 limits: ConcurrencyLimits = None,
+                 on_evict: Callable[[str, NexusOrchestrator], None] = None,
+                 persistent: bool = None):
+        load_environment()
+        self.store_factory = store_factory or (lambda tenant_id: MemoryStore())
+        self.persistent = store_factory is not None if persistent is None else persistent
+        self.max_tenants = max_tenants
+        self.idle_seconds = idle_seconds if self.persistent else None
+        if not self.persistent:
+            logger.warning("Tenants sin almacenamiento persistente (configura NEXUS_TENANT_DB_DIR): "
+                           "desalojo por inactividad desactivado y el contexto de un tenant se "
+                           f"pierde si se desaloja al superar {max_tenants} tenants")
+        self.on_evict = on_evict
+        # Recursos compartidos por todos los tenants
+        self.llm = llm or get_llm_client()
+        self.limits = limits or ConcurrencyLimits.from_env()
+        self.agent_pools: Dict[AgentType, BoundedPool] = {}
+        self._agents: Optional[Dict[AgentType, BaseAgent]] = None
+        self._router: Optional[CapabilityRouter] = None
+        self._fast_routing = os.getenv('NEXUS_FAST_ROUTING', 'true').lower() == 'true'
+
+        self._tenants: "OrderedDict[str, _Tenant]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "hits": 0, "evicted": 0, "context_lost": 0}
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "TenantRegistry":
+        """Registro configurado con NEXUS_MAX_TENANTS, NEXUS_TENANT_IDLE_SECONDS y NEXUS_TENANT_DB_DIR."""
+        load_environment()
+        db_dir = os.getenv('NEXUS_TENANT_DB_DIR')
+        if db_dir and "store_factory" not in kwargs:
+            from nexus_persistence import SQLiteMemoryStore
+
+            os.makedirs(db_dir, exist_ok=True)
+            kwargs["store_factory"] = lambda tenant_id: SQLiteMemoryStore(
+                os.path.join(db_dir, f"{validate_tenant_id(tenant_id)}.db")
+            )
+        return cls(
+            max_tenants=int(os.getenv('NEXUS_MAX_TENANTS', '1000')),
+            idle_seconds=float(os.getenv('NEXUS_TENANT_IDLE_SECONDS', '1800')),
+            **kwargs
+        )
+
+    @property
+    def agents(self) -> Dict[AgentType, BaseAgent]:
+        """Agentes compartidos; no guardan memoria de ningún tenant."""
+        if self._agents is None:
+            self._agents = build_agents(None, self.llm)
+        return self._agents
+
+    @property
+    def router(self) -> Optional[CapabilityRouter]:
+        if self._router is None and self._fast_routing:
+            self._router = CapabilityRouter.from_env(self.agents)
+        return self._router
+
+    def get(self, tenant_id: str) -> NexusOrchestrator:
+        """Orquestador del tenant, creándolo si no está en memoria (ValueError si el id no es válido)."""
+        validate_tenant_id(tenant_id)
+        now = time.monotonic()
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is not None:
+                self.stats["hits"] += 1
+                tenant.last_used = now
+                self._tenants.move_to_end(tenant_id)
+                return tenant.orchestrator
+
+            orchestrator = NexusOrchestrator(
+                memory_store=self.store_factory(tenant_id),
+                limits=self.limits,
+                llm=self.llm,
+                router=self.router,
+                agents=self.agents,
+                agent_pools=self.agent_pools,
+            )
+            self._tenants[tenant_id] = _Tenant(orchestrator, now)
+            self.stats["created"] += 1
+            evicted = self._evict_locked(now)
+
+        self._close(evicted)
+        return orchestrator
+
+    def evict_idle(self) -> List[str]:
+        """Desaloja los tenants inactivos y devuelve sus ids (para llamar periódicamente)."""
+        with self._lock:
+            evicted = self._evict_locked(time.monotonic())
+        self._close(evicted)
+        return [tenant_id for tenant_id, _ in evicted]
+
+    def remove(self, tenant_id: str) -> bool:
+        """Desaloja un tenant concreto (si no tiene comandos en curso)."""
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is None or self._busy(tenant.orchestrator):
+                return False
+            del self._tenants[tenant_id]
+        self._close([(tenant_id, tenant.orchestrator)])
+        return True
+
+    def _evict_locked(self, now: float) -> List[tuple]:
+        """Saca del registro los tenants inactivos o sobrantes, del menos al más usado."""
+        evicted = []
+        for tenant_id in list(self._tenants):
+            tenant = self._tenants[tenant_id]
+            over_capacity = len(self._tenants) > self.max_tenants
+            idle = self.idle_seconds is not None and now - tenant.last_used > self.idle_seconds
+            if not over_capacity and not idle:
+                break  # los siguientes se usaron más recientemente
+            if self._busy(tenant.orchestrator):
+                continue
+            del self._tenants[tenant_id]
+            evicted.append((tenant_id, tenant.orchestrator))
+        return evicted
+
+    @staticmethod
+    def _busy(orchestrator: NexusOrchestrator) -> bool:
+        pool = orchestrator.admission_pool
+        return pool.active > 0 or pool.queued > 0
+
+    def _close(self, evicted: List[tuple]):
+        for tenant_id, orchestrator in evicted:
+            self.stats["evicted"] += 1
+            try:
+                if self.on_evict is not None:
+                    self.on_evict(tenant_id, orchestrator)
+                close = getattr(orchestrator.memory_store, "close", None)
+                if close is not None:
+                    close()
+            except Exception as e:
+                logger.error(f"Error desalojando el tenant {tenant_id}: {e}")
+            if self.persistent:
+                logger.info(f"Tenant desalojado: {tenant_id}")
+            else:
+                self.stats["context_lost"] += 1
+                logger.warning(f"Tenant desalojado sin almacenamiento persistente, se pierde su contexto: {tenant_id}")
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._tenants
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tenants residentes, creados, reutilizados y desalojados, y carga de los pools compartidos."""
+        return {
+            "resident": len(self._tenants),
+            "max_tenants": self.max_tenants,
+            "persistent": self.persistent,
+            **self.stats,
+            "agents": {agent_type.value: pool.get_stats()
+                       for agent_type, pool in self.agent_pools.items()},
+            "routing": self._router.get_stats() if self._router is not None else None,
+        }
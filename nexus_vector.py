@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Búsqueda Semántica de Nexus
+===========================
+
+Backend de recuperación por embeddings para la memoria organizacional.
+Los elementos de contexto se embeben por lotes, sus vectores se guardan en una
+matriz NumPy contigua y las consultas pasan por un índice de vecinos cercanos
+intercambiable (exacto o IVF aproximado).
+
+Requiere NumPy. El embebedor por defecto usa feature hashing y funciona sin red.
+"""
+
+import zlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple, Optional, Any
+
+import numpy as np
+
+from nexus_search import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(ABC):
+    """Clase base para generadores de embeddings."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Devuelve una matriz (len(texts), dimension) de vectores normalizados."""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """
+    Embebedor local basado en feature hashing.
+
+    Cada término y bigrama de términos se proyecta con signo a una dimensión
+    mediante CRC32, con peso sublineal por frecuencia. No necesita
+    entrenamiento ni acceso a red.
+    """
+
+    def __init__(self, dimension: int = 256, use_bigrams: bool = True):
+        super().__init__(dimension)
+        self.use_bigrams = use_bigrams
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        if self.use_bigrams:
+            tokens = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for feature in self._features(text):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                hashed = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                vectors[row, hashed % self.dimension] += sign * (1.0 + np.log(count))
+        return _normalize_rows(vectors)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza cada fila a norma L2 unitaria (las filas nulas se mantienen)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Centroide más cercano de cada vector, por bloques para acotar memoria."""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Posiciones de las k mayores puntuaciones, ordenadas de mayor a menor."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class VectorIndex(ABC):
+    """Índice de vecinos cercanos sobre las filas de una matriz de vectores."""
+
+    @abstractmethod
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        """Registra nuevas filas de la matriz."""
+        pass
+
+    @abstractmethod
+    def search(self, matrix: np.ndarray, active: np.ndarray,
+               query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Devuelve (puntuaciones, filas) de los k vectores activos más similares."""
+        pass
+
+    def needs_training(self, size: int) -> bool:
+        """Indica si el índice debe (re)entrenarse con ``size`` filas."""
+        return False
+
+    def fit(self, matrix: np.ndarray) -> Any:
+        """Entrena sobre la matriz sin modificar el índice (apto para un hilo auxiliar)."""
+        return None
+
+    def install(self, model: Any, trained_size: int):
+        """Aplica el resultado de ``fit``; las filas posteriores se registran con ``add``."""
+        pass
+
+    def train(self, matrix: np.ndarray):
+        """Entrena el índice de forma síncrona sobre toda la matriz."""
+        self.install(self.fit(matrix), len(matrix))
+
+    def remap_rows(self, mapping: np.ndarray):
+        """
+        Renumera las filas tras compactar la matriz: ``mapping[fila_antigua]``
+        es la fila nueva, o -1 si se descartó.
+        """
+        pass
+
+
+class FlatIndex(VectorIndex):
+    """Búsqueda exacta por producto escalar sobre toda la matriz."""
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        pass
+
+    def search(self, matrix, active, query, k):
+        scores = matrix @ query
+        scores[~active] = -np.inf
+        top = _top_k(scores, min(k, int(active.sum())))
+        return scores[top], top
+
+
+class IVFIndex(VectorIndex):
+    """
+    Índice IVF (inverted file) aproximado.
+
+    Agrupa los vectores con k-means esférico y, en cada consulta, solo
+    compara contra las ``nprobe`` listas cuyos centroides son más cercanos.
+    Hasta reunir ``train_threshold`` vectores se comporta como búsqueda exacta,
+    y pide reentrenarse cuando la matriz crece ``retrain_factor`` veces. La
+    búsqueda nunca entrena: lo hace ``train`` o, en segundo plano, el
+    SemanticBackend con ``fit``/``install``.
+    """
+
+    def __init__(self, n_lists: int = 1024, nprobe: int = 16,
+                 train_threshold: int = 20_000, retrain_factor: float = 4.0,
+                 sample_size: int = 100_000, iterations: int = 10, seed: int = 0):
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.retrain_factor = retrain_factor
+        self.sample_size = sample_size
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self.trained_size = 0
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        if self.centroids is None:
+            return
+        assignments = _assign(vectors, self.centroids)
+        for row, list_id in zip(rows.tolist(), assignments.tolist()):
+            self.lists[list_id].append(row)
+            self._list_arrays.pop(list_id, None)
+
+    def fit(self, matrix: np.ndarray) -> Tuple[np.ndarray, List[List[int]]]:
+        """Centroides entrenados con una muestra y listas invertidas de todas las filas."""
+        size = len(matrix)
+        n_lists = max(1, min(self.n_lists, size // 16))
+        sample_rows = self.rng.choice(size, size=min(size, self.sample_size), replace=False)
+        sample = matrix[sample_rows]
+        centroids = sample[self.rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignments = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            # Las listas vacías conservan su centroide anterior
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums)
+
+        assignments = _assign(matrix, centroids)
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(1, n_lists))
+        lists = [rows.tolist() for rows in np.split(order, bounds)]
+        return centroids, lists
+
+    def install(self, model: Tuple[np.ndarray, List[List[int]]], trained_size: int):
+        if model is None:
+            return
+        self.centroids, self.lists = model
+        self._list_arrays = {}
+        self.trained_size = trained_size
+        logger.info(f"Índice IVF entrenado: {len(self.lists)} listas sobre {trained_size} vectores")
+
+    def remap_rows(self, mapping: np.ndarray):
+        if self.centroids is None:
+            return
+        for list_id, rows in enumerate(self.lists):
+            remapped = mapping[np.asarray(rows, dtype=np.int64)]
+            self.lists[list_id] = remapped[remapped >= 0].tolist()
+        self._list_arrays = {}
+
+    def needs_training(self, size: int) -> bool:
+        if self.centroids is None:
+            return size >= self.train_threshold
+        return size >= self.trained_size * self.retrain_factor
+
+    def _list_rows(self, list_id: int) -> np.ndarray:
+        rows = self._list_arrays.get(list_id)
+        if rows is None:
+            rows = np.asarray(self.lists[list_id], dtype=np.int64)
+            self._list_arrays[list_id] = rows
+        return rows
+
+    def search(self, matrix, active, query, k):
+        if self.centroids is None:
+            return FlatIndex().search(matrix, active, query, k)
+
+        probe = _top_k(self.centroids @ query, min(self.nprobe, len(self.centroids)))
+        candidates = np.concatenate([self._list_rows(list_id) for list_id in probe])
+        candidates = candidates[active[candidates]]
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.float32), candidates
+
+        scores = matrix[candidates] @ query
+        top = _top_k(scores, min(k, len(candidates)))
+        return scores[top], candidates[top]
+
+
+class SemanticBackend:
+    """
+    Backend de búsqueda semántica para MemoryStore.
+
+    Los textos añadidos quedan pendientes y se embeben en un único lote al
+    alcanzar ``batch_size`` o antes de la siguiente consulta. Los vectores viven
+    en una matriz float32 contigua que crece por duplicación; las filas
+    retiradas se recuperan compactando la matriz cuando superan
+    ``COMPACT_RATIO`` del total.
+
+    Con ``background_training`` el índice se entrena en un hilo auxiliar sobre
+    una copia de la matriz y las consultas siguen sirviéndose (exactas o con el
+    entrenamiento anterior) hasta que termina.
+    """
+
+    # Fracción de filas inactivas que dispara la compactación
+    COMPACT_RATIO = 0.25
+    # Por debajo de este tamaño no merece la pena compactar
+    COMPACT_MIN_ROWS = 1024
+
+    def __init__(self, embedder: Embedder = None, index: VectorIndex = None,
+                 batch_size: int = 256, initial_capacity: int = 1024,
+                 background_training: bool = True):
+        self.embedder = embedder or HashingEmbedder()
+        self.index = index or IVFIndex()
+        self.batch_size = batch_size
+        self.initial_capacity = initial_capacity
+        self.background_training = background_training
+        self._matrix = np.zeros((initial_capacity, self.embedder.dimension), dtype=np.float32)
+        self._active = np.zeros(initial_capacity, dtype=bool)
+        self._size = 0
+        self.row_ids: List[str] = []
+        self.id_rows: Dict[str, int] = {}
+        self._pending: Dict[str, str] = {}
+        # Entrenamiento en curso y su resultado: (generación, modelo, filas entrenadas).
+        # La generación cambia al compactar, lo que invalida un resultado en vuelo
+        self._training: Optional[threading.Thread] = None
+        self._trained: Optional[Tuple[int, Any, int]] = None
+        self._generation = 0
+        self.stats = {"compactions": 0, "trainings": 0}
+
+    def __len__(self) -> int:
+        return len(self.id_rows) + len(self._pending)
+
+    def add(self, item_id: str, text: str):
+        """Encola un elemento para embeberlo en el siguiente lote."""
+        self.remove(item_id)
+        self._pending[item_id] = text
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def remove(self, item_id: str):
+        """Retira un elemento; su fila queda inactiva hasta la siguiente compactación."""
+        self._pending.pop(item_id, None)
+        row = self.id_rows.pop(item_id, None)
+        if row is not None:
+            self._active[row] = False
+            inactive = self._size - len(self.id_rows)
+            if self._size >= self.COMPACT_MIN_ROWS and inactive > self.COMPACT_RATIO * self._size:
+                self.compact()
+
+    def compact(self):
+        """Descarta las filas inactivas de la matriz y renumera el índice."""
+        keep = np.flatnonzero(self._active[:self._size])
+        mapping = np.full(self._size, -1, dtype=np.int64)
+        mapping[keep] = np.arange(len(keep))
+
+        capacity = max(self.initial_capacity, 2 * len(keep))
+        matrix = np.zeros((capacity, self.embedder.dimension), dtype=np.float32)
+        matrix[:len(keep)] = self._matrix[keep]
+        active = np.zeros(capacity, dtype=bool)
+        active[:len(keep)] = True
+
+        removed = self._size - len(keep)
+        self._matrix, self._active, self._size = matrix, active, len(keep)
+        self.row_ids = [self.row_ids[row] for row in keep.tolist()]
+        self.id_rows = {item_id: row for row, item_id in enumerate(self.row_ids)}
+        self.index.remap_rows(mapping)
+        self._generation += 1
+        self.stats["compactions"] += 1
+        logger.debug(f"Matriz semántica compactada: {removed} filas liberadas, {self._size} activas")
+
+    def flush(self):
+        """Embebe todos los elementos pendientes en un solo lote."""
+        if not self._pending:
+            return
+
+        item_ids = list(self._pending)
+        vectors = self.embedder.embed([self._pending[item_id] for item_id in item_ids])
+        self._pending.clear()
+
+        self._reserve(self._size + len(item_ids))
+        rows = np.arange(self._size, self._size + len(item_ids))
+        self._matrix[rows] = vectors
+        self._active[rows] = True
+        for item_id, row in zip(item_ids, rows.tolist()):
+            self.id_rows[item_id] = row
+        self.row_ids.extend(item_ids)
+        self._size += len(item_ids)
+
+        self.index.add(rows, vectors)
+        self._maybe_train()
+
+    def train_index(self):
+        """Entrena el índice de forma síncrona con todas las filas actuales."""
+        self.flush()
+        self.index.train(self._matrix[:self._size])
+        self.stats["trainings"] += 1
+
+    def _maybe_train(self):
+        """Lanza el (re)entrenamiento del índice si lo pide y no hay otro en curso."""
+        self._install_training()
+        if self._training is not None or not self.index.needs_training(self._size):
+            return
+        if not self.background_training:
+            self.train_index()
+            return
+
+        snapshot = self._matrix[:self._size].copy()
+        generation = self._generation
+
+        def run():
+            model = None
+            try:
+                model = self.index.fit(snapshot)
+            except Exception as e:
+                logger.error(f"Error entrenando el índice semántico: {e}")
+            self._trained = (generation, model, len(snapshot))
+
+        self._training = threading.Thread(target=run, name="nexus-ivf-training", daemon=True)
+        self._training.start()
+
+    def _install_training(self):
+        """Aplica un entrenamiento terminado y registra las filas añadidas mientras tanto."""
+        if self._trained is None:
+            return
+        generation, model, trained_size = self._trained
+        self._trained = None
+        self._training = None
+        if model is None or generation != self._generation:
+            return  # falló o la matriz se compactó; se reintentará en el próximo lote
+        self.index.install(model, trained_size)
+        if self._size > trained_size:
+            rows = np.arange(trained_size, self._size)
+            self.index.add(rows, self._matrix[rows])
+        self.stats["trainings"] += 1
+
+    def wait_for_training(self, timeout: float = None):
+        """Espera a que termine el entrenamiento en segundo plano y lo aplica."""
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+        self._install_training()
+
+    def _reserve(self, capacity: int):
+        """Garantiza capacidad en la matriz, duplicándola si hace falta."""
+        if capacity <= len(self._matrix):
+            return
+        new_capacity = max(capacity, len(self._matrix) * 2)
+        matrix = np.zeros((new_capacity, self.embedder.dimension), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        active = np.zeros(new_capacity, dtype=bool)
+        active[:self._size] = self._active[:self._size]
+        self._matrix, self._active = matrix, active
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[float, str]]:
+        """Devuelve los k elementos más similares como (similitud, item_id)."""
+        self.flush()
+        self._install_training()
+        if not self.id_rows or k <= 0:
+            return []
+
+        query_vector = self.embedder.embed([query])[0]
+        scores, rows = self.index.search(
+            self._matrix[:self._size], self._active[:self._size], query_vector, k
+        )
+        return [(float(score), self.row_ids[row]) for score, row in zip(scores, rows.tolist())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Filas activas e inactivas de la matriz, compactaciones y entrenamientos."""
+        return {
+            **self.stats,
+            "active_rows": len(self.id_rows),
+            "inactive_rows": self._size - len(self.id_rows),
+            "training": self._training is not None,
+        }
@@ -15,23 +15,31 @@ Características:
 """
 
 import os
+import sys
 import json
 import asyncio
+import inspect
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, AsyncIterator, Awaitable, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import requests
 from elevenlabs import ElevenLabs, Voice, VoiceSettings
 from elevenlabs.api import History
 from elevenlabs import generate, clone, voices, set_api_key
-from nexus_core import NexusOrchestrator, ContextItem, Task, AgentType
+from nexus_core import NexusOrchestrator, ContextItem, Task, AgentType, configure_logging, load_environment
+from nexus_voice_intents import DEFAULT_TRANSFER_RULES, TransferClassifier
+from nexus_audio import (
+    AudioCache, AudioStore, SpeechStats, SpeechTimer, iterate_in_thread, synthesize_in_order
+)
+from nexus_llm import iter_sentences
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Recibe el anuncio de una transferencia en cuanto su audio está listo
+TransferCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
 class VoiceModel(Enum):
     """Modelos de voz disponibles en ElevenLabs."""
     ELEVEN_V3 = "eleven_v3"
@@ -73,6 +81,15 @@ class NexusVoiceAgent:
         self.voice_agents: Dict[str, VoiceAgent] = {}
         self.conversation_contexts: Dict[str, ConversationContext] = {}
         self.transfer_rules: Dict[str, List[Dict[str, Any]]] = {}
+        # Audios guardados en segundo plano y tiempos de síntesis (primer byte)
+        self.audio_store = AudioStore.from_env()
+        self.tts_stats = SpeechStats()
+        # Audios ya sintetizados, por texto y voz (None si CACHE_ENABLED=false)
+        self.audio_cache = AudioCache.from_env()
+        # Modo pipeline: la respuesta se sintetiza frase a frase según se genera
+        self.pipelined = os.getenv('NEXUS_VOICE_PIPELINED', 'false').lower() == 'true'
+        self.tts_parallelism = int(os.getenv('NEXUS_TTS_PARALLELISM', '3'))
+        self.turn_stats = SpeechStats()  # primer audio y duración de cada turno
         
         # Configurar agentes de voz especializados
         self._setup_voice_agents()
@@ -143,55 +160,10 @@ class NexusVoiceAgent:
     def _setup_transfer_rules(self):
         """Configura las reglas de transferencia entre agentes."""
         self.transfer_rules = {
-            "nexus_dev": [
-                {
-                    "condition": "technical_question",
-                    "target_agent": "nexus_support",
-                    "reason": "Transferring to technical support specialist"
-                },
-                {
-                    "condition": "code_generation",
-                    "target_agent": "nexus_dev",
-                    "reason": "Transferring to development specialist"
-                }
-            ],
-            "nexus_hr": [
-                {
-                    "condition": "technical_question",
-                    "target_agent": "nexus_dev",
-                    "reason": "Transferring to technical specialist"
-                },
-                {
-                    "condition": "sales_question",
-                    "target_agent": "nexus_sales",
-                    "reason": "Transferring to sales specialist"
-                }
-            ],
-            "nexus_sales": [
-                {
-                    "condition": "technical_question",
-                    "target_agent": "nexus_dev",
-                    "reason": "Transferring to technical specialist"
-                },
-                {
-                    "condition": "support_question",
-                    "target_agent": "nexus_support",
-                    "reason": "Transferring to sales specialist"
-                }
-            ],
-            "nexus_support": [
-                {
-                    "condition": "development_question",
-                    "target_agent": "nexus_dev",
-                    "reason": "Transferring to development specialist"
-                },
-                {
-                    "condition": "data_analysis",
-                    "target_agent": "nexus_analyst",
-                    "reason": "Transferring to data analyst"
-                }
-            ]
+            agent: [dict(rule) for rule in rules]
+            for agent, rules in DEFAULT_TRANSFER_RULES.items()
         }
+        self.transfer_classifier = TransferClassifier(self.transfer_rules)
     
     async def start_conversation(self, user_id: str, initial_agent: str = "nexus_dev") -> str:
         """Inicia una nueva conversación con capacidades de voz."""
@@ -210,10 +182,10 @@ class NexusVoiceAgent:
         self.conversation_contexts[conversation_id] = context
         
         # Generar mensaje de bienvenida con voz
-        welcome_message = f"¡Hola! Soy {voice_agent.name}, tu {voice_agent.description.lower()}. ¿En qué puedo ayudarte hoy?"
+        welcome_message = self._welcome_message(voice_agent)
         
         # Generar audio de bienvenida
-        audio_url = await self._generate_speech(welcome_message, voice_agent.voice_config)
+        audio_url = await self._generate_speech(welcome_message, voice_agent.voice_config, cacheable=True)
         
         # Añadir al historial
         context.conversation_history.append({
@@ -228,8 +200,25 @@ class NexusVoiceAgent:
         
         return conversation_id
     
-    async def process_message(self, conversation_id: str, user_message: str) -> Dict[str, Any]:
-        """Procesa un mensaje del usuario y genera respuesta con voz."""
+    async def process_message(self, conversation_id: str, user_message: str,
+                              on_transfer: TransferCallback = None) -> Dict[str, Any]:
+        """
+        Procesa un mensaje del usuario y genera respuesta con voz.
+        
+        En una transferencia, ``on_transfer`` recibe {"conversation_id",
+        "from_agent", "to_agent", "transfer_message", "transfer_audio"} en
+        cuanto el audio del anuncio está listo, antes de que lo esté la
+        respuesta del nuevo agente, para poder reproducirlo mientras tanto.
+        """
+        if self.pipelined:
+            result = None
+            async for event in self.process_message_stream(conversation_id, user_message):
+                if event["type"] == "transfer_audio" and on_transfer is not None:
+                    await self._notify_transfer(on_transfer, event["transfer"])
+                elif event["type"] == "completed":
+                    result = event["result"]
+            return result
+        
         if conversation_id not in self.conversation_contexts:
             raise ValueError(f"Conversación no encontrada: {conversation_id}")
         
@@ -252,10 +241,7 @@ class NexusVoiceAgent:
             new_agent_id = transfer_info["target_agent"]
             new_agent = self.voice_agents[new_agent_id]
             
-            transfer_message = f"Te transfiero a {new_agent.name}, {new_agent.description.lower()}. {transfer_info['reason']}"
-            
-            # Generar audio de transferencia
-            transfer_audio = await self._generate_speech(transfer_message, current_agent.voice_config)
+            transfer_message = self._transfer_message(new_agent, transfer_info["reason"])
             
             # Actualizar contexto
             context.current_agent = new_agent_id
@@ -263,9 +249,29 @@ class NexusVoiceAgent:
             context.transferred_from = current_agent.name
             context.transfer_reason = transfer_info["reason"]
             
-            # Generar respuesta del nuevo agente
-            agent_response = await self._generate_agent_response(user_message, new_agent, context)
-            response_audio = await self._generate_speech(agent_response, new_agent.voice_config)
+            # El audio de transferencia no depende de la respuesta: se genera
+            # mientras el nuevo agente responde y se entrega en cuanto está listo
+            async def respond():
+                response = await self._generate_agent_response(user_message, new_agent, context)
+                return response, await self._generate_speech(response, new_agent.voice_config)
+            
+            response_task = asyncio.ensure_future(respond())
+            try:
+                transfer_audio = await self._generate_speech(transfer_message, current_agent.voice_config,
+                                                             cacheable=True)
+                if on_transfer is not None:
+                    await self._notify_transfer(on_transfer, {
+                        "conversation_id": conversation_id,
+                        "from_agent": current_agent.name,
+                        "to_agent": new_agent.name,
+                        "transfer_message": transfer_message,
+                        "transfer_audio": transfer_audio
+                    })
+                agent_response, response_audio = await response_task
+            finally:
+                if not response_task.done():
+                    response_task.cancel()
+                    await asyncio.gather(response_task, return_exceptions=True)
             
             # Añadir al historial
             context.conversation_history.extend([
@@ -319,48 +325,232 @@ class NexusVoiceAgent:
                 "context": asdict(context)
             }
     
-    async def _analyze_transfer_needed(self, user_message: str, current_agent: str) -> Dict[str, Any]:
-        """Analiza si se necesita transferir a otro agente especializado."""
-        # Usar Nexus Core para analizar la intención del usuario
-        analysis_result = await self.nexus_core.process_natural_language_command(
-            f"Analiza esta consulta y determina qué agente especializado la manejaría mejor: {user_message}",
-            {"current_agent": current_agent}
-        )
+    async def process_message_stream(self, conversation_id: str,
+                                     user_message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Variante en streaming (modo pipeline) de process_message.
+        
+        La respuesta se divide en frases según la genera el LLM y cada frase se
+        sintetiza en cuanto está completa, con hasta ``tts_parallelism``
+        síntesis a la vez, de modo que la primera frase suena mientras las
+        siguientes aún se generan. Produce:
+        
+        - {"type": "transfer", "from_agent", "to_agent", "message"} si el turno
+          transfiere la conversación
+        - {"type": "sentence", "index", "text"} y {"type": "audio", "index", "chunk"}
+          con el audio en orden de reproducción: en una transferencia, el
+          segmento 0 es el anuncio (con la voz del agente actual), sintetizado
+          mientras el nuevo agente genera su respuesta
+        - {"type": "transfer_audio", "transfer": {...}} al terminar el anuncio,
+          antes del primer audio del nuevo agente, con los mismos datos que
+          recibe ``on_transfer`` en process_message
+        - {"type": "completed", "result": {...}} con el mismo resultado que process_message
+        """
+        if conversation_id not in self.conversation_contexts:
+            raise ValueError(f"Conversación no encontrada: {conversation_id}")
+        
+        context = self.conversation_contexts[conversation_id]
+        current_agent = self.voice_agents[context.current_agent]
+        timer = SpeechTimer()
+        
+        context.conversation_history.append({
+            "timestamp": datetime.now().isoformat(),
+            "user": context.user_id,
+            "message": user_message,
+            "type": "user_input"
+        })
+        
+        transfer_info = await self._analyze_transfer_needed(user_message, context.current_agent)
+        responding_agent = current_agent
+        transfer_entry = None
+        announcement = None
+        
+        if transfer_info["should_transfer"]:
+            new_agent = self.voice_agents[transfer_info["target_agent"]]
+            transfer_message = self._transfer_message(new_agent, transfer_info["reason"])
+            yield {
+                "type": "transfer",
+                "from_agent": current_agent.name,
+                "to_agent": new_agent.name,
+                "message": transfer_message
+            }
+            
+            context.current_agent = transfer_info["target_agent"]
+            context.voice_config = new_agent.voice_config
+            context.transferred_from = current_agent.name
+            context.transfer_reason = transfer_info["reason"]
+            responding_agent = new_agent
+            announcement = (transfer_message,
+                            lambda text: self.stream_speech(text, current_agent.voice_config, cacheable=True))
+            transfer_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "agent": current_agent.name,
+                "message": transfer_message,
+                "audio_url": None,
+                "type": "transfer"
+            }
+        
+        # Texto de la respuesta según llega, agrupado en frases para la síntesis
+        response_parts: List[str] = []
+        
+        async def response_deltas():
+            async for delta in self._stream_agent_response(user_message, responding_agent, context):
+                response_parts.append(delta)
+                yield delta
+        
+        async def spoken_segments():
+            # El anuncio sale primero y empieza a sintetizarse sin esperar al LLM
+            if announcement is not None:
+                yield announcement
+            async for sentence in iter_sentences(response_deltas()):
+                yield sentence
+        
+        transfer_chunks: List[bytes] = []
+        audio_chunks: List[bytes] = []
         
-        # Mapear análisis a reglas de transferencia
-        if current_agent in self.transfer_rules:
-            for rule in self.transfer_rules[current_agent]:
-                if self._matches_condition(user_message, rule["condition"]):
-                    return {
-                        "should_transfer": True,
-                        "target_agent": rule["target_agent"],
-                        "reason": rule["reason"]
-                    }
+        def announced() -> Dict[str, Any]:
+            # El anuncio ha terminado: su audio se guarda y se entrega ya
+            transfer_entry["audio_url"] = self._save_audio(transfer_chunks)
+            return {"type": "transfer_audio", "transfer": {
+                "conversation_id": conversation_id,
+                "from_agent": current_agent.name,
+                "to_agent": responding_agent.name,
+                "transfer_message": transfer_entry["message"],
+                "transfer_audio": transfer_entry["audio_url"]
+            }}
+        
+        pending_announcement = transfer_entry is not None
+        events = synthesize_in_order(
+            spoken_segments(),
+            lambda sentence: self.stream_speech(sentence, responding_agent.voice_config),
+            self.tts_parallelism
+        )
+        try:
+            async for event in events:
+                if pending_announcement and event["index"] > 0:
+                    pending_announcement = False
+                    yield announced()
+                if event["type"] == "audio":
+                    timer.chunk(event["chunk"])
+                    if announcement is not None and event["index"] == 0:
+                        transfer_chunks.append(event["chunk"])
+                    else:
+                        audio_chunks.append(event["chunk"])
+                yield event
+        finally:
+            # Si el consumidor abandona el turno, las síntesis en curso se cancelan ya
+            await events.aclose()
+        if pending_announcement:
+            yield announced()
+        timer.finish(self.turn_stats)
+        
+        agent_response = "".join(response_parts)
+        response_audio = self._save_audio(audio_chunks)
+        
+        if transfer_entry is not None:
+            context.conversation_history.append(transfer_entry)
+        context.conversation_history.append({
+            "timestamp": datetime.now().isoformat(),
+            "agent": responding_agent.name,
+            "message": agent_response,
+            "audio_url": response_audio,
+            "type": "agent_response"
+        })
         
-        return {"should_transfer": False}
+        if transfer_entry is not None:
+            result = {
+                "conversation_id": conversation_id,
+                "transfer": True,
+                "from_agent": current_agent.name,
+                "to_agent": responding_agent.name,
+                "transfer_message": transfer_entry["message"],
+                "transfer_audio": transfer_entry["audio_url"],
+                "response": agent_response,
+                "response_audio": response_audio,
+                "context": asdict(context)
+            }
+        else:
+            result = {
+                "conversation_id": conversation_id,
+                "transfer": False,
+                "agent": responding_agent.name,
+                "response": agent_response,
+                "response_audio": response_audio,
+                "context": asdict(context)
+            }
+        yield {"type": "completed", "result": result}
+    
+    @staticmethod
+    def _welcome_message(agent: 'VoiceAgent') -> str:
+        return f"¡Hola! Soy {agent.name}, tu {agent.description.lower()}. ¿En qué puedo ayudarte hoy?"
+    
+    @staticmethod
+    async def _notify_transfer(on_transfer: TransferCallback, transfer: Dict[str, Any]):
+        result = on_transfer(transfer)
+        if inspect.isawaitable(result):
+            await result
+    
+    @staticmethod
+    def _transfer_message(new_agent: 'VoiceAgent', reason: str) -> str:
+        return f"Te transfiero a {new_agent.name}, {new_agent.description.lower()}. {reason}"
+    
+    def stock_phrases(self) -> List[tuple]:
+        """
+        Frases fijas de las conversaciones con la voz que las pronuncia: la
+        bienvenida de cada agente y cada anuncio de transferencia (con la voz
+        del agente que transfiere).
+        """
+        phrases = [(self._welcome_message(agent), agent.voice_config)
+                   for agent in self.voice_agents.values()]
+        for agent_id, rules in self.transfer_rules.items():
+            source = self.voice_agents.get(agent_id)
+            for rule in rules:
+                target = self.voice_agents.get(rule["target_agent"])
+                if source is not None and target is not None:
+                    phrases.append((self._transfer_message(target, rule["reason"]), source.voice_config))
+        return phrases
+    
+    async def warm_up_audio_cache(self) -> Dict[str, Any]:
+        """
+        Sintetiza las frases fijas que aún no están en la caché de audio, para
+        que las bienvenidas y transferencias no esperen a ElevenLabs.
+        """
+        if self.audio_cache is None:
+            return {"enabled": False}
+        
+        semaphore = asyncio.Semaphore(self.tts_parallelism)
+        counts = {"phrases": 0, "cached": 0, "rendered": 0, "errors": 0}
+        
+        async def render(text: str, voice_config: VoiceConfig):
+            counts["phrases"] += 1
+            if await self.audio_cache.get(self._speech_cache_key(text, voice_config)) is not None:
+                counts["cached"] += 1
+                return
+            async with semaphore:
+                try:
+                    async for _ in self._synthesize_stream(text, voice_config, cacheable=True):
+                        pass
+                    counts["rendered"] += 1
+                except Exception as e:
+                    counts["errors"] += 1
+                    logger.error(f"Error precalentando audio: {e}")
+        
+        await asyncio.gather(*(render(text, voice_config) for text, voice_config in self.stock_phrases()))
+        await self.audio_cache.drain()
+        logger.info(f"Caché de audio precalentada: {counts}")
+        return counts
+    
+    async def _analyze_transfer_needed(self, user_message: str, current_agent: str) -> Dict[str, Any]:
+        """Analiza si se necesita transferir a otro agente especializado."""
+        # Clasificación local por palabras clave (microsegundos, sin llamadas al LLM)
+        return self.transfer_classifier.classify(user_message, current_agent)
     
     def _matches_condition(self, message: str, condition: str) -> bool:
         """Determina si un mensaje coincide con una condición de transferencia."""
-        message_lower = message.lower()
-        
-        condition_keywords = {
-            "technical_question": ["error", "bug", "code", "programming", "technical", "system"],
-            "code_generation": ["write code", "generate", "create function", "implement"],
-            "sales_question": ["pricing", "cost", "purchase", "buy", "sales", "demo"],
-            "support_question": ["help", "support", "issue", "problem", "troubleshoot"],
-            "development_question": ["development", "coding", "programming", "software"],
-            "data_analysis": ["data", "analysis", "report", "metrics", "statistics"]
-        }
-        
-        if condition in condition_keywords:
-            return any(keyword in message_lower for keyword in condition_keywords[condition])
-        
-        return False
+        return self.transfer_classifier.matches(message, condition)
     
-    async def _generate_agent_response(self, user_message: str, agent: 'VoiceAgent', context: ConversationContext) -> str:
-        """Genera una respuesta del agente basada en su especialización."""
-        # Usar Nexus Core para generar respuesta especializada
-        prompt = f"""
+    def _agent_prompt(self, user_message: str, agent: 'VoiceAgent') -> str:
+        return f"""
         Eres {agent.name}, {agent.description}.
         Especialidades: {', '.join(agent.capabilities)}
         
@@ -369,45 +559,135 @@ class NexusVoiceAgent:
         Proporciona una respuesta útil y especializada en tu área de expertise.
         Mantén un tono profesional pero amigable.
         """
-        
-        result = await self.nexus_core.process_natural_language_command(prompt, {
+    
+    @staticmethod
+    def _agent_command_context(user_message: str, agent: 'VoiceAgent',
+                               context: ConversationContext) -> Dict[str, Any]:
+        return {
             "agent_type": agent.name,
             "user_message": user_message,
             "conversation_history": context.conversation_history[-5:]  # Últimos 5 mensajes
-        })
+        }
+    
+    async def _generate_agent_response(self, user_message: str, agent: 'VoiceAgent', context: ConversationContext) -> str:
+        """Genera una respuesta del agente basada en su especialización."""
+        # Usar Nexus Core para generar respuesta especializada
+        result = await self.nexus_core.process_natural_language_command(
+            self._agent_prompt(user_message, agent),
+            self._agent_command_context(user_message, agent, context)
+        )
         
         return result['synthesis']
     
-    async def _generate_speech(self, text: str, voice_config: VoiceConfig) -> str:
-        """Genera audio usando ElevenLabs."""
+    async def _stream_agent_response(self, user_message: str, agent: 'VoiceAgent',
+                                     context: ConversationContext) -> AsyncIterator[str]:
+        """Variante de _generate_agent_response que produce el texto según lo genera el LLM."""
+        async for event in self.nexus_core.process_natural_language_command_stream(
+            self._agent_prompt(user_message, agent),
+            self._agent_command_context(user_message, agent, context)
+        ):
+            if event["type"] == "synthesis_delta":
+                yield event["text"]
+    
+    async def _generate_speech(self, text: str, voice_config: VoiceConfig, cacheable: bool = False) -> str:
+        """Genera audio usando ElevenLabs (``cacheable`` como en ``stream_speech``)."""
+        filename = self.audio_store.new_filename()
         try:
-            # Generar audio con ElevenLabs
-            audio = generate(
-                text=text,
-                voice=voice_config.voice_id,
-                model=voice_config.model.value,
-                voice_settings=VoiceSettings(
-                    stability=voice_config.stability,
-                    similarity_boost=voice_config.similarity_boost,
-                    style=voice_config.style,
-                    use_speaker_boost=voice_config.use_speaker_boost
-                )
-            )
-            
-            # Guardar audio (en producción, usaría S3 o similar)
-            filename = f"audio_{datetime.now().timestamp()}.mp3"
-            with open(filename, "wb") as f:
-                f.write(audio)
-            
-            # En producción, subiría a CDN y devolvería URL
-            audio_url = f"https://cdn.nexus-ai.com/audio/{filename}"
-            
-            logger.info(f"Audio generado: {filename}")
-            return audio_url
-            
+            async for _ in self.stream_speech(text, voice_config, filename, cacheable):
+                pass
         except Exception as e:
             logger.error(f"Error generando audio: {e}")
             return None
+        
+        logger.info(f"Audio generado: {filename}")
+        return self.audio_store.url(filename)
+    
+    async def stream_speech(self, text: str, voice_config: VoiceConfig,
+                            filename: str = None, cacheable: bool = False) -> AsyncIterator[bytes]:
+        """
+        Síntesis en streaming: produce los fragmentos MP3 según los envía
+        ElevenLabs, para reenviarlos directamente (websocket, respuesta HTTP
+        chunked...). La descarga corre en un hilo auxiliar y, si se indica
+        ``filename``, el audio completo se guarda en segundo plano al terminar.
+        
+        Con ``cacheable`` (frases fijas: bienvenidas y anuncios de
+        transferencia) y la caché de audio activa, un texto ya sintetizado con
+        la misma voz y ajustes se sirve sin llamar a ElevenLabs. Las respuestas
+        generadas no se repiten y no pasan por la caché.
+        """
+        if cacheable and self.audio_cache is not None:
+            audio = await self.audio_cache.get(self._speech_cache_key(text, voice_config))
+            if audio is not None:
+                if filename:
+                    self.audio_store.save_in_background(filename, [audio])
+                yield audio
+                return
+        
+        async for chunk in self._synthesize_stream(text, voice_config, filename, cacheable):
+            yield chunk
+    
+    async def _synthesize_stream(self, text: str, voice_config: VoiceConfig, filename: str = None,
+                                 cacheable: bool = False) -> AsyncIterator[bytes]:
+        """Síntesis con ElevenLabs; con ``cacheable`` guarda el resultado en la caché de audio."""
+        voice = Voice(
+            voice_id=voice_config.voice_id,
+            settings=VoiceSettings(
+                stability=voice_config.stability,
+                similarity_boost=voice_config.similarity_boost,
+                style=voice_config.style,
+                use_speaker_boost=voice_config.use_speaker_boost
+            )
+        )
+        timer = SpeechTimer()
+        chunks = []
+        try:
+            async for chunk in iterate_in_thread(lambda: generate(
+                text=text,
+                voice=voice,
+                model=voice_config.model.value,
+                stream=True
+            )):
+                timer.chunk(chunk)
+                chunks.append(chunk)
+                yield chunk
+        except Exception:
+            self.tts_stats.errors += 1
+            raise
+        
+        timer.finish(self.tts_stats)
+        if cacheable and self.audio_cache is not None:
+            self.audio_cache.put_in_background(self._speech_cache_key(text, voice_config),
+                                               b"".join(chunks), len(text))
+        if filename:
+            self.audio_store.save_in_background(filename, chunks)
+    
+    @staticmethod
+    def _speech_cache_key(text: str, voice_config: VoiceConfig) -> str:
+        return AudioCache.key(text, voice_config.voice_id, voice_config.model.value, {
+            "stability": voice_config.stability,
+            "similarity_boost": voice_config.similarity_boost,
+            "style": voice_config.style,
+            "use_speaker_boost": voice_config.use_speaker_boost,
+        })
+    
+    def _save_audio(self, chunks: List[bytes]) -> Optional[str]:
+        """Guarda en segundo plano el audio de un turno y devuelve su URL."""
+        if not chunks:
+            return None
+        filename = self.audio_store.new_filename()
+        self.audio_store.save_in_background(filename, chunks)
+        return self.audio_store.url(filename)
+    
+    def get_tts_stats(self) -> Dict[str, Any]:
+        """
+        Tiempo hasta el primer byte y duración (ms) de las síntesis recientes,
+        en modo pipeline hasta el primer audio de cada turno, y aciertos de la
+        caché de audio.
+        """
+        stats = self.tts_stats.get_stats()
+        stats["turns"] = self.turn_stats.get_stats()
+        stats["cache"] = self.audio_cache.get_stats() if self.audio_cache is not None else None
+        return stats
     
     async def clone_voice(self, name: str, audio_samples: List[str], description: str = "") -> str:
         """Clona una voz personalizada usando ElevenLabs."""
@@ -486,9 +766,14 @@ class NexusVoiceOrchestrator:
         
         return conversation_id
     
-    async def chat_with_voice(self, conversation_id: str, message: str) -> Dict[str, Any]:
-        """Chatea con el asistente de voz."""
-        return await self.voice_agent.process_message(conversation_id, message)
+    async def warm_up_audio_cache(self) -> Dict[str, Any]:
+        """Pre-sintetiza bienvenidas y anuncios de transferencia de todos los agentes."""
+        return await self.voice_agent.warm_up_audio_cache()
+    
+    async def chat_with_voice(self, conversation_id: str, message: str,
+                              on_transfer: TransferCallback = None) -> Dict[str, Any]:
+        """Chatea con el asistente de voz (``on_transfer`` como en process_message)."""
+        return await self.voice_agent.process_message(conversation_id, message, on_transfer)
     
     async def clone_user_voice(self, name: str, audio_files: List[str], description: str = "") -> str:
         """Clona la voz del usuario para personalización."""
@@ -528,6 +813,7 @@ class NexusVoiceOrchestrator:
 # Ejemplo de uso
 async def demo_voice_integration():
     """Demostración de la integración de voz con Nexus."""
+    load_environment()
     elevenlabs_api_key = os.getenv('ELEVENLABS_API_KEY')
     
     if not elevenlabs_api_key:
@@ -568,5 +854,22 @@ async def demo_voice_integration():
     print(f"\n📊 Resumen de conversación:")
     print(json.dumps(summary, indent=2))
 
+async def warm_up_audio_cache():
+    """Precalienta la caché de audio (``python nexus_voice_integration.py warmup``)."""
+    load_environment()
+    elevenlabs_api_key = os.getenv('ELEVENLABS_API_KEY')
+    
+    if not elevenlabs_api_key:
+        logger.error("ELEVENLABS_API_KEY no configurada")
+        return
+    
+    orchestrator = NexusVoiceOrchestrator(elevenlabs_api_key)
+    result = await orchestrator.warm_up_audio_cache()
+    print(json.dumps(result, indent=2))
+
 if __name__ == "__main__":
-    asyncio.run(demo_voice_integration()) 
\ No newline at end of file
+    configure_logging()
+    if sys.argv[1:] == ["warmup"]:
+        asyncio.run(warm_up_audio_cache())
+    else:
+        asyncio.run(demo_voice_integration()) 
\ No newline at end of file
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Intenciones de Voz de Nexus
+===========================
+
+Clasificador de transferencias entre agentes de voz. Sustituye a la llamada
+completa al orquestador (descomposición, agentes y síntesis con GPT-4) que se
+hacía en cada turno y cuyo resultado se descartaba en favor de las reglas por
+palabras clave: las palabras clave de cada agente se compilan en un único
+autómata (expresión regular) y la decisión se toma en microsegundos.
+
+Opcionalmente, un modelo Naive Bayes local (nexus_router) decide los turnos
+en los que no aparece ninguna palabra clave.
+"""
+
+import re
+import time
+import logging
+from typing import Dict, List, Any
+
+from nexus_router import NaiveBayesIntentModel
+
+logger = logging.getLogger(__name__)
+
+# Palabras clave de cada condición de transferencia (coincidencia por subcadena)
+CONDITION_KEYWORDS: Dict[str, List[str]] = {
+    "technical_question": ["error", "bug", "code", "programming", "technical", "system"],
+    "code_generation": ["write code", "generate", "create function", "implement"],
+    "sales_question": ["pricing", "cost", "purchase", "buy", "sales", "demo"],
+    "support_question": ["help", "support", "issue", "problem", "troubleshoot"],
+    "development_question": ["development", "coding", "programming", "software"],
+    "data_analysis": ["data", "analysis", "report", "metrics", "statistics"],
+}
+
+# Reglas por agente actual, en orden de prioridad
+DEFAULT_TRANSFER_RULES: Dict[str, List[Dict[str, Any]]] = {
+    "nexus_dev": [
+        {
+            "condition": "technical_question",
+            "target_agent": "nexus_support",
+            "reason": "Transferring to technical support specialist"
+        },
+        {
+            "condition": "code_generation",
+            "target_agent": "nexus_dev",
+            "reason": "Transferring to development specialist"
+        }
+    ],
+    "nexus_hr": [
+        {
+            "condition": "technical_question",
+            "target_agent": "nexus_dev",
+            "reason": "Transferring to technical specialist"
+        },
+        {
+            "condition": "sales_question",
+            "target_agent": "nexus_sales",
+            "reason": "Transferring to sales specialist"
+        }
+    ],
+    "nexus_sales": [
+        {
+            "condition": "technical_question",
+            "target_agent": "nexus_dev",
+            "reason": "Transferring to technical specialist"
+        },
+        {
+            "condition": "support_question",
+            "target_agent": "nexus_support",
+            "reason": "Transferring to sales specialist"
+        }
+    ],
+    "nexus_support": [
+        {
+            "condition": "development_question",
+            "target_agent": "nexus_dev",
+            "reason": "Transferring to development specialist"
+        },
+        {
+            "condition": "data_analysis",
+            "target_agent": "nexus_analyst",
+            "reason": "Transferring to data analyst"
+        }
+    ]
+}
+
+class _KeywordAutomaton:
+    """
+    Autómata de un conjunto de palabras clave con una etiqueta (entero) cada una.
+
+    Una sola pasada por el mensaje devuelve todas las etiquetas cuyas palabras
+    aparecen como subcadena, incluidas las solapadas: la búsqueda anticipada
+    prueba cada posición y cada palabra hereda las etiquetas de las palabras
+    que son prefijo suyo (que también coinciden en esa posición).
+    """
+
+    def __init__(self, keywords: Dict[str, set]):
+        labels = {keyword: set(values) for keyword, values in keywords.items()}
+        for keyword in labels:
+            for other, values in keywords.items():
+                if other != keyword and keyword.startswith(other):
+                    labels[keyword] |= values
+        self.labels = labels
+        alternatives = "|".join(re.escape(keyword) for keyword in sorted(labels, key=len, reverse=True))
+        self.pattern = re.compile(f"(?=({alternatives}))") if labels else None
+
+    def match(self, text: str) -> set:
+        found = set()
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text):
+                found |= self.labels[match.group(1)]
+        return found
+
+
+class TransferClassifier:
+    """
+    Decide la transferencia de un turno de voz según las reglas del agente actual.
+
+    Se elige la primera regla (en orden) cuya condición aparece en el mensaje.
+    Sin coincidencias, el modelo opcional puede proponer un agente destino que
+    tenga regla para el agente actual si supera ``model_confidence``.
+    """
+
+    def __init__(self, transfer_rules: Dict[str, List[Dict[str, Any]]],
+                 condition_keywords: Dict[str, List[str]] = None,
+                 model: NaiveBayesIntentModel = None, model_confidence: float = 0.9):
+        self.transfer_rules = transfer_rules
+        self.condition_keywords = condition_keywords or CONDITION_KEYWORDS
+        self.model = model
+        self.model_confidence = model_confidence
+        self.stats = {"turns": 0, "keywords": 0, "model": 0, "no_transfer": 0, "classify_seconds": 0.0}
+        self.compile()
+
+    def compile(self):
+        """(Re)compila los autómatas; llamar tras modificar las reglas o las palabras clave."""
+        # Etiqueta = posición de la regla, para quedarse con la de mayor prioridad
+        self._automata: Dict[str, _KeywordAutomaton] = {}
+        for agent, rules in self.transfer_rules.items():
+            keywords: Dict[str, set] = {}
+            for position, rule in enumerate(rules):
+                for keyword in self.condition_keywords.get(rule["condition"], []):
+                    keywords.setdefault(keyword.lower(), set()).add(position)
+            self._automata[agent] = _KeywordAutomaton(keywords)
+
+        conditions = list(self.condition_keywords)
+        keywords: Dict[str, set] = {}
+        for position, condition in enumerate(conditions):
+            for keyword in self.condition_keywords[condition]:
+                keywords.setdefault(keyword.lower(), set()).add(position)
+        self._conditions = conditions
+        self._condition_automaton = _KeywordAutomaton(keywords)
+
+    def classify(self, message: str, current_agent: str) -> Dict[str, Any]:
+        """Devuelve {"should_transfer", "target_agent", "reason"} para el turno."""
+        start = time.perf_counter()
+        decision = self._decide(message, current_agent)
+        self.stats["turns"] += 1
+        self.stats["classify_seconds"] += time.perf_counter() - start
+        return decision
+
+    def _decide(self, message: str, current_agent: str) -> Dict[str, Any]:
+        rules = self.transfer_rules.get(current_agent)
+        if not rules:
+            self.stats["no_transfer"] += 1
+            return {"should_transfer": False}
+
+        matched = self._automata[current_agent].match(message.lower())
+        if matched:
+            self.stats["keywords"] += 1
+            return self._transfer(rules[min(matched)])
+
+        if self.model is not None:
+            target, probability = self.model.predict(message)
+            if target is not None and probability >= self.model_confidence:
+                for rule in rules:
+                    if rule["target_agent"] == target:
+                        self.stats["model"] += 1
+                        return self._transfer(rule)
+
+        self.stats["no_transfer"] += 1
+        return {"should_transfer": False}
+
+    @staticmethod
+    def _transfer(rule: Dict[str, Any]) -> Dict[str, Any]:
+        return {"should_transfer": True, "target_agent": rule["target_agent"], "reason": rule["reason"]}
+
+    def matches(self, message: str, condition: str) -> bool:
+        """Indica si el mensaje cumple una condición de transferencia."""
+        if condition not in self.condition_keywords:
+            return False
+        position = self._conditions.index(condition)
+        return position in self._condition_automaton.match(message.lower())
+
+    def learn(self, message: str, target_agent: str):
+        """Registra el agente que resolvió un turno (entrena el modelo opcional)."""
+        if self.model is not None:
+            self.model.learn(message, target_agent)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Turnos por camino y latencia media de clasificación (µs)."""
+        stats = dict(self.stats)
+        turns = stats["turns"]
+        stats["avg_classify_us"] = stats.pop("classify_seconds") * 1e6 / turns if turns else 0.0
+        return stats
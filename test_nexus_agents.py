@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Pruebas del modo fusionado de NexusDev: cuándo se recurre a los dos pasos
+y cuándo se propaga el error.
+"""
+
+import json
+import asyncio
+
+import pytest
+
+from nexus_agents import NexusDevAgent
+from nexus_core import AgentType, MemoryStore, Task
+
+
+class _ScriptedLLM:
+    """Cliente LLM que devuelve (o lanza) las respuestas indicadas en orden."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def complete(self, prompt, **kwargs):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _run(llm):
+    agent = NexusDevAgent(AgentType.NEXUS_DEV, MemoryStore(), llm, mode="fused")
+    task = Task(id="t1", description="Escribe una función de ordenación", agent_type=AgentType.NEXUS_DEV)
+    return agent, asyncio.run(agent.execute_task(task))
+
+
+def test_invalid_fused_responses_fall_back_to_two_steps():
+    analysis = json.dumps({"language": "python", "type": "function"})
+    for fused in ("no es JSON", json.dumps({"analysis": {}, "artifact": {}})):
+        llm = _ScriptedLLM(fused, analysis, "def f(): pass")
+        agent, result = _run(llm)
+
+        assert result == {"code": "def f(): pass"}
+        assert llm.calls == 3
+        assert agent.stats["fused_fallbacks"] == 1
+
+
+def test_llm_errors_in_fused_mode_are_not_retried_in_two_steps():
+    llm = _ScriptedLLM(ConnectionError("proveedor caído"))
+
+    with pytest.raises(ConnectionError):
+        _run(llm)
+    assert llm.calls == 1
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Pruebas de las utilidades de audio: streaming en hilos y caché de audio."""
+
+import time
+import asyncio
+import threading
+
+from nexus_audio import AudioCache, iterate_in_thread, synthesize_in_order
+
+
+def test_blocking_iterators_run_on_the_tts_pool():
+    threads = []
+
+    def chunks():
+        threads.append(threading.current_thread().name)
+        yield from (b"a", b"b", b"c")
+
+    async def main():
+        return [chunk async for chunk in iterate_in_thread(chunks)]
+
+    assert asyncio.run(main()) == [b"a", b"b", b"c"]
+    assert threads[0].startswith("nexus-tts")
+
+
+def test_iterator_errors_reach_the_consumer():
+    def chunks():
+        yield b"a"
+        raise RuntimeError("fallo de síntesis")
+
+    async def main():
+        received = []
+        try:
+            async for chunk in iterate_in_thread(chunks):
+                received.append(chunk)
+        except RuntimeError as e:
+            return received, str(e)
+
+    assert asyncio.run(main()) == ([b"a"], "fallo de síntesis")
+
+
+def _put_all(cache: AudioCache, *keys: str, size: int = 100):
+    async def main():
+        for key in keys:
+            await cache.put(key, key.encode() * size, characters=size)
+    asyncio.run(main())
+
+
+def _get(cache: AudioCache, key: str):
+    return asyncio.run(cache.get(key))
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = AudioCache(max_memory_bytes=250, path=None)
+    _put_all(cache, "a", "b")
+    assert _get(cache, "a") is not None  # "a" pasa a ser el más reciente
+    _put_all(cache, "c")
+
+    assert _get(cache, "b") is None
+    assert _get(cache, "a") == b"a" * 100
+    assert _get(cache, "c") == b"c" * 100
+    assert cache.memory_bytes == 200
+
+
+def test_disk_tier_is_bounded_by_size_and_keeps_recent_audio(tmp_path):
+    cache = AudioCache(max_memory_bytes=0, max_disk_bytes=300, path=str(tmp_path / "audio.db"))
+    _put_all(cache, "a", "b", "c")
+    assert _get(cache, "a") is not None  # refresca last_used de "a"
+    _put_all(cache, "d")
+
+    assert _get(cache, "b") is None
+    assert [_get(cache, key) is not None for key in "acd"] == [True, True, True]
+    assert cache.get_stats()["disk_bytes"] == 300
+
+
+def test_disk_byte_total_survives_a_reopen_and_replacements(tmp_path):
+    path = str(tmp_path / "audio.db")
+    cache = AudioCache(path=path)
+    _put_all(cache, "a", "b")
+    _put_all(cache, "a", size=50)
+    assert cache.disk_bytes == 150
+    cache.connection.close()
+
+    reopened = AudioCache(path=path)
+    assert reopened.disk_bytes == 150
+    assert _get(reopened, "b") == b"b" * 100
+    assert reopened.get_stats()["disk_hits"] == 1
+
+
+def test_expired_audio_is_not_served(tmp_path, monkeypatch):
+    cache = AudioCache(ttl=10, path=str(tmp_path / "audio.db"))
+    _put_all(cache, "a")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+
+    assert _get(cache, "a") is None
+    assert cache.disk_bytes == 0
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_background_puts_are_visible_in_memory_at_once(tmp_path):
+    async def main():
+        cache = AudioCache(path=str(tmp_path / "audio.db"))
+        cache.put_in_background("a", b"audio", characters=5)
+        in_memory = await cache.get("a")
+        await cache.drain()
+        return cache, in_memory
+
+    cache, in_memory = asyncio.run(main())
+    assert in_memory == b"audio"
+    assert cache.disk_bytes == 5
+
+
+async def _sentences(*texts: str):
+    for text in texts:
+        yield text
+
+
+def _speak_after(delays):
+    async def speak(text: str):
+        await asyncio.sleep(delays.get(text, 0.0))
+        if text == "falla":
+            raise RuntimeError("voz no disponible")
+        yield text.encode()
+    return speak
+
+
+def test_audio_is_produced_in_sentence_order_when_later_sentences_finish_first():
+    async def main():
+        speak = _speak_after({"uno": 0.1, "dos": 0.05, "tres": 0.0})
+        return [event async for event in synthesize_in_order(_sentences("uno", "dos", "tres"), speak)]
+
+    events = asyncio.run(main())
+    assert [(event["type"], event["index"]) for event in events] == [
+        ("sentence", 0), ("audio", 0), ("sentence", 1), ("audio", 1), ("sentence", 2), ("audio", 2)
+    ]
+    assert [event["chunk"] for event in events if event["type"] == "audio"] == [b"uno", b"dos", b"tres"]
+
+
+def test_a_failed_sentence_reports_audio_error_and_the_rest_continue():
+    async def main():
+        speak = _speak_after({})
+        return [event async for event in synthesize_in_order(_sentences("uno", "falla", "tres"), speak)]
+
+    events = asyncio.run(main())
+    assert {"type": "audio_error", "index": 1, "error": "voz no disponible"} in events
+    assert [event["chunk"] for event in events if event["type"] == "audio"] == [b"uno", b"tres"]
+
+
+def test_consumer_stopping_early_cancels_and_awaits_pending_synthesis():
+    cleaned_up = []
+
+    async def speak(text: str):
+        try:
+            await asyncio.sleep(0.05 if text == "uno" else 10)
+            yield text.encode()
+        finally:
+            cleaned_up.append(text)
+
+    async def main():
+        stream = synthesize_in_order(_sentences("uno", "dos", "tres"), speak)
+        async for event in stream:
+            if event["type"] == "audio":
+                break
+        await stream.aclose()
+        # Al cerrar el stream ya no queda ninguna tarea pendiente
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+        return sorted(cleaned_up)
+
+    assert asyncio.run(main()) == ["dos", "tres", "uno"]
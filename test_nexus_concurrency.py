@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Pruebas del control de concurrencia: configuración de límites, pools
+acotados (rechazo, cola, tiempos de espera, cancelación) y plaza de
+admisión del orquestador.
+"""
+
+import asyncio
+
+import pytest
+
+from nexus_concurrency import BoundedPool, ConcurrencyLimits, PoolFullError
+from nexus_core import AgentType, NexusOrchestrator, Task
+from nexus_llm import LLMClient
+
+
+def test_per_agent_limits_from_env(monkeypatch):
+    monkeypatch.setenv("NEXUS_AGENT_CONCURRENCY", "4")
+    monkeypatch.setenv("NEXUS_AGENT_CONCURRENCY_NEXUS_DEV", "8")
+    monkeypatch.setenv("NEXUS_AGENT_CONCURRENCY_PROJECT_MANAGER", "2")
+
+    limits = ConcurrencyLimits.from_env()
+
+    assert limits.for_agent("NexusDev") == 8
+    assert limits.for_agent("NexusProjectManager") == 2
+    assert limits.for_agent("NexusQA") == 4
+
+
+def test_per_agent_limits_in_code_use_agent_names():
+    limits = ConcurrencyLimits(agent_concurrency=4, per_agent={"NexusAnalyst": 1})
+
+    assert limits.for_agent("NexusAnalyst") == 1
+    assert limits.for_agent("NexusDev") == 4
+
+
+def test_requests_beyond_the_queue_are_shed():
+    async def main():
+        pool = BoundedPool("prueba", max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(PoolFullError):
+            async with pool.slot():
+                pass
+        stats = pool.get_stats()
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return stats, pool.get_stats()
+
+    during, after = asyncio.run(main())
+    assert (during["active"], during["queued"], during["rejected"]) == (1, 1, 1)
+    assert (after["active"], after["queued"], after["completed"]) == (0, 0, 2)
+
+
+def test_wait_times_are_recorded_for_queued_requests():
+    async def main():
+        pool = BoundedPool("prueba", max_concurrency=1, max_queue=4)
+        # Esperas de ~0, ~50 y ~100 ms
+        await asyncio.gather(*(pool.run(lambda: asyncio.sleep(0.05)) for _ in range(3)))
+        return pool.get_stats()
+
+    stats = asyncio.run(main())
+    assert stats["completed"] == 3
+    assert 40 <= stats["wait_p50_ms"] < 90
+    assert stats["wait_p99_ms"] >= 90
+
+
+def test_cancelled_requests_release_their_slot_and_queue_place():
+    async def main():
+        pool = BoundedPool("prueba", max_concurrency=1, max_queue=1)
+        holder = asyncio.ensure_future(pool.run(lambda: asyncio.sleep(10)))
+        waiter = asyncio.ensure_future(pool.run(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        holder.cancel()
+        await asyncio.gather(holder, waiter, return_exceptions=True)
+        stats = pool.get_stats()
+        # La plaza vuelve a estar libre
+        await asyncio.wait_for(pool.run(lambda: asyncio.sleep(0)), timeout=1)
+        return stats
+
+    stats = asyncio.run(main())
+    assert (stats["active"], stats["queued"], stats["completed"]) == (0, 0, 1)
+
+
+def _orchestrator(deltas):
+    """Orquestador con una plaza de admisión y una tarea ya resuelta."""
+    orchestrator = NexusOrchestrator(llm=LLMClient(api_key="test"), pipelined=False, agents={},
+                                     limits=ConcurrencyLimits(max_concurrent_commands=1,
+                                                              command_queue_size=0))
+    task = Task(id="t1", description="resumen", agent_type=AgentType.NEXUS_ANALYST, status="completed")
+
+    async def decompose(command, context=None):
+        return [task]
+
+    async def stream_tasks(tasks, speculative=None):
+        yield task, "resultado"
+
+    async def synthesize(command, tasks, results, decision=None):
+        for delta in deltas:
+            yield delta
+
+    orchestrator._decompose_command = decompose
+    orchestrator._stream_tasks = stream_tasks
+    orchestrator._synthesize_results_stream = synthesize
+    return orchestrator
+
+
+def test_admission_slot_is_released_before_streaming_the_synthesis():
+    async def main():
+        orchestrator = _orchestrator(["Uno. ", "Dos."])
+        stream = orchestrator.process_natural_language_command_stream("resume")
+        async for event in stream:
+            if event["type"] == "synthesis_delta":
+                break
+        # Con el primer consumidor aún leyendo la síntesis se admite otro comando
+        other = await orchestrator.process_natural_language_command("otro")
+        rest = [event async for event in stream]
+        return other, rest
+
+    other, rest = asyncio.run(main())
+    assert other["synthesis"] == "Uno. Dos."
+    assert rest[-1]["result"]["synthesis"] == "Uno. Dos."
+
+
+def test_abandoning_the_stream_releases_the_admission_slot():
+    async def main():
+        orchestrator = _orchestrator(["Uno."])
+        stream = orchestrator.process_natural_language_command_stream("resume")
+        await stream.__anext__()  # "decomposed": la plaza está ocupada
+        occupied = orchestrator.admission_pool.get_stats()["active"]
+        await stream.aclose()
+        return occupied, orchestrator.admission_pool.get_stats()
+
+    occupied, stats = asyncio.run(main())
+    assert occupied == 1
+    assert (stats["active"], stats["completed"]) == (0, 1)
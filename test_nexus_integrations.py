@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Pruebas del gestor de integraciones: eventos de workspaces cuyo id no es un
+tenant válido.
+"""
+
+import asyncio
+
+from nexus_integrations import IntegrationManager
+from nexus_llm import LLMClient
+from nexus_tenants import TenantRegistry
+
+
+def _manager():
+    manager = IntegrationManager()
+    manager.set_tenant_registry(TenantRegistry(llm=LLMClient(api_key="test")))
+    sent = []
+
+    async def send_message_to_platform(platform, target, message, **kwargs):
+        sent.append((platform, target, message))
+        return True
+
+    manager.send_message_to_platform = send_message_to_platform
+    return manager, sent
+
+
+def test_mentions_from_an_invalid_workspace_get_an_error_reply():
+    manager, sent = _manager()
+    event = {"type": "message", "team": "../otro", "channel": "C1", "user": "U1", "text": "nexus, resume"}
+
+    asyncio.run(manager.handle_platform_event("slack", event))
+
+    assert len(sent) == 1
+    assert sent[0][:2] == ("slack", "C1")
+    assert "no es válido" in sent[0][2]
+    assert len(manager.tenants) == 0
+
+
+def test_other_events_from_an_invalid_workspace_are_dropped_silently():
+    manager, sent = _manager()
+
+    asyncio.run(manager.handle_platform_event(
+        "slack", {"type": "message", "team": "../otro", "channel": "C1", "text": "hola"}
+    ))
+    asyncio.run(manager.handle_platform_event("jira", {"type": "issue_created", "tenant_id": "a/b"}))
+
+    assert sent == []
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Pruebas del cliente LLM compartido: qué llamadas se cachean y cómo se
+agrupan y cancelan las llamadas idénticas concurrentes (single-flight).
+
+Las llamadas al proveedor se sustituyen por una corrutina que cuenta
+peticiones, así que no hace falta red ni clave de API.
+"""
+
+import time
+import asyncio
+
+from nexus_llm import LLMClient, ResponseCache
+
+
+class _CountingClient(LLMClient):
+    """LLMClient cuyo proveedor responde tras ``latency`` segundos y cuenta peticiones."""
+
+    def __init__(self, latency: float = 0.0, **kwargs):
+        super().__init__(api_key="test", cache=ResponseCache(), **kwargs)
+        self.latency = latency
+        self.requests = 0
+        self.cancelled_requests = 0
+
+    async def _request(self, model, messages, timeout, params):
+        self.requests += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled_requests += 1
+            raise
+        return f"respuesta {self.requests}"
+
+
+def test_creative_calls_are_not_cached_by_default():
+    async def main():
+        llm = _CountingClient()
+        first = await llm.complete("Escribe un eslogan", temperature=0.4)
+        second = await llm.complete("Escribe un eslogan", temperature=0.4)
+        return llm, first, second
+
+    llm, first, second = asyncio.run(main())
+    assert llm.requests == 2
+    assert first != second
+
+
+def test_deterministic_calls_are_cached_by_default():
+    async def main():
+        llm = _CountingClient()
+        first = await llm.complete("Descompón el comando", temperature=0)
+        second = await llm.complete("Descompón el comando", temperature=0)
+        return llm, first, second
+
+    llm, first, second = asyncio.run(main())
+    assert llm.requests == 1
+    assert first == second
+    assert llm.get_stats()["cache"]["memory_hits"] == 1
+
+
+def test_call_sites_can_opt_in_or_out():
+    async def main():
+        llm = _CountingClient()
+        await llm.complete("Resume", temperature=0.3, cache=True)
+        await llm.complete("Resume", temperature=0.3, cache=True)
+        await llm.complete("Clasifica", temperature=0, cache=False)
+        await llm.complete("Clasifica", temperature=0, cache=False)
+        return llm
+
+    assert asyncio.run(main()).requests == 3
+
+
+def test_identical_concurrent_calls_share_one_request():
+    async def main():
+        llm = _CountingClient(latency=0.05)
+        results = await asyncio.gather(*(llm.complete("Descompón", temperature=0) for _ in range(5)))
+        return llm, results
+
+    llm, results = asyncio.run(main())
+    assert llm.requests == 1
+    assert len(set(results)) == 1
+    assert llm.get_stats()["coalesced"] == 4
+
+
+def test_identical_concurrent_creative_calls_share_one_request():
+    async def main():
+        llm = _CountingClient(latency=0.05)
+        results = await asyncio.gather(*(llm.complete("Escribe", temperature=0.3) for _ in range(2)))
+        # Agrupadas pero no cacheadas: una llamada posterior vuelve al proveedor
+        later = await llm.complete("Escribe", temperature=0.3)
+        return llm, results, later
+
+    llm, results, later = asyncio.run(main())
+    assert results == ["respuesta 1", "respuesta 1"]
+    assert llm.get_stats()["coalesced"] == 1
+    assert later == "respuesta 2"
+    assert llm.requests == 2
+
+
+def test_cancelling_one_waiter_keeps_the_shared_request_alive():
+    async def main():
+        llm = _CountingClient(latency=0.05)
+        first = asyncio.ensure_future(llm.complete("Descompón", temperature=0))
+        second = asyncio.ensure_future(llm.complete("Descompón", temperature=0))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        return llm, first, result
+
+    llm, first, result = asyncio.run(main())
+    assert first.cancelled()
+    assert result == "respuesta 1"
+    assert llm.requests == 1
+    assert llm.cancelled_requests == 0
+
+
+def test_cancelling_every_waiter_cancels_the_request():
+    async def main():
+        llm = _CountingClient(latency=1.0)
+        waiters = [asyncio.ensure_future(llm.complete("Descompón", temperature=0)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert llm._inflight == {}
+        # Una llamada posterior no hereda la petición cancelada
+        llm.latency = 0.0
+        return llm, await llm.complete("Descompón", temperature=0)
+
+    llm, result = asyncio.run(main())
+    assert llm.cancelled_requests == 1
+    assert llm.requests == 2
+    assert result == "respuesta 2"
+
+
+def test_disk_tier_survives_a_reopen_and_drops_expired_responses(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm.db")
+
+    async def store():
+        cache = ResponseCache(path=path)
+        cache.put_in_background("a", "respuesta a", latency=1.0)
+        await cache.put("b", "respuesta b", latency=1.0, ttl=10)
+        await cache.drain()
+        cache.connection.close()
+
+    async def reopen():
+        cache = ResponseCache(path=path)
+        return cache, await cache.get("a"), await cache.get("b")
+
+    asyncio.run(store())
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    cache, a, b = asyncio.run(reopen())
+
+    assert (a, b) == ("respuesta a", None)
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] == 1
+
+
+def test_pending_disk_writes_finish_before_aclose_returns(tmp_path):
+    async def main():
+        llm = _CountingClient()
+        llm.cache = ResponseCache(path=str(tmp_path / "llm.db"))
+        await llm.complete("Descompón el comando", temperature=0)
+        await llm.aclose()
+        return await ResponseCache(path=str(tmp_path / "llm.db")).get(
+            ResponseCache.key("gpt-4", [{"role": "user", "content": "Descompón el comando"}], {"temperature": 0})
+        )
+
+    assert asyncio.run(main()) == "respuesta 1"
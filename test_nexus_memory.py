@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la retención del MemoryStore acotado: qué se desaloja al
+superar el presupuesto.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from nexus_core import ContextItem, MemoryStore
+
+
+def _item(item_id: str, type: str, importance: float, age_days: float = 0.0) -> ContextItem:
+    return ContextItem(
+        id=item_id,
+        type=type,
+        content=f"{type} {item_id}",
+        source="slack",
+        timestamp=datetime.now() - timedelta(days=age_days),
+        metadata={},
+        importance_score=importance
+    )
+
+
+def test_old_decisions_survive_fresh_chatter():
+    store = MemoryStore(max_items=100)
+    for i in range(10):
+        store.add_context(_item(f"decision_{i}", "decision", 0.9, age_days=5))
+    for i in range(200):
+        store.add_context(_item(f"chat_{i}", "conversation", 0.7))
+
+    decisions = [item_id for item_id in store.context_items if item_id.startswith("decision_")]
+    assert len(decisions) == 10
+    assert len(store.context_items) <= 100
+    assert store.get_stats()["evictions"] == 110
+
+
+def test_high_importance_items_are_durable_regardless_of_type():
+    store = MemoryStore(max_items=10)
+    store.add_context(_item("report", "document", 0.95, age_days=30))
+    for i in range(50):
+        store.add_context(_item(f"chat_{i}", "conversation", 0.7))
+
+    assert "report" in store.context_items
+
+
+def test_oldest_chatter_is_evicted_first():
+    store = MemoryStore(max_items=10)
+    for i in range(10):
+        store.add_context(_item(f"chat_{i}", "conversation", 0.7, age_days=10 - i))
+    store.add_context(_item("fresh", "conversation", 0.7))
+
+    assert "chat_0" not in store.context_items
+    assert "chat_9" in store.context_items
+    assert "fresh" in store.context_items
+
+
+def test_durable_items_move_to_the_cold_tier_when_nothing_else_is_left():
+    cold = MemoryStore()
+    store = MemoryStore(max_items=5, cold_store=cold)
+    for i in range(8):
+        store.add_context(_item(f"decision_{i}", "decision", 0.9, age_days=8 - i))
+
+    assert len(store.context_items) <= 5
+    assert "decision_7" in store.context_items
+    assert "decision_0" not in store.context_items
+    assert "decision_0" in cold.context_items
+
+
+def test_durable_items_are_never_discarded_without_a_cold_tier():
+    store = MemoryStore(max_items=5, max_history=2)
+    for i in range(3):
+        store.add_context(_item(f"chat_{i}", "conversation", 0.7))
+    for i in range(8):
+        store.add_context(_item(f"decision_{i}", "decision", 0.9, age_days=8 - i))
+        store.decisions.append({"id": f"decision_{i}"})
+
+    # Se desaloja la charla, pero las decisiones se quedan aunque superen el presupuesto
+    assert sorted(store.context_items) == [f"decision_{i}" for i in range(8)]
+    assert store.get_stats()["durable_over_budget"] > 0
+    assert len(store.decisions) == 8
+
+
+def test_compact_item_metadata_mutations_are_kept():
+    store = MemoryStore(compact=True)
+    store.add_context(_item("a", "conversation", 0.5))
+    item = store.context_items["a"]
+
+    item.metadata["project_id"] = "nexus"
+    item.metadata.update(channel="general")
+    item.metadata.setdefault("thread", "t1")
+    del item.metadata["thread"]
+
+    assert item.metadata == {"project_id": "nexus", "channel": "general"}
+    assert item.to_item().metadata == {"project_id": "nexus", "channel": "general"}
+    assert json.loads(json.dumps(item.metadata)) == {"project_id": "nexus", "channel": "general"}
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la memoria persistente: escrituras agrupadas en lotes, lo que ve
+la propia conexión antes de confirmarlas y lo que sobrevive a una reapertura.
+"""
+
+import time
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from nexus_core import ContextItem
+from nexus_persistence import SQLiteMemoryStore
+
+
+def _item(item_id: str) -> ContextItem:
+    return ContextItem(
+        id=item_id,
+        type="conversation",
+        content=f"mensaje {item_id} sobre el despliegue",
+        source="slack",
+        timestamp=datetime.now(),
+        metadata={"conversation_id": "C1", "participants": ["U1"]},
+    )
+
+
+def _committed(path: str) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM context_items").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / "memoria.db")
+    store = SQLiteMemoryStore(path, batch_size=3, flush_interval=60)
+    for i in range(5):
+        store.add_context(_item(f"m{i}"))
+
+    # La conexión del almacén ve todo; fuera solo se ve el lote confirmado
+    assert len(store.context_items) == 5
+    assert [item.id for item in store.search_context("despliegue", limit=10)]
+    assert _committed(path) == 3
+    assert store.get_stats()["commits"] == 1
+
+    store.close()
+    assert _committed(path) == 5
+
+
+def test_pending_writes_are_committed_after_the_flush_interval(tmp_path):
+    path = str(tmp_path / "memoria.db")
+    store = SQLiteMemoryStore(path, batch_size=100, flush_interval=0.05)
+    store.add_context(_item("m0"))
+    store.remove_context("m0")
+    store.add_context(_item("m1"))
+    time.sleep(0.3)
+
+    assert _committed(path) == 1
+    assert store.get_stats()["writes"] == 3
+    store.close()
+
+
+def test_a_failed_write_does_not_undo_the_rest_of_the_batch(tmp_path):
+    path = str(tmp_path / "memoria.db")
+    store = SQLiteMemoryStore(path, batch_size=100, flush_interval=60)
+    store.add_context(_item("m0"))
+    broken = _item("m1")
+    broken.content = None  # NOT NULL: la inserción falla
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add_context(broken)
+    store.close()
+
+    reopened = SQLiteMemoryStore(path)
+    assert list(reopened.context_items) == ["m0"]
+    reopened.close()
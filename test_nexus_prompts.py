@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Pruebas del prompt de síntesis: el techo de ``max_tokens`` se cumple sobre el
+prompt final, sea cual sea el tamaño del comando y de los resultados.
+"""
+
+from nexus_core import Task, AgentType
+from nexus_prompts import SynthesisPromptBuilder, estimate_tokens
+
+
+def _tasks(count: int):
+    tasks, results = [], {}
+    for position in range(count):
+        task = Task(id=f"task-{position}", description=f"Tarea {position} " + "detalle " * 30,
+                    agent_type=AgentType.NEXUS_DEV, priority=1, status="completed")
+        tasks.append(task)
+        results[task.id] = {"summary": "texto largo " * 200, "files": [f"f{n}.py" for n in range(50)]}
+    return tasks, results
+
+
+def test_prompt_respects_max_tokens_with_many_tasks_and_long_command():
+    builder = SynthesisPromptBuilder(max_tokens=1000)
+    tasks, results = _tasks(40)
+    prompt = builder.build("implementa " * 2000, tasks, results)
+
+    assert estimate_tokens(prompt) <= 1000
+    assert "tareas más omitidas" in prompt
+    assert builder.INSTRUCTIONS in prompt
+
+
+def test_short_results_are_kept_whole_and_long_ones_share_the_rest():
+    builder = SynthesisPromptBuilder(max_tokens=800)
+    tasks, results = _tasks(3)
+    results[tasks[0].id] = "ok"
+    prompt = builder.build("comando", tasks, results)
+
+    assert estimate_tokens(prompt) <= 800
+    assert '"resultado":"ok"}' in prompt
+    assert "omitidas" not in prompt
+
+
+def test_small_prompts_are_not_touched():
+    builder = SynthesisPromptBuilder(max_tokens=3000)
+    tasks, _ = _tasks(2)
+    prompt = builder.build("comando", tasks, {task.id: "hecho" for task in tasks})
+
+    assert "…" not in prompt
+    assert prompt.count('"resultado":"hecho"') == 2
+
+
+def test_raw_size_is_sampled():
+    builder = SynthesisPromptBuilder(raw_sample_every=5)
+    tasks, results = _tasks(2)
+    for _ in range(10):
+        builder.build("comando", tasks, results)
+
+    stats = builder.get_stats()
+    assert stats["prompts"] == 10
+    assert stats["raw_samples"] == 2
+    assert stats["raw_mean"] > stats["mean"]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pruebas del enrutador de capacidades: cuándo un comando va directamente a un
+agente por palabras clave, cuándo decide el modelo y cuándo se deja al LLM,
+y el aprendizaje del modelo con las descomposiciones del orquestador.
+"""
+
+import json
+import asyncio
+
+from nexus_core import AgentType, NexusOrchestrator
+from nexus_router import CapabilityRouter, NaiveBayesIntentModel
+
+CAPABILITIES = {
+    "dev": ["endpoint", "refactorizar codigo"],
+    "qa": ["casos de prueba", "cobertura"],
+    "docs": ["manual", "endpoint"],
+}
+
+
+def _model(examples: int = 60) -> NaiveBayesIntentModel:
+    model = NaiveBayesIntentModel(min_examples=examples)
+    for _ in range(examples // 2):
+        model.learn("documenta el endpoint de pagos en el manual", "docs")
+        model.learn("implementa el endpoint de pagos en el servidor", "dev")
+    return model
+
+
+def test_clear_keyword_match_routes_directly():
+    router = CapabilityRouter(CAPABILITIES)
+    decision = router.route("genera casos de prueba y revisa la cobertura")
+
+    assert decision.target == "qa"
+    assert decision.reason == "keywords"
+    assert decision.confidence == 1.0
+    assert router.get_stats()["keywords"] == 1
+
+
+def test_shared_capability_below_threshold_is_left_to_the_llm():
+    router = CapabilityRouter(CAPABILITIES)
+    decision = router.route("crea un endpoint de pagos")
+
+    # "endpoint" lo comparten dev y docs: 0.5 de confianza, por debajo de 0.75
+    assert decision.target is None
+    assert decision.reason == "ambiguous"
+    assert decision.confidence == 0.5
+    assert decision.scores == {"dev": 0.5, "docs": 0.5}
+    assert router.get_stats()["llm"] == 1
+
+
+def test_confidence_threshold_is_inclusive():
+    router = CapabilityRouter(CAPABILITIES, min_confidence=0.5)
+    decision = router.route("crea un endpoint de pagos")
+
+    assert decision.target in ("dev", "docs")
+    assert decision.reason == "keywords"
+
+
+def test_multi_step_commands_always_go_to_the_llm():
+    router = CapabilityRouter(CAPABILITIES)
+    decision = router.route("genera casos de prueba y luego revisa la cobertura")
+
+    assert decision.target is None
+    assert decision.reason == "multi_step"
+
+
+def test_confident_model_breaks_keyword_ties():
+    router = CapabilityRouter(CAPABILITIES, model=_model())
+    decision = router.route("implementa el endpoint en el servidor")
+
+    assert decision.target == "dev"
+    assert decision.reason == "model"
+    assert decision.confidence >= router.model_confidence
+
+
+def test_model_below_its_confidence_is_ignored():
+    router = CapabilityRouter(CAPABILITIES, model=_model(), model_confidence=0.999999)
+    decision = router.route("crea un endpoint")
+
+    assert decision.target is None
+    assert decision.reason == "ambiguous"
+
+
+def test_model_cannot_contradict_keywords():
+    model = NaiveBayesIntentModel(min_examples=10)
+    for _ in range(10):
+        model.learn("crea un endpoint de pagos", "qa")
+    router = CapabilityRouter(CAPABILITIES, model=model)
+    decision = router.route("crea un endpoint de pagos")
+
+    # El modelo está seguro de "qa", pero las palabras clave solo admiten dev o docs
+    assert decision.target is None
+    assert decision.reason == "ambiguous"
+
+
+def test_untrained_model_does_not_route():
+    router = CapabilityRouter(CAPABILITIES, model=_model(examples=60))
+    router.model.min_examples = 1000
+    assert router.route("implementa el endpoint en el servidor").target is None
+
+
+def test_orchestrator_router_learns_from_single_task_decompositions(monkeypatch):
+    monkeypatch.setenv("NEXUS_INTENT_MIN_EXAMPLES", "4")
+
+    class _DecomposingLLM:
+        calls = 0
+
+        async def complete(self, prompt, **kwargs):
+            self.calls += 1
+            return json.dumps({"tasks": [{"description": "cuadrar", "agent_type": "NexusFinance"}]})
+
+    llm = _DecomposingLLM()
+    orchestrator = NexusOrchestrator(llm=llm)
+
+    async def main():
+        for month in ("enero", "febrero", "marzo", "abril"):
+            await orchestrator._decompose_command(f"cuadra el libro mayor de {month}")
+        return await orchestrator._decompose_command("cuadra el libro mayor de mayo")
+
+    tasks = asyncio.run(main())
+    assert [task.agent_type for task in tasks] == [AgentType.NEXUS_FINANCE]
+    assert llm.calls == 4
+    assert orchestrator.router.get_stats()["model"] == 1
+
+
+def test_intent_model_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("NEXUS_INTENT_MODEL", "false")
+    assert CapabilityRouter.from_env({}).model is None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Pruebas del planificador DAG: propagación de fallos, cancelación de
+dependientes, dependencias desconocidas y ciclos.
+"""
+
+import asyncio
+
+from nexus_core import Task, AgentType
+from nexus_scheduler import DAGScheduler
+
+
+def _task(task_id: str, *dependencies: str, priority: int = 1) -> Task:
+    return Task(id=task_id, description=task_id, agent_type=AgentType.NEXUS_DEV,
+                priority=priority, dependencies=list(dependencies))
+
+
+async def _echo(task, upstream):
+    if task.description == "boom":
+        raise RuntimeError("fallo simulado")
+    return {"task": task.id, "upstream": sorted(upstream)}
+
+
+def test_dependents_receive_upstream_results():
+    tasks = [_task("a"), _task("b", "a"), _task("c", "a", "b")]
+    results = asyncio.run(DAGScheduler(_echo).run(tasks))
+
+    assert results["b"]["upstream"] == ["a"]
+    assert results["c"]["upstream"] == ["a", "b"]
+    assert all(task.status == "completed" for task in tasks)
+
+
+def test_failure_cancels_only_transitive_dependents():
+    tasks = [_task("a"), _task("b", "a"), _task("c", "b"), _task("d")]
+    tasks[0].description = "boom"
+    results = asyncio.run(DAGScheduler(_echo).run(tasks))
+
+    assert results["a"] == {"error": "fallo simulado"}
+    assert tasks[1].status == "cancelled" and tasks[2].status == "cancelled"
+    assert "a" in results["b"]["error"]
+    assert tasks[3].status == "completed"
+
+
+def test_unknown_dependency_is_reported_and_not_run():
+    calls = []
+
+    async def run(task, upstream):
+        calls.append(task.id)
+
+    tasks = [_task("a", "ghost"), _task("b", "a"), _task("c")]
+    results = asyncio.run(DAGScheduler(run).run(tasks))
+
+    assert results["a"] == {"error": "Dependencia desconocida: ghost"}
+    assert tasks[1].status == "cancelled"
+    assert calls == ["c"]
+
+
+def test_cycle_members_are_told_apart_from_blocked_dependents():
+    tasks = [_task("a", "b"), _task("b", "a"), _task("c", "a"), _task("d")]
+    results = asyncio.run(DAGScheduler(_echo).run(tasks))
+
+    assert results["a"] == {"error": "Dependencia circular"}
+    assert results["b"] == {"error": "Dependencia circular"}
+    assert tasks[2].status == "cancelled"
+    assert "ciclo" in results["c"]["error"] and results["c"]["error"] != "Dependencia circular"
+    assert tasks[3].status == "completed"
+
+
+def test_priority_orders_ready_tasks_when_concurrency_is_limited():
+    started = []
+
+    async def run(task, upstream):
+        started.append(task.id)
+
+    tasks = [_task("low", priority=3), _task("high", priority=1), _task("mid", priority=2)]
+    asyncio.run(DAGScheduler(run, max_concurrency=1).run(tasks))
+
+    assert started == ["high", "mid", "low"]
+
+
+def test_abandoned_stream_cancels_and_awaits_running_tasks():
+    cleaned_up = []
+
+    async def run(task, upstream):
+        if task.id == "fast":
+            return "ok"
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned_up.append(task.id)
+
+    async def main():
+        tasks = [_task("fast"), _task("slow")]
+        stream = DAGScheduler(run).stream(tasks)
+        async for task, _ in stream:
+            break
+        await stream.aclose()
+        # La limpieza de la tarea cancelada ya ha terminado al cerrar el stream
+        assert cleaned_up == ["slow"]
+        assert tasks[1].status == "cancelled"
+        assert [t for t in asyncio.all_tasks() if t is not asyncio.current_task()] == []
+
+    asyncio.run(main())
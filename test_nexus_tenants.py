@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pruebas del registro multi-tenant: validación de ids (que acaban en rutas de
+ficheros) y desalojo con y sin almacenamiento persistente.
+"""
+
+import pytest
+
+from nexus_core import MemoryStore
+from nexus_llm import LLMClient
+from nexus_tenants import TenantRegistry, validate_tenant_id
+
+
+def _registry(**kwargs) -> TenantRegistry:
+    return TenantRegistry(llm=LLMClient(api_key="test"), **kwargs)
+
+
+@pytest.mark.parametrize("tenant_id", ["../etc/passwd", "a/b", "..", "", "t" * 129, "equipo uno", None])
+def test_unsafe_tenant_ids_are_rejected(tenant_id):
+    with pytest.raises(ValueError):
+        validate_tenant_id(tenant_id)
+
+
+def test_registry_rejects_ids_before_creating_a_store():
+    created = []
+    registry = _registry(store_factory=lambda tenant_id: created.append(tenant_id) or MemoryStore())
+
+    with pytest.raises(ValueError):
+        registry.get("../../otro")
+    assert created == []
+    assert registry.get("T024BE7LD") is registry.get("T024BE7LD")
+
+
+def test_db_dir_factory_keeps_tenant_files_inside_the_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("NEXUS_TENANT_DB_DIR", str(tmp_path))
+    registry = TenantRegistry.from_env(llm=LLMClient(api_key="test"))
+
+    assert registry.persistent
+    with pytest.raises(ValueError):
+        registry.store_factory("../fuera")
+    store = registry.store_factory("team_1")
+    store.close()
+    assert (tmp_path / "team_1.db").exists()
+
+
+def test_in_memory_tenants_are_not_evicted_for_idleness():
+    registry = _registry(max_tenants=2, idle_seconds=0)
+    registry.get("a")
+
+    assert not registry.persistent
+    assert registry.evict_idle() == []
+    assert "a" in registry
+
+
+def test_capacity_eviction_of_in_memory_tenants_is_counted_as_lost_context():
+    registry = _registry(max_tenants=1)
+    registry.get("a")
+    registry.get("b")
+
+    assert "a" not in registry
+    assert registry.get_stats()["context_lost"] == 1
+
+
+def test_persistent_tenants_are_evicted_for_idleness():
+    registry = _registry(store_factory=lambda tenant_id: MemoryStore(), persistent=True, idle_seconds=0)
+    registry.get("a")
+
+    assert registry.evict_idle() == ["a"]
+    assert registry.get_stats()["context_lost"] == 0
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Pruebas del backend semántico: compactación de filas retiradas y
+entrenamiento del índice IVF fuera de la consulta.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from nexus_vector import SemanticBackend, IVFIndex
+
+
+def _backend(**kwargs) -> SemanticBackend:
+    backend = SemanticBackend(
+        index=IVFIndex(n_lists=16, nprobe=16, train_threshold=2000), batch_size=100, **kwargs
+    )
+    for i in range(3000):
+        backend.add(f"id{i}", f"documento {i} sobre tema{i % 50}")
+    backend.flush()
+    return backend
+
+
+def test_search_does_not_train_and_training_runs_in_background():
+    backend = _backend()
+
+    # La consulta se sirve (exacta) sin esperar al entrenamiento
+    assert backend.search("tema7", 3)
+    backend.wait_for_training()
+
+    assert backend.index.centroids is not None
+    assert sum(len(rows) for rows in backend.index.lists) == 3000
+    assert backend.get_stats()["trainings"] == 1
+
+
+def test_removed_rows_are_compacted_and_index_remapped():
+    backend = _backend()
+    backend.wait_for_training()
+
+    for i in range(0, 3000, 2):
+        backend.remove(f"id{i}")
+
+    stats = backend.get_stats()
+    assert stats["compactions"] >= 1
+    assert stats["inactive_rows"] <= SemanticBackend.COMPACT_RATIO * (stats["active_rows"] + stats["inactive_rows"])
+    assert sum(len(rows) for rows in backend.index.lists) == backend._size
+    for item_id, row in backend.id_rows.items():
+        assert backend.row_ids[row] == item_id
+
+    results = backend.search("documento 7 sobre tema7", 3)
+    assert results[0][1] == "id7"
+    assert all(int(item_id[2:]) % 2 == 1 for _, item_id in results)
+
+
+def test_compaction_discards_training_in_flight():
+    backend = _backend()
+    for i in range(0, 3000, 2):
+        backend.remove(f"id{i}")
+
+    backend.wait_for_training()
+    # El resultado entrenado con la numeración anterior no se aplica
+    assert backend.index.centroids is None
+    assert backend.search("documento 7 sobre tema7", 1)[0][1] == "id7"
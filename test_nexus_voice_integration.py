@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Pruebas del agente de voz: orden de entrega del anuncio de transferencia
+respecto a la respuesta del nuevo agente, en modo normal y en modo pipeline,
+y orden y cancelación de las frases del modo pipeline.
+
+La síntesis con ElevenLabs y el orquestador se sustituyen por versiones
+simuladas; el módulo sigue necesitando el paquete elevenlabs para importarse.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("elevenlabs")
+
+from nexus_voice_integration import NexusVoiceAgent
+
+TRANSFER_MESSAGE = "I found a bug in the login"  # nexus_dev -> nexus_support
+
+
+class _FakeCore:
+    """Orquestador que responde con frases fijas tras ``delay`` segundos cada una."""
+
+    def __init__(self, sentences=("Primera frase. ", "Segunda frase."), delay: float = 0.01):
+        self.sentences = sentences
+        self.delay = delay
+
+    async def process_natural_language_command_stream(self, command, context=None):
+        for sentence in self.sentences:
+            await asyncio.sleep(self.delay)
+            yield {"type": "synthesis_delta", "text": sentence}
+
+    async def process_natural_language_command(self, command, context=None):
+        parts = [event["text"] async for event in self.process_natural_language_command_stream(command)]
+        return {"synthesis": "".join(parts)}
+
+
+class _FakeVoiceAgent(NexusVoiceAgent):
+    """Agente cuya síntesis tarda ``latency(text)`` segundos y registra su orden."""
+
+    def __init__(self, core, latency=lambda text: 0.0):
+        super().__init__("test", core)
+        self.latency = latency
+        self.synthesized = []
+
+    async def _synthesize_stream(self, text, voice_config, filename=None, cacheable=False):
+        await asyncio.sleep(self.latency(text))
+        self.synthesized.append(text)
+        if filename:
+            self.audio_store.save_in_background(filename, [text.encode()])
+        yield text.encode()
+
+
+@pytest.fixture(autouse=True)
+def _audio_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+
+
+def _slow_announcement(text: str) -> float:
+    return 0.2 if text.startswith("Te transfiero") else 0.0
+
+
+def test_transfer_announcement_is_delivered_before_the_new_agent_reply():
+    async def main():
+        agent = _FakeVoiceAgent(_FakeCore(), latency=_slow_announcement)
+        conversation_id = await agent.start_conversation("u", "nexus_dev")
+        delivered = []
+
+        async def on_transfer(transfer):
+            delivered.append(("announcement", transfer["transfer_audio"], list(agent.synthesized)))
+
+        result = await agent.process_message(conversation_id, TRANSFER_MESSAGE, on_transfer)
+        delivered.append(("reply", result["response_audio"], None))
+        return agent, result, delivered
+
+    agent, result, delivered = asyncio.run(main())
+    assert [kind for kind, _, _ in delivered] == ["announcement", "reply"]
+    assert delivered[0][1] == result["transfer_audio"]
+    # La respuesta se generó mientras se sintetizaba el anuncio, pero se entrega después
+    assert "Primera frase. Segunda frase." in delivered[0][2]
+    assert result["to_agent"] == "NexusSupport"
+
+
+def test_pipelined_stream_announces_before_the_first_reply_audio():
+    async def main():
+        agent = _FakeVoiceAgent(_FakeCore(), latency=_slow_announcement)
+        conversation_id = await agent.start_conversation("u", "nexus_dev")
+        return [event async for event in agent.process_message_stream(conversation_id, TRANSFER_MESSAGE)]
+
+    events = asyncio.run(main())
+    kinds = [(event["type"], event.get("index")) for event in events]
+    announced = kinds.index(("transfer_audio", None))
+    first_reply_audio = next(position for position, kind in enumerate(kinds) if kind == ("audio", 1))
+    assert kinds.index(("audio", 0)) < announced < first_reply_audio
+    assert events[-1]["result"]["transfer_audio"] == events[announced]["transfer"]["transfer_audio"]
+
+
+def test_pipelined_process_message_calls_on_transfer():
+    async def main():
+        agent = _FakeVoiceAgent(_FakeCore())
+        agent.pipelined = True
+        conversation_id = await agent.start_conversation("u", "nexus_dev")
+        transfers = []
+        result = await agent.process_message(conversation_id, TRANSFER_MESSAGE, transfers.append)
+        return result, transfers
+
+    result, transfers = asyncio.run(main())
+    assert len(transfers) == 1
+    assert transfers[0]["transfer_audio"] == result["transfer_audio"]
+
+
+def test_pipelined_stream_speaks_reply_sentences_in_order():
+    async def main():
+        # La primera frase tarda más en sintetizarse que las siguientes
+        agent = _FakeVoiceAgent(_FakeCore(("Uno. ", "Dos. ", "Tres.")),
+                                latency=lambda text: 0.1 if text == "Uno." else 0.0)
+        conversation_id = await agent.start_conversation("u", "nexus_dev")
+        return [event async for event in agent.process_message_stream(conversation_id, "hola")]
+
+    events = asyncio.run(main())
+    assert [event["chunk"] for event in events if event["type"] == "audio"] == [b"Uno.", b"Dos.", b"Tres."]
+    assert events[-1]["type"] == "completed"
+    assert events[-1]["result"]["transfer"] is False
+    assert events[-1]["result"]["response"] == "Uno. Dos. Tres."
+
+
+def test_abandoned_pipelined_stream_leaves_no_tasks_behind():
+    async def main():
+        agent = _FakeVoiceAgent(_FakeCore(("Uno. ", "Dos. ", "Tres."), delay=0.05),
+                                latency=lambda text: 10 if text in ("Dos.", "Tres.") else 0.0)
+        conversation_id = await agent.start_conversation("u", "nexus_dev")
+        await agent.audio_store.drain()
+        stream = agent.process_message_stream(conversation_id, "hola")
+        async for event in stream:
+            if event["type"] == "audio":
+                break
+        await stream.aclose()
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pruebas del clasificador de transferencias de voz: gana la primera regla del
+agente actual cuya condición aparece en el mensaje, no la primera palabra
+clave que aparece en el texto.
+"""
+
+from nexus_router import NaiveBayesIntentModel
+from nexus_voice_intents import DEFAULT_TRANSFER_RULES, TransferClassifier
+
+
+def _rules(*conditions):
+    return {"agent": [{"condition": condition, "target_agent": f"to_{condition}", "reason": condition}
+                      for condition in conditions]}
+
+
+def test_first_rule_wins_regardless_of_keyword_position():
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+    # "implement" (code_generation, 2ª regla) aparece antes que "bug" (technical_question, 1ª)
+    decision = classifier.classify("Please implement a fix for this bug", "nexus_dev")
+
+    assert decision == {"should_transfer": True, "target_agent": "nexus_support",
+                        "reason": "Transferring to technical support specialist"}
+
+
+def test_later_rule_applies_when_earlier_conditions_do_not_match():
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+    decision = classifier.classify("Can you implement the login form?", "nexus_dev")
+
+    assert decision["target_agent"] == "nexus_dev"
+    assert decision["reason"] == "Transferring to development specialist"
+
+
+def test_overlapping_keywords_respect_rule_order():
+    keywords = {"short": ["data"], "long": ["database"]}
+
+    long_first = TransferClassifier(_rules("long", "short"), condition_keywords=keywords)
+    short_first = TransferClassifier(_rules("short", "long"), condition_keywords=keywords)
+
+    assert long_first.classify("the database is down", "agent")["target_agent"] == "to_long"
+    assert short_first.classify("the database is down", "agent")["target_agent"] == "to_short"
+
+
+def test_matching_is_case_insensitive_substring():
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+
+    assert classifier.classify("PRICING for teams?", "nexus_hr")["target_agent"] == "nexus_sales"
+
+
+def test_no_keyword_or_unknown_agent_does_not_transfer():
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+
+    assert classifier.classify("Good morning, how are you?", "nexus_dev") == {"should_transfer": False}
+    assert classifier.classify("I found a bug", "nexus_unknown") == {"should_transfer": False}
+    assert classifier.get_stats()["no_transfer"] == 2
+
+
+def test_model_only_picks_targets_with_a_rule_for_the_current_agent():
+    model = NaiveBayesIntentModel(min_examples=10)
+    for _ in range(10):
+        model.learn("my payroll is wrong", "nexus_analyst")
+        model.learn("the dashboard looks odd", "nexus_support")
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES, model=model, model_confidence=0.8)
+
+    # nexus_sales tiene regla hacia nexus_support, pero no hacia nexus_analyst
+    assert classifier.classify("the dashboard looks odd", "nexus_sales")["target_agent"] == "nexus_support"
+    assert classifier.classify("my payroll is wrong", "nexus_sales") == {"should_transfer": False}
+
+
+def test_matches_reports_single_conditions():
+    classifier = TransferClassifier(DEFAULT_TRANSFER_RULES)
+
+    assert classifier.matches("we need better metrics", "data_analysis")
+    assert not classifier.matches("we need better metrics", "sales_question")
+    assert not classifier.matches("anything", "unknown_condition")